@@ -1,18 +1,26 @@
 import logging
 
+import numpy as np
+
 from mapof.core.distances import map_str_to_func
 
+from mapof.elections.distances import batched_distances
 from mapof.elections.distances import feature_distance
 from mapof.elections.distances import main_approval_distances as mad
 from mapof.elections.distances import main_ordinal_distances as mod
 from mapof.elections.distances import positionwise_infty
+from mapof.elections.distances.distance_cache import DistanceCache
 from mapof.elections.objects.ApprovalElection import ApprovalElection
 from mapof.elections.objects.OrdinalElection import OrdinalElection
 
 
 from mapof.elections.distances.register import \
     registered_ordinal_election_distances, \
-    registered_approval_election_distances
+    registered_approval_election_distances, \
+    registered_ordinal_experiment_distances, \
+    registered_approval_experiment_distances, \
+    registered_ordinal_distance_bounds, \
+    registered_ordinal_distance_lower_bounds
 
 
 # registered_ordinal_distances = {
@@ -78,7 +86,9 @@ def add_ordinal_distance(name: str, function: callable) -> None:
 def get_distance(
         election_1,
         election_2,
-        distance_id: str = None
+        distance_id: str = None,
+        cache: DistanceCache = None,
+        **kwargs
 ) -> float or (float, list):
     """
     Computes distance between elections, (if applicable) optimal matching.
@@ -91,12 +101,19 @@ def get_distance(
             Second election.
         distance_id : str
             Name of the distance.
+        cache : DistanceCache
+            If given, the distance is looked up in the cache before being computed
+            (and stored there afterward).
+        **kwargs : dict
+            Additional arguments of the distance (e.g., `time_budget`).
     """
+    if cache is not None:
+        return cache.get_distance(election_1, election_2, distance_id, get_distance, **kwargs)
 
     if type(election_1) is ApprovalElection and type(election_2) is ApprovalElection:
-        return get_approval_distance(election_1, election_2, distance_id=distance_id)
+        return get_approval_distance(election_1, election_2, distance_id=distance_id, **kwargs)
     elif type(election_1) is OrdinalElection and type(election_2) is OrdinalElection:
-        return get_ordinal_distance(election_1, election_2, distance_id=distance_id)
+        return get_ordinal_distance(election_1, election_2, distance_id=distance_id, **kwargs)
     else:
         logging.warning('No such instance!')
 
@@ -172,6 +189,184 @@ def get_ordinal_distance(
         logging.warning(f'No such distance as: {main_distance}!')
 
 
+def has_batched_distance(distance_id: str, instance_type: str = 'ordinal') -> bool:
+    """
+    Checks whether an experiment-level (all-pairs) engine exists for the given distance.
+
+    Parameters
+    ----------
+        distance_id : str
+            Name of the distance.
+        instance_type : str
+            Either 'ordinal' or 'approval'.
+
+    Returns
+    -------
+        bool
+    """
+    if distance_id is None:
+        return False
+    main_distance = distance_id.split('-')[-1]
+    if instance_type == 'ordinal':
+        return main_distance in registered_ordinal_experiment_distances
+    elif instance_type == 'approval':
+        return main_distance in registered_approval_experiment_distances
+    return False
+
+
+def get_batched_distances(
+        elections: list,
+        distance_id: str = None,
+        pairs: list = None,
+        with_matchings: bool = False,
+        instance_type: str = 'ordinal'
+) -> (np.ndarray, dict):
+    """
+    Computes distances between all (or the given) pairs of elections at once.
+
+    Parameters
+    ----------
+        elections : list
+            List of elections.
+        distance_id : str
+            Name of the distance.
+        pairs : list[tuple[int, int]]
+            Pairs of indices (into `elections`) to compute. By default, all i < j.
+        with_matchings : bool
+            If True, the optimal matchings are returned as well (if applicable).
+        instance_type : str
+            Either 'ordinal' or 'approval'.
+
+    Returns
+    -------
+        (np.ndarray, dict)
+            Distance matrix and a dictionary mapping (i, j) to the optimal matching.
+
+    Raises
+    ------
+        NotImplementedError
+            If there is no experiment-level engine for the given distance
+            (or for its inner distance).
+    """
+    if '-' in distance_id:
+        inner_distance, main_distance = distance_id.split('-')
+    else:
+        inner_distance, main_distance = None, distance_id
+
+    if instance_type == 'ordinal':
+        registered = registered_ordinal_experiment_distances
+    else:
+        registered = registered_approval_experiment_distances
+
+    if main_distance not in registered:
+        raise NotImplementedError(f'No experiment-level engine for: {distance_id}')
+
+    return registered[main_distance](elections,
+                                     inner_distance,
+                                     pairs=pairs,
+                                     with_matchings=with_matchings)
+
+
+def has_distance_bounds(distance_id: str, instance_type: str = 'ordinal') -> bool:
+    """
+    Checks whether the distance is computed together with a lower and an upper bound.
+
+    Parameters
+    ----------
+        distance_id : str
+            Name of the distance.
+        instance_type : str
+            Either 'ordinal' or 'approval'.
+
+    Returns
+    -------
+        bool
+    """
+    return instance_type == 'ordinal' and distance_id in registered_ordinal_distance_bounds
+
+
+def get_distance_bounds(
+        election_1: OrdinalElection,
+        election_2: OrdinalElection,
+        distance_id: str = None,
+        **kwargs
+) -> (float, float, list):
+    """
+    Computes a lower and an upper bound on the distance between ordinal elections.
+
+    Parameters
+    ----------
+        election_1
+            First election.
+        election_2
+            Second election.
+        distance_id : str
+            Name of the distance.
+        **kwargs : dict
+            Additional arguments of the distance (e.g., `time_budget`).
+
+    Returns
+    -------
+        (float, float, list)
+            Lower bound, upper bound, and (if applicable) the matching attaining
+            the upper bound.
+    """
+    if distance_id not in registered_ordinal_distance_bounds:
+        raise NotImplementedError(f'No bounds for distance: {distance_id}')
+    return registered_ordinal_distance_bounds[distance_id](election_1, election_2, **kwargs)
+
+
+def has_distance_lower_bound(distance_id: str, instance_type: str = 'ordinal') -> bool:
+    """
+    Checks whether a cheap experiment-level lower bound exists for the given distance.
+
+    Parameters
+    ----------
+        distance_id : str
+            Name of the distance.
+        instance_type : str
+            Either 'ordinal' or 'approval'.
+
+    Returns
+    -------
+        bool
+    """
+    return instance_type == 'ordinal' and distance_id in registered_ordinal_distance_lower_bounds
+
+
+def get_distance_lower_bounds(
+        elections: list,
+        distance_id: str = None,
+        instance_type: str = 'ordinal'
+) -> np.ndarray:
+    """
+    Computes lower bounds on the distances between all pairs of elections, using
+    a distance that is much cheaper to compute.
+
+    Parameters
+    ----------
+        elections : list
+            List of elections.
+        distance_id : str
+            Name of the (expensive) distance.
+        instance_type : str
+            Either 'ordinal' or 'approval'.
+
+    Returns
+    -------
+        np.ndarray
+            Symmetric array of shape (E, E).
+
+    Raises
+    ------
+        NotImplementedError
+            If there is no lower bound for the given distance (or elections).
+    """
+    if not has_distance_lower_bound(distance_id, instance_type):
+        raise NotImplementedError(f'No lower bound for distance: {distance_id}')
+    return registered_ordinal_distance_lower_bounds[distance_id](elections)
+
+
 def _extract_distance_id(distance_id: str) -> (callable, str):
     """ Return: inner distance (distance between votes) name and main distance name """
     if '-' in distance_id:
@@ -187,4 +382,10 @@ __all__ = [
     'get_distance',
     'get_approval_distance',
     'get_ordinal_distance',
+    'has_batched_distance',
+    'get_batched_distances',
+    'has_distance_bounds',
+    'get_distance_bounds',
+    'has_distance_lower_bound',
+    'get_distance_lower_bounds',
 ]
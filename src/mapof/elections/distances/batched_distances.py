@@ -0,0 +1,438 @@
+"""
+Experiment-level (all-pairs) distance engines.
+
+Instead of evaluating a distance pair by pair, the engines below stack the
+relevant data of all elections into a single array and compute the whole
+distance matrix at once.
+"""
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from mapof.elections.distances.register import register_ordinal_experiment_distance, \
+    register_approval_experiment_distance, register_ordinal_distance_lower_bound
+from mapof.elections.other.compact_votes import native_votes
+
+try:
+    import mapof.elections.distances.cppdistances as cppd
+except ImportError:
+    cppd = None
+
+# Upper bound on the number of float64 entries of a single temporary tensor.
+MAX_CHUNK_ENTRIES = 2 ** 24
+
+POSITIONWISE_INNER_DISTANCES = {'emd', 'l1', 'l2'}
+
+# Slack subtracted from the lower bounds (computed in floating point) of integer distances
+LOWER_BOUND_TOLERANCE = 1e-6
+
+
+def _prepare_pairs(num_elections: int, pairs=None) -> np.ndarray:
+    """ Return: array of shape (P, 2) with the (i, j) pairs to be computed """
+    if pairs is None:
+        pairs = [(i, j) for i in range(num_elections) for j in range(i + 1, num_elections)]
+    return np.array(pairs, dtype=np.int64).reshape(-1, 2)
+
+
+def _chunk_size(entries_per_pair: int) -> int:
+    return max(1, MAX_CHUNK_ENTRIES // max(1, entries_per_pair))
+
+
+def stack_frequency_matrices(elections: list) -> np.ndarray:
+    """
+    Stacks the frequency matrices of the given elections.
+
+    Parameters
+    ----------
+        elections : list[OrdinalElection]
+            Elections with the same number of candidates.
+
+    Returns
+    -------
+        np.ndarray
+            Array of shape (E, m, m).
+    """
+    return np.stack([np.asarray(election.get_frequency_matrix(), dtype=float)
+                     for election in elections])
+
+
+def positionwise_cost_tensor(
+        matrices_1: np.ndarray,
+        matrices_2: np.ndarray,
+        inner_distance: str
+) -> np.ndarray:
+    """
+    Computes positionwise cost tables for a batch of pairs of frequency matrices.
+
+    Parameters
+    ----------
+        matrices_1 : np.ndarray
+            Array of shape (B, m, m), frequency matrices of the first elections.
+        matrices_2 : np.ndarray
+            Array of shape (B, m, m), frequency matrices of the second elections.
+        inner_distance : str
+            One of 'emd', 'l1', 'l2'.
+
+    Returns
+    -------
+        np.ndarray
+            Array of shape (B, m, m), where entry [b, j, i] is the inner distance
+            between the i-th row of matrices_1[b] and the j-th row of matrices_2[b]
+            (i.e., the same layout as `get_matching_cost_positionwise`).
+    """
+    if inner_distance == 'emd':
+        matrices_1 = np.cumsum(matrices_1, axis=2)[:, :, :-1]
+        matrices_2 = np.cumsum(matrices_2, axis=2)[:, :, :-1]
+    diff = matrices_2[:, :, np.newaxis, :] - matrices_1[:, np.newaxis, :, :]
+    if inner_distance == 'l2':
+        return np.sqrt(np.einsum('bjik,bjik->bji', diff, diff))
+    return np.abs(diff).sum(axis=3)
+
+
+@register_ordinal_experiment_distance('positionwise')
+def positionwise_distance_matrix(
+        elections: list,
+        inner_distance: str,
+        pairs: list = None,
+        with_matchings: bool = False
+) -> (np.ndarray, dict):
+    """
+    Computes Positionwise distances between all pairs of ordinal elections.
+
+    Parameters
+    ----------
+        elections : list[OrdinalElection]
+            Elections with the same number of candidates.
+        inner_distance : str
+            Name of the inner distance; one of 'emd', 'l1', 'l2'.
+        pairs : list[tuple[int, int]]
+            Pairs of indices (into `elections`) to compute. By default, all i < j.
+        with_matchings : bool
+            If True, the optimal matchings are returned as well.
+
+    Returns
+    -------
+        (np.ndarray, dict)
+            Symmetric distance matrix of shape (E, E) (entries not in `pairs` are
+            zero) and a dictionary mapping (i, j) to the optimal matching.
+    """
+    if inner_distance not in POSITIONWISE_INNER_DISTANCES:
+        raise NotImplementedError(
+            f'No batched positionwise engine for inner distance: {inner_distance}')
+
+    num_elections = len(elections)
+    distances = np.zeros([num_elections, num_elections])
+    matchings = {}
+    pairs = _prepare_pairs(num_elections, pairs)
+    if num_elections == 0 or len(pairs) == 0:
+        return distances, matchings
+
+    if len({election.num_candidates for election in elections}) > 1:
+        raise NotImplementedError('Batched positionwise engine requires equal numbers '
+                                  'of candidates')
+
+    matrices = stack_frequency_matrices(elections)
+    size = matrices.shape[1]
+    rows = np.arange(size)
+    step = _chunk_size(size ** 3)
+
+    for start in range(0, len(pairs), step):
+        chunk = pairs[start:start + step]
+        costs = positionwise_cost_tensor(matrices[chunk[:, 0]],
+                                         matrices[chunk[:, 1]],
+                                         inner_distance)
+        for (i, j), cost_table in zip(chunk, costs):
+            _, col_ind = linear_sum_assignment(cost_table)
+            distances[i, j] = distances[j, i] = cost_table[rows, col_ind].sum()
+            if with_matchings:
+                matchings[(int(i), int(j))] = col_ind
+
+    return distances, matchings
+
+
+@register_ordinal_distance_lower_bound('spearman')
+def spearman_lower_bound_matrix(elections: list) -> np.ndarray:
+    """
+    Computes lower bounds on the Spearman distances between all pairs of ordinal
+    elections: for every matching of the voters and of the candidates, the
+    displacements of a candidate sum up to at least the EMD between its position
+    distributions, so the Spearman distance is at least the number of voters times
+    the EMD-Positionwise distance.
+
+    Parameters
+    ----------
+        elections : list[OrdinalElection]
+            Elections with the same numbers of voters and candidates.
+
+    Returns
+    -------
+        np.ndarray
+            Symmetric array of shape (E, E).
+    """
+    if len({election.num_voters for election in elections}) > 1:
+        raise NotImplementedError('Lower bounds require equal numbers of voters')
+    if not elections:
+        return np.zeros([0, 0])
+    distances, _ = positionwise_distance_matrix(elections, 'emd')
+    return np.maximum(distances * elections[0].num_voters - LOWER_BOUND_TOLERANCE, 0)
+
+
+@register_ordinal_distance_lower_bound('swap')
+def swap_lower_bound_matrix(elections: list) -> np.ndarray:
+    """
+    Computes lower bounds on the swap distances between all pairs of ordinal
+    elections: the swap distance between two votes is at least half of their
+    Spearman distance, so half of the bound of `spearman_lower_bound_matrix` applies.
+
+    Parameters
+    ----------
+        elections : list[OrdinalElection]
+            Elections with the same numbers of voters and candidates.
+
+    Returns
+    -------
+        np.ndarray
+            Symmetric array of shape (E, E).
+    """
+    return spearman_lower_bound_matrix(elections) / 2
+
+
+def stack_votes(elections: list) -> np.ndarray:
+    """
+    Stacks the votes of the given elections.
+
+    Parameters
+    ----------
+        elections : list[OrdinalElection]
+            Elections with the same numbers of voters and candidates.
+
+    Returns
+    -------
+        np.ndarray
+            C-contiguous array of shape (E, n, m), of the compact type of the votes
+            (int8, int16 or int32).
+
+    Raises
+    ------
+        NotImplementedError
+            If some election has no votes or the shapes differ.
+    """
+    if any(election.is_pseudo or election.votes is None for election in elections):
+        raise NotImplementedError('Stacking votes requires elections with votes')
+    if len({np.shape(election.votes) for election in elections}) > 1:
+        raise NotImplementedError('Stacking votes requires equal numbers of voters '
+                                  'and candidates')
+    return native_votes(np.stack([np.asarray(election.votes) for election in elections]))
+
+
+def _native_distance_matrix(function_name: str, elections, pairs) -> (np.ndarray, dict):
+    """ Evaluates all the pairs with a single call to the given C++ function. """
+    if cppd is None:
+        raise NotImplementedError('The C++ extension is unavailable')
+
+    num_elections = len(elections)
+    distances = np.zeros([num_elections, num_elections])
+    pairs = _prepare_pairs(num_elections, pairs)
+    if num_elections == 0 or len(pairs) == 0:
+        return distances, {}
+
+    values = getattr(cppd, function_name)(stack_votes(elections), pairs)
+    distances[pairs[:, 0], pairs[:, 1]] = values
+    distances[pairs[:, 1], pairs[:, 0]] = values
+    return distances, {}
+
+
+@register_ordinal_experiment_distance('swap')
+def swap_distance_matrix(
+        elections: list,
+        inner_distance: str = None,
+        pairs: list = None,
+        with_matchings: bool = False
+) -> (np.ndarray, dict):
+    """
+    Computes swap distances between all pairs of ordinal elections
+    (using the C++ extension, with one native thread per core).
+
+    Parameters
+    ----------
+        elections : list[OrdinalElection]
+            Elections with the same numbers of voters and candidates.
+        inner_distance : str
+            Unused.
+        pairs : list[tuple[int, int]]
+            Pairs of indices (into `elections`) to compute. By default, all i < j.
+        with_matchings : bool
+            Unused (the swap distance does not provide matchings).
+
+    Returns
+    -------
+        (np.ndarray, dict)
+            Symmetric distance matrix of shape (E, E) and an empty dictionary.
+    """
+    return _native_distance_matrix('swapd_many', elections, pairs)
+
+
+@register_ordinal_experiment_distance('spearman')
+def spearman_distance_matrix(
+        elections: list,
+        inner_distance: str = None,
+        pairs: list = None,
+        with_matchings: bool = False
+) -> (np.ndarray, dict):
+    """
+    Computes Spearman distances between all pairs of ordinal elections
+    (using the C++ extension, with one native thread per core).
+
+    Parameters
+    ----------
+        elections : list[OrdinalElection]
+            Elections with the same numbers of voters and candidates.
+        inner_distance : str
+            Unused.
+        pairs : list[tuple[int, int]]
+            Pairs of indices (into `elections`) to compute. By default, all i < j.
+        with_matchings : bool
+            Unused (the Spearman distance does not provide matchings).
+
+    Returns
+    -------
+        (np.ndarray, dict)
+            Symmetric distance matrix of shape (E, E) and an empty dictionary.
+    """
+    return _native_distance_matrix('speard_many', elections, pairs)
+
+
+def vector_distance_matrix(
+        vectors: np.ndarray,
+        inner_distance: str,
+        pairs: list = None
+) -> (np.ndarray, dict):
+    """
+    Computes the inner distances between all pairs of rows of the given array.
+
+    For EMD, the rows are replaced by their prefix sums, so that every inner
+    distance reduces to a norm of the difference of two rows.
+
+    Parameters
+    ----------
+        vectors : np.ndarray
+            Array of shape (E, k), one vector per election.
+        inner_distance : str
+            Name of the inner distance; one of 'emd', 'l1', 'l2'.
+        pairs : list[tuple[int, int]]
+            Pairs of indices (into `vectors`) to compute. By default, all i < j.
+
+    Returns
+    -------
+        (np.ndarray, dict)
+            Symmetric distance matrix of shape (E, E) and an empty dictionary.
+    """
+    if inner_distance not in POSITIONWISE_INNER_DISTANCES:
+        raise NotImplementedError(
+            f'No batched engine for inner distance: {inner_distance}')
+
+    num_elections = len(vectors)
+    distances = np.zeros([num_elections, num_elections])
+    pairs = _prepare_pairs(num_elections, pairs)
+    if num_elections == 0 or len(pairs) == 0:
+        return distances, {}
+
+    if inner_distance == 'emd':
+        vectors = np.cumsum(vectors, axis=1)[:, :-1]
+    step = _chunk_size(vectors.shape[1])
+
+    for start in range(0, len(pairs), step):
+        chunk = pairs[start:start + step]
+        diff = vectors[chunk[:, 0]] - vectors[chunk[:, 1]]
+        if inner_distance == 'l2':
+            values = np.sqrt(np.einsum('pk,pk->p', diff, diff))
+        else:
+            values = np.abs(diff).sum(axis=1)
+        distances[chunk[:, 0], chunk[:, 1]] = values
+        distances[chunk[:, 1], chunk[:, 0]] = values
+
+    return distances, {}
+
+
+def stack_bordawise_vectors(elections: list) -> np.ndarray:
+    """
+    Stacks the (cached) bordawise vectors of the given elections.
+
+    Parameters
+    ----------
+        elections : list[OrdinalElection]
+            Elections with the same number of candidates.
+
+    Returns
+    -------
+        np.ndarray
+            Array of shape (E, m).
+    """
+    return np.stack([np.asarray(election.get_bordawise_vector(), dtype=float)
+                     for election in elections])
+
+
+@register_ordinal_experiment_distance('bordawise')
+def bordawise_distance_matrix(
+        elections: list,
+        inner_distance: str,
+        pairs: list = None,
+        with_matchings: bool = False
+) -> (np.ndarray, dict):
+    """
+    Computes Bordawise distances between all pairs of ordinal elections.
+
+    Parameters
+    ----------
+        elections : list[OrdinalElection]
+            Elections with the same number of candidates.
+        inner_distance : str
+            Name of the inner distance; one of 'emd', 'l1', 'l2'.
+        pairs : list[tuple[int, int]]
+            Pairs of indices (into `elections`) to compute. By default, all i < j.
+        with_matchings : bool
+            Unused (the Bordawise distance does not provide matchings).
+
+    Returns
+    -------
+        (np.ndarray, dict)
+            Symmetric distance matrix of shape (E, E) and an empty dictionary.
+    """
+    if len({election.num_candidates for election in elections}) > 1:
+        raise NotImplementedError('Batched bordawise engine requires equal numbers '
+                                  'of candidates')
+    vectors = stack_bordawise_vectors(elections) if elections else np.zeros([0, 0])
+    return vector_distance_matrix(vectors, inner_distance, pairs)
+
+
+@register_approval_experiment_distance('approvalwise')
+def approvalwise_distance_matrix(
+        elections: list,
+        inner_distance: str,
+        pairs: list = None,
+        with_matchings: bool = False
+) -> (np.ndarray, dict):
+    """
+    Computes Approvalwise distances between all pairs of approval elections.
+
+    Parameters
+    ----------
+        elections : list[ApprovalElection]
+            Elections with the same number of candidates.
+        inner_distance : str
+            Name of the inner distance; one of 'emd', 'l1', 'l2'.
+        pairs : list[tuple[int, int]]
+            Pairs of indices (into `elections`) to compute. By default, all i < j.
+        with_matchings : bool
+            Unused (the Approvalwise distance does not provide matchings).
+
+    Returns
+    -------
+        (np.ndarray, dict)
+            Symmetric distance matrix of shape (E, E) and an empty dictionary.
+    """
+    if len({election.num_candidates for election in elections}) > 1:
+        raise NotImplementedError('Batched approvalwise engine requires equal numbers '
+                                  'of candidates')
+    vectors = np.stack([np.asarray(election.get_approvalwise_vector(), dtype=float)
+                        for election in elections]) if elections else np.zeros([0, 0])
+    return vector_distance_matrix(vectors, inner_distance, pairs)
@@ -0,0 +1,119 @@
+"""
+Combinatorial (search-based) solver for the maximum common voter subelection.
+
+Two votes can only be identified under a bijection of candidates that maps one
+onto the other, so every bijection giving at least one common vote is induced
+by a pair of distinct votes (one from each election). The solver enumerates
+these induced bijections, evaluates each of them by hashing the relabelled
+distinct votes of the first election, and stops as soon as the votes left to
+be tried cannot improve on the best subelection found so far.
+"""
+import numpy as np
+
+from mapof.elections.objects.OrdinalElection import OrdinalElection
+
+# Upper bound on the number of entries of a single temporary array of relabelled votes
+MAX_CHUNK_ENTRIES = 2 ** 22
+
+_HASH_MULTIPLIERS_SEED = 0
+
+
+def distinct_votes_with_quantities(election: OrdinalElection) -> (np.ndarray, np.ndarray):
+    """
+    Returns the distinct votes of the election and their multiplicities.
+
+    Parameters
+    ----------
+        election : OrdinalElection
+            Election with votes.
+
+    Returns
+    -------
+        (np.ndarray, np.ndarray)
+            Array of shape (k, m) with the distinct votes and array of shape (k,)
+            with the number of voters casting each of them.
+    """
+    distinct_votes = getattr(election, 'distinct_votes', None)
+    quantities = getattr(election, 'quantities', None)
+    if distinct_votes is not None and quantities is not None \
+            and len(distinct_votes) == len(quantities) \
+            and sum(quantities) == len(election.votes):
+        return np.asarray(distinct_votes, dtype=np.int64), np.asarray(quantities, dtype=np.int64)
+    votes, counts = np.unique(np.asarray(election.votes, dtype=np.int64), axis=0,
+                              return_counts=True)
+    return votes, counts.astype(np.int64)
+
+
+def _hash_votes(votes: np.ndarray, multipliers: np.ndarray) -> np.ndarray:
+    """ Return: 64-bit hashes of the votes (along the last axis) """
+    with np.errstate(over='ignore'):
+        return (votes.astype(np.uint64) * multipliers).sum(axis=-1, dtype=np.uint64)
+
+
+def maximum_common_voter_subelection_search(
+        election_1: OrdinalElection,
+        election_2: OrdinalElection
+) -> (int, list):
+    """
+    Solves the maximum common voter subelection problem by enumerating the
+    bijections of candidates induced by pairs of votes.
+
+    Parameters
+    ----------
+        election_1 : OrdinalElection
+            The first election.
+        election_2 : OrdinalElection
+            The second election.
+
+    Returns
+    -------
+        (int, list | None)
+            The maximum number of common voters between the two elections, and the
+            bijection of candidates that attains it (None if there are no common voters).
+    """
+    if election_1.num_candidates != election_2.num_candidates \
+            or len(election_1.votes) == 0 or len(election_2.votes) == 0:
+        return 0, None
+
+    votes_1, quantities_1 = distinct_votes_with_quantities(election_1)
+    votes_2, quantities_2 = distinct_votes_with_quantities(election_2)
+    num_candidates = votes_1.shape[1]
+
+    multipliers = np.random.default_rng(_HASH_MULTIPLIERS_SEED).integers(
+        1, 2 ** 63, size=num_candidates, dtype=np.uint64) | np.uint64(1)
+    hashes_2 = _hash_votes(votes_2, multipliers)
+    order_2 = np.argsort(hashes_2)
+    hashes_2, votes_2, quantities_2 = hashes_2[order_2], votes_2[order_2], quantities_2[order_2]
+
+    # Votes of the first election by decreasing multiplicity, with the mass of the rest.
+    order_1 = np.argsort(-quantities_1, kind='stable')
+    votes_1, quantities_1 = votes_1[order_1], quantities_1[order_1]
+    remaining = np.concatenate([np.cumsum(quantities_1[::-1])[::-1][1:], [0]])
+    positions_1 = np.argsort(votes_1, axis=1)
+
+    best, best_mapping = 0, None
+    limit = min(int(quantities_1.sum()), int(quantities_2.sum()))
+    step = max(1, MAX_CHUNK_ENTRIES // votes_1.size)
+
+    for idx in range(len(votes_1)):
+        # Bijections mapping the idx-th vote of the first election onto each vote of the second.
+        mappings = votes_2[:, positions_1[idx]]
+        for start in range(0, len(mappings), step):
+            chunk = mappings[start:start + step]
+            relabelled = np.take_along_axis(chunk[:, np.newaxis, :],
+                                            votes_1[np.newaxis, :, :], axis=2)
+            hashes = _hash_votes(relabelled, multipliers)
+            found = np.minimum(np.searchsorted(hashes_2, hashes), len(hashes_2) - 1)
+            is_common = (hashes_2[found] == hashes) \
+                & np.all(votes_2[found] == relabelled, axis=2)
+            counts = np.where(is_common,
+                              np.minimum(quantities_1[np.newaxis, :], quantities_2[found]),
+                              0).sum(axis=1)
+            top = int(np.argmax(counts))
+            if counts[top] > best:
+                best, best_mapping = int(counts[top]), [int(c) for c in chunk[top]]
+        # Any better bijection would have to identify one of the votes tried so far.
+        if best >= remaining[idx] or best == limit:
+            break
+
+    return best, best_mapping
@@ -9,12 +9,20 @@
 #include <algorithm>
 #include <utility>
 #include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
 #include <pybind11/stl.h>
 #include <iostream>
+#include <limits>
+#include <atomic>
+#include <chrono>
+#include <map>
+#include <mutex>
+#include <thread>
+#include <tuple>
 
 using namespace std;
+namespace py = pybind11;
 
-#define BIG 100000
 typedef int row;
 #define ROW_TYPE INT
 typedef int col;
@@ -29,163 +37,40 @@ typedef int cost;
 #endif
 typedef int boolean;
 
-/*This function is the jv shortest augmenting path algorithm to solve the assignment problem*/
-cost lap(int dim,
+/*Read-only view of the votes of an election stored row by row (n x m); the candidate
+  ids are of type T (int8, int16 or int32, as in the compact votes of the elections)*/
+template <typename T>
+struct VotesOf {
+    const T* data;
+    int width;
+    const T* operator[](int t) const { return data + (size_t) t * width; }
+};
+typedef VotesOf<int32_t> Votes;
+
+/*Augmenting phase of the jv algorithm: assigns the given free rows by shortest augmenting
+  paths. Every assigned row must already be assigned to a column of minimal reduced cost
+  (with respect to the column prices v).*/
+cost lap_augment(int dim,
         cost **assigncost,
         col *rowsol,
         row *colsol,
         cost *u,
-        cost *v)
-
-// input:
-// dim        - problem size
-// assigncost - cost matrix
-
-// output:
-// rowsol     - column assigned to row in solution
-// colsol     - row assigned to column in solution
-// u          - dual variables, row reduction numbers
-// v          - dual variables, column reduction numbers
-
+        cost *v,
+        row *free,
+        int numfree)
 {
   boolean unassignedfound;
-  row  i, imin, numfree = 0, prvnumfree, f, i0, k, freerow, *pred, *free;
-  col  j, j1, endofpath, low, up, *collist, *matches;
-  cost h, umin, usubmin, v2, *d;
+  row  i, f, k, freerow, *pred;
+  col  j, j1, endofpath, low, up, *collist;
+  cost h, v2, *d;
   // avoid "uninitialized" warning
   cost min = 9999999;
   col last = -1;
-  col j2 = -1;
 
-  free = new row[dim];       // list of unassigned rows.
   collist = new col[dim];    // list of columns to be scanned in various ways.
-  matches = new col[dim];    // counts how many times a row could be assigned.
   d = new cost[dim];         // 'cost-distance' in augmenting path calculation.
   pred = new row[dim];       // row-predecessor of column in augmenting/alternating path.
 
-  // init how many times a row will be assigned in the column reduction.
-  for (i = 0; i < dim; i++)
-    matches[i] = 0;
-
-  // COLUMN REDUCTION
-  for (j = dim;j--;) // reverse order gives better results.
-  {
-    // find minimum cost over rows.
-    min = assigncost[0][j];
-    imin = 0;
-    for (i = 1; i < dim; i++)
-      if (assigncost[i][j] < min)
-      {
-        min = assigncost[i][j];
-        imin = i;
-      }
-    v[j] = min;
-    if (++matches[imin] == 1)
-    {
-      // init assignment if minimum row assigned for first time.
-      rowsol[imin] = j;
-      colsol[j] = imin;
-    }
-    else if(v[j]<v[rowsol[imin]]){
-        int j1 = rowsol[imin];
-        rowsol[imin] = j;
-        colsol[j] = imin;
-        colsol[j1] = -1;
-    }
-    else
-      colsol[j] = -1;        // row already assigned, column not assigned.
-  }
-
-  // REDUCTION TRANSFER
-  for (i = 0; i < dim; i++)
-    if (matches[i] == 0)     // fill list of unassigned 'free' rows.
-      free[numfree++] = i;
-   else
-      if (matches[i] == 1)   // transfer reduction from rows that are assigned once.  {
-      {
-        j1 = rowsol[i];
-        min = BIG;
-        for (j = 0; j < dim; j++)
-          if (j != j1)
-            if (assigncost[i][j] - v[j] < min)
-              min = assigncost[i][j] - v[j];
-        v[j1] = v[j1] - min;
-      }
-
-    //   AUGMENTING ROW REDUCTION
-  int loopcnt = 0;           // do-loop to be done twice.
-  do
-  {
-    loopcnt++;
-
-    //     scan all free rows.
-    //     in some cases, a free row may be replaced with another one to be scanned next.
-    k = 0;
-    prvnumfree = numfree;
-    numfree = 0;             // start list of rows still free after augmenting row reduction.
-    while (k < prvnumfree)
-    {
-      i = free[k];
-      k++;
-
-    //       find minimum and second minimum reduced cost over columns.
-      umin = assigncost[i][0] - v[0];
-      j1 = 0;
-      usubmin = BIG;
-      for (j = 1; j < dim; j++)
-      {
-        h = assigncost[i][j] - v[j];
-        if (h < usubmin){
-          if (h >= umin)
-          {
-            usubmin = h;
-            j2 = j;
-          }
-          else
-          {
-            usubmin = umin;
-            umin = h;
-            j2 = j1;
-            j1 = j;
-          }
-        }
-      }
-
-      i0 = colsol[j1];
-      if (umin < usubmin){
-    //         change the reduction of the minimum column to increase the minimum
-    //         reduced cost in the row to the subminimum.
-        v[j1] = v[j1] - (usubmin - umin);
-      }
-      else{                   // minimum and subminimum equal.
-        if(i0 > -1)  // minimum column j1 is assigned.
-        {
-    //           swap columns j1 and j2, as j2 may be unassigned.
-          j1 = j2;
-          i0 = colsol[j2];
-        }
-      }
-
-    //       (re-)assign i to j1, possibly de-assigning an i0.
-      rowsol[i] = j1;
-      colsol[j1] = i;
-
-        if(i0 > -1){  // minimum column j1 assigned earlier.
-            if (umin < usubmin){
-        //           put in current k, and go back to that k.
-        //           continue augmenting path i - j1 with i0.
-                free[--k] = i0;
-            }
-            else{
-        //           no further augmenting reduction possible.
-        //           store i0 in list of free rows for next phase.
-              free[numfree++] = i0;
-            }
-        }
-    }
-  }
-  while (loopcnt < 2);       // repeat once.
-
   // AUGMENT SOLUTION for each free row.
   for (f = 0; f < numfree; f++)
   {
@@ -309,100 +194,242 @@ cost lap(int dim,
 
    // free reserved memory.
   delete[] pred;
-  delete[] free;
   delete[] collist;
-  delete[] matches;
   delete[] d;
   return lapcost;
 }
 
-int getInvCount(int arr[], int arr2[], int n, bool swap)
+/*Augmenting row reduction phase of the jv algorithm (done twice): free rows take their
+  minimal reduced cost column, possibly evicting the row assigned to it. Return: the
+  number of rows that are still free (listed at the beginning of free)*/
+int lap_reduce_rows(int dim,
+        cost **assigncost,
+        col *rowsol,
+        row *colsol,
+        cost *v,
+        row *free,
+        int numfree)
 {
-    int inv_count = 0;
-    if(swap) {
-        for (int i = 0; i < n - 1; i++)
-            for (int j = i + 1; j < n; j++)
-                if ((arr[i] > arr[j]) != (arr2[i] > arr2[j]))
-                    inv_count++;
-    }
-    else{
-        for (int i = 0; i < n ; i++)
-            inv_count=inv_count+abs(arr[i]-arr2[i]);
-    }
-    return inv_count;
-}
+  row  i, prvnumfree, i0, k;
+  col  j, j1;
+  cost h, umin, usubmin;
+  // avoid "uninitialized" warning
+  col j2 = -1;
 
+  // a single column leaves nothing to reduce (the augmentation assigns it)
+  if (dim < 2)
+    return numfree;
 
+    //   AUGMENTING ROW REDUCTION
+  int loopcnt = 0;           // do-loop to be done twice.
+  do
+  {
+    loopcnt++;
 
-int spearDistance_election(int n,int m, const std::vector<std::vector<int>> &
-el1, const std::vector<std::vector<int>> & el2){
-    int min_dist=2*m*m*n;
-    int* mapping = new int [m];
-    col *rowsol;
-    row *colsol;
-    cost *u;
-    cost *v;
-    rowsol = new col[n];
-    colsol = new row[n];
-    u = new cost[n];
-    v = new cost[n];
-    int** costMatrix;
-    costMatrix = new int*[n];
-    for(int t=0;t<n;t++){
-        costMatrix[t]  =  new int[n];
-    }
-    int** e1mapped_reversed;
-    int** e2reversed;
-    e1mapped_reversed = new int*[n];
-    e2reversed = new int*[n];
-    for(int t=0;t<n;t++){
-        e1mapped_reversed[t]  =  new int[m];
-        e2reversed[t]  =  new int[m];
-    }
-    for(int i=0; i<m; i++){mapping[i]=i;}
-    do {
-        for(int t=0; t<n; t++) {
-            for (int j = 0; j < m; j++) {
-                e1mapped_reversed[t][mapping[el1[t][j]]] = j;
-                e2reversed[t][el2[t][j]] = j;
+    //     scan all free rows.
+    //     in some cases, a free row may be replaced with another one to be scanned next.
+    k = 0;
+    prvnumfree = numfree;
+    numfree = 0;             // start list of rows still free after augmenting row reduction.
+    while (k < prvnumfree)
+    {
+      i = free[k];
+      k++;
 
-            }
+    //       find minimum and second minimum reduced cost over columns.
+      umin = assigncost[i][0] - v[0];
+      j1 = 0;
+      usubmin = std::numeric_limits<cost>::max();
+      for (j = 1; j < dim; j++)
+      {
+        h = assigncost[i][j] - v[j];
+        if (h < usubmin){
+          if (h >= umin)
+          {
+            usubmin = h;
+            j2 = j;
+          }
+          else
+          {
+            usubmin = umin;
+            umin = h;
+            j2 = j1;
+            j1 = j;
+          }
         }
-        for(int t=0; t<n; t++){
-            for(int j=0; j<n; j++){
-                costMatrix[t][j]  =getInvCount(e1mapped_reversed[t],e2reversed[j],m,false);
-            }
+      }
+
+      i0 = colsol[j1];
+      if (umin < usubmin){
+    //         change the reduction of the minimum column to increase the minimum
+    //         reduced cost in the row to the subminimum.
+        v[j1] = v[j1] - (usubmin - umin);
+      }
+      else{                   // minimum and subminimum equal.
+        if(i0 > -1)  // minimum column j1 is assigned.
+        {
+    //           swap columns j1 and j2, as j2 may be unassigned.
+          j1 = j2;
+          i0 = colsol[j2];
         }
+      }
 
-        int dist = lap(n,costMatrix, rowsol, colsol, u, v);
-        if(dist<min_dist){min_dist=dist;}
-    } while ( std::next_permutation(mapping,mapping+m) );
-    delete[] mapping;
-    delete[] rowsol;
-    delete[] colsol;
-    delete[] u;
-    delete[] v;
-    for( int i = 0 ; i < n ; i++ )
-    {
-        delete[] costMatrix[i];
-        delete[] e1mapped_reversed[i];
-        delete[] e2reversed[i];
-    }
-    delete[] costMatrix;
-    delete[] e1mapped_reversed;
-    delete[] e2reversed;
-    return min_dist;
-}
+    //       (re-)assign i to j1, possibly de-assigning an i0.
+      rowsol[i] = j1;
+      colsol[j1] = i;
 
-uint8_t getIvCount(int* arr, int n)
-{
-    uint8_t inv_count = 0;
-    for (int i = 0; i < n - 1; i++)
-        for (int j = i + 1; j < n; j++)
-            if (arr[i] > arr[j])
-                inv_count++;
-    return inv_count;
-}
+        if(i0 > -1){  // minimum column j1 assigned earlier.
+            if (umin < usubmin){
+        //           put in current k, and go back to that k.
+        //           continue augmenting path i - j1 with i0.
+                free[--k] = i0;
+            }
+            else{
+        //           no further augmenting reduction possible.
+        //           store i0 in list of free rows for next phase.
+              free[numfree++] = i0;
+            }
+        }
+    }
+  }
+  while (loopcnt < 2);       // repeat once.
+  return numfree;
+}
+
+/*This function is the jv shortest augmenting path algorithm to solve the assignment problem*/
+cost lap(int dim,
+        cost **assigncost,
+        col *rowsol,
+        row *colsol,
+        cost *u,
+        cost *v)
+
+// input:
+// dim        - problem size
+// assigncost - cost matrix
+
+// output:
+// rowsol     - column assigned to row in solution
+// colsol     - row assigned to column in solution
+// u          - dual variables, row reduction numbers
+// v          - dual variables, column reduction numbers
+
+{
+  row  i, imin, numfree = 0, *free;
+  col  j, j1, *matches;
+  // avoid "uninitialized" warning
+  cost min = 9999999;
+
+  free = new row[dim];       // list of unassigned rows.
+  matches = new col[dim];    // counts how many times a row could be assigned.
+
+  // init how many times a row will be assigned in the column reduction.
+  for (i = 0; i < dim; i++)
+    matches[i] = 0;
+
+  // COLUMN REDUCTION
+  for (j = dim;j--;) // reverse order gives better results.
+  {
+    // find minimum cost over rows.
+    min = assigncost[0][j];
+    imin = 0;
+    for (i = 1; i < dim; i++)
+      if (assigncost[i][j] < min)
+      {
+        min = assigncost[i][j];
+        imin = i;
+      }
+    v[j] = min;
+    if (++matches[imin] == 1)
+    {
+      // init assignment if minimum row assigned for first time.
+      rowsol[imin] = j;
+      colsol[j] = imin;
+    }
+    else if(v[j]<v[rowsol[imin]]){
+        int j1 = rowsol[imin];
+        rowsol[imin] = j;
+        colsol[j] = imin;
+        colsol[j1] = -1;
+    }
+    else
+      colsol[j] = -1;        // row already assigned, column not assigned.
+  }
+
+  // REDUCTION TRANSFER
+  for (i = 0; i < dim; i++)
+    if (matches[i] == 0)     // fill list of unassigned 'free' rows.
+      free[numfree++] = i;
+   else
+      if (matches[i] == 1 && dim > 1)   // transfer reduction from rows that are assigned once.
+      {
+        j1 = rowsol[i];
+        min = std::numeric_limits<cost>::max();
+        for (j = 0; j < dim; j++)
+          if (j != j1)
+            if (assigncost[i][j] - v[j] < min)
+              min = assigncost[i][j] - v[j];
+        v[j1] = v[j1] - min;
+      }
+
+  numfree = lap_reduce_rows(dim, assigncost, rowsol, colsol, v, free, numfree);
+
+  cost lapcost = lap_augment(dim, assigncost, rowsol, colsol, u, v, free, numfree);
+
+  // free reserved memory.
+  delete[] free;
+  delete[] matches;
+  return lapcost;
+}
+
+/*Warm-started variant of `lap`: the column prices v and the assignment rowsol of a previous
+  (similar) problem are reused. Each row keeps its previous column if that column still has
+  the minimal reduced cost in the row (and is not taken), the other rows go through the
+  row reduction and augmentation phases.*/
+cost lap_warm(int dim,
+        cost **assigncost,
+        col *rowsol,
+        row *colsol,
+        cost *u,
+        cost *v)
+{
+  row i, numfree = 0, *free;
+  col j;
+  free = new row[dim];
+
+  for (j = 0; j < dim; j++)
+    colsol[j] = -1;
+  for (i = 0; i < dim; i++)
+  {
+    cost umin = assigncost[i][0] - v[0];
+    for (j = 1; j < dim; j++)
+      if (assigncost[i][j] - v[j] < umin)
+        umin = assigncost[i][j] - v[j];
+    j = rowsol[i];
+    if (j >= 0 && j < dim && colsol[j] < 0 && assigncost[i][j] - v[j] == umin)
+      colsol[j] = i;
+    else
+    {
+      rowsol[i] = -1;
+      free[numfree++] = i;
+    }
+  }
+
+  numfree = lap_reduce_rows(dim, assigncost, rowsol, colsol, v, free, numfree);
+  cost lapcost = lap_augment(dim, assigncost, rowsol, colsol, u, v, free, numfree);
+  delete[] free;
+  return lapcost;
+}
+
+uint8_t getIvCount(int* arr, int n)
+{
+    uint8_t inv_count = 0;
+    for (int i = 0; i < n - 1; i++)
+        for (int j = i + 1; j < n; j++)
+            if (arr[i] > arr[j])
+                inv_count++;
+    return inv_count;
+}
 
 uint8_t getIvCountTrunc(int* arr, int n)
 {
@@ -417,10 +444,87 @@ uint8_t getIvCountTrunc(int* arr, int n)
     return inv_count;
 }
 
-int swapDistance_election(int n,int m, const std::vector<std::vector<int>> &el1,
-const std::vector<std::vector<int>> &el2, uint8_t* lookup){
+/*Number of set bits of all 16-bit masks (the builtin is not a single instruction
+  unless the target supports it)*/
+struct PopcountTable {
+    uint8_t bits[1 << 16];
+    PopcountTable() {
+        bits[0] = 0;
+        for (int mask = 1; mask < (1 << 16); mask++) { bits[mask] = bits[mask >> 1] + (mask & 1); }
+    }
+};
+static const PopcountTable popcount_table;
+
+/*Number of set bits of a 64-bit mask, by 16-bit chunks (portable across compilers)*/
+inline int popcount64(uint64_t mask)
+{
+    return popcount_table.bits[mask & 0xFFFF] + popcount_table.bits[(mask >> 16) & 0xFFFF]
+        + popcount_table.bits[(mask >> 32) & 0xFFFF] + popcount_table.bits[mask >> 48];
+}
+
+/*Factorials that fit in size_t*/
+struct FactorialTable {
+    size_t values[21];
+    FactorialTable() {
+        values[0] = 1;
+        for (int i = 1; i < 21; i++) { values[i] = values[i - 1] * i; }
+    }
+};
+static const FactorialTable factorial_table;
+
+/*Lexicographic rank (Lehmer code) of a permutation of 0..m-1, in 0..m!-1*/
+size_t permutation_rank(const int* perm, int m)
+{
+    // the terms are independent, so that they are not serialized by a Horner scheme
+    const size_t* factorial = factorial_table.values + m - 1;
+    size_t rank = 0;
+    if (m <= 16) {
+        uint32_t seen = 0;
+        for (int i = 0; i < m - 1; i++) {
+            rank += (perm[i] - popcount_table.bits[seen & ((1U << perm[i]) - 1)]) * factorial[-i];
+            seen |= 1U << perm[i];
+        }
+        return rank;
+    }
+    uint64_t seen = 0;
+    for (int i = 0; i < m - 1; i++) {
+        rank += (perm[i] - popcount64(seen & ((1ULL << perm[i]) - 1))) * factorial[-i];
+        seen |= 1ULL << perm[i];
+    }
+    return rank;
+}
+
+/*Lookup table (indexed by the rank of a permutation) with the number of swaps
+  of the permutation; built once per m (and variant) and kept for the process*/
+const uint8_t* swap_lookup(int m, bool truncated)
+{
+    static std::mutex lookup_mutex;
+    static std::map<std::pair<int, bool>, std::vector<uint8_t>> lookups;
+
+    std::lock_guard<std::mutex> lock(lookup_mutex);
+    std::vector<uint8_t> & lookup = lookups[std::make_pair(m, truncated)];
+    if (lookup.empty()) {
+        size_t size = 1;
+        for (int i = 2; i <= m; i++) { size *= i; }
+        lookup.resize(size);
+
+        std::vector<int> mapping(m);
+        for(int i=0; i<m; i++){mapping[i]=i;}
+        // permutations are enumerated in lexicographic order, i.e., by increasing rank
+        size_t id = 0;
+        do {
+            lookup[id++] = truncated ? getIvCountTrunc(mapping.data(), m)
+                                     : getIvCount(mapping.data(), m);
+        } while ( std::next_permutation(mapping.begin(), mapping.end()) );
+    }
+    return lookup.data();
+}
+
+template <typename T1, typename T2>
+int swapDistance_election(int n, int m, VotesOf<T1> el1, VotesOf<T2> el2, const uint8_t* lookup){
     int min_dist=2*m*m*n;
     int* mapping = new int [m];
+    int* votecomb = new int [m];
     col *rowsol;
     row *colsol;
     cost *u;
@@ -435,43 +539,25 @@ const std::vector<std::vector<int>> &el2, uint8_t* lookup){
         costMatrix[t]  =  new int[n];
     }
     int** e1mapped_reversed;
-    int** e2;
     e1mapped_reversed = new int*[n];
-    e2 = new int*[n];
-    int votecomb = 0;
     for(int t=0;t<n;t++){
         e1mapped_reversed[t]  =  new int[m];
-        e2[t]  =  new int[m];
     }
     for(int i=0; i<m; i++){mapping[i]=i;}
     do {
         for(int t=0; t<n; t++) {
             for (int j = 0; j < m; j++) {
                 e1mapped_reversed[t][mapping[el1[t][j]]] = j;
-                e2[t][j]=el2[t][j];
             }
         }
-//
+
         for(int t=0; t<n; t++){
             for(int j=0; j<n; j++){
-                switch (m) {
-                    case 10: votecomb=e1mapped_reversed[t][e2[j][0]]*100000000+e1mapped_reversed[t][e2[j][1]]*10000000+e1mapped_reversed[t][e2[j][2]]*1000000+
-                                      e1mapped_reversed[t][e2[j][3]]*100000+e1mapped_reversed[t][e2[j][4]]*10000+e1mapped_reversed[t][e2[j][5]]*1000+e1mapped_reversed[t][e2[j][6]]*100+e1mapped_reversed[t][e2[j][7]]*10+e1mapped_reversed[t][e2[j][8]];break;
-                    case 9: votecomb=e1mapped_reversed[t][e2[j][0]]*10000000+e1mapped_reversed[t][e2[j][1]]*1000000+e1mapped_reversed[t][e2[j][2]]*100000+
-                                     e1mapped_reversed[t][e2[j][3]]*10000+e1mapped_reversed[t][e2[j][4]]*1000+e1mapped_reversed[t][e2[j][5]]*100+e1mapped_reversed[t][e2[j][6]]*10+e1mapped_reversed[t][e2[j][7]];break;      //execution starts at this case label
-                    case 8: votecomb=e1mapped_reversed[t][e2[j][0]]*1000000+e1mapped_reversed[t][e2[j][1]]*100000+e1mapped_reversed[t][e2[j][2]]*10000+
-                                     e1mapped_reversed[t][e2[j][3]]*1000+e1mapped_reversed[t][e2[j][4]]*100+e1mapped_reversed[t][e2[j][5]]*10+e1mapped_reversed[t][e2[j][6]];break;
-                    case 7: votecomb=e1mapped_reversed[t][e2[j][0]]*100000+e1mapped_reversed[t][e2[j][1]]*10000+e1mapped_reversed[t][e2[j][2]]*1000+
-                                    e1mapped_reversed[t][e2[j][3]]*100+e1mapped_reversed[t][e2[j][4]]*10+e1mapped_reversed[t][e2[j][5]];break;
-                    case 6: votecomb=e1mapped_reversed[t][e2[j][0]]*10000+e1mapped_reversed[t][e2[j][1]]*1000+e1mapped_reversed[t][e2[j][2]]*100+
-                                     e1mapped_reversed[t][e2[j][3]]*10+e1mapped_reversed[t][e2[j][4]];break;
-                    case 5: votecomb=e1mapped_reversed[t][e2[j][0]]*1000+e1mapped_reversed[t][e2[j][1]]*100+e1mapped_reversed[t][e2[j][2]]*10+
-                                     e1mapped_reversed[t][e2[j][3]];break;
-                    case 4: votecomb=e1mapped_reversed[t][e2[j][0]]*100+e1mapped_reversed[t][e2[j][1]]*10+e1mapped_reversed[t][e2[j][2]];break;
-                    case 3: votecomb=e1mapped_reversed[t][e2[j][0]]*10+e1mapped_reversed[t][e2[j][1]];break;
+                // positions (in the mapped vote t) of the candidates ranked by vote j
+                for (int k = 0; k < m; k++) {
+                    votecomb[k] = e1mapped_reversed[t][el2[j][k]];
                 }
-
-                costMatrix[t][j]=lookup[votecomb];
+                costMatrix[t][j]=lookup[permutation_rank(votecomb, m)];
             }
         }
 
@@ -479,6 +565,7 @@ const std::vector<std::vector<int>> &el2, uint8_t* lookup){
         if(dist<min_dist){min_dist=dist;}
     } while ( std::next_permutation(mapping,mapping+m) );
     delete[] mapping;
+    delete[] votecomb;
     delete[] rowsol;
     delete[] colsol;
     delete[] u;
@@ -487,192 +574,679 @@ const std::vector<std::vector<int>> &el2, uint8_t* lookup){
     {
         delete[] costMatrix[i];
         delete[] e1mapped_reversed[i];
-        delete[] e2[i];
     }
     delete[] costMatrix;
     delete[] e1mapped_reversed;
-    delete[] e2;
 
     return min_dist;
 }
 
-int tswapDistance_election(int n, int m, const std::vector<std::vector<int>> &el1,
-    const std::vector<std::vector<int>> &el2, uint8_t* lookup, uint8_t* lookup_trunc){
-    // e1 should be smaller, e2 should be larger
-    int min_dist=2*m*m*n;
-    int* mapping = new int [m];
-    col *rowsol;
-    row *colsol;
-    cost *u;
-    cost *v;
-    rowsol = new col[n];
-    colsol = new row[n];
-    u = new cost[n];
-    v = new cost[n];
-    int** costMatrix;
-    costMatrix = new int*[n];
-    for(int t=0;t<n;t++){
-        costMatrix[t]  =  new int[n];
+template <typename T>
+int tswapDistance_election(int n, int m, VotesOf<T> el1, VotesOf<T> el2, const uint8_t* lookup_trunc){
+    // e1 should be smaller, e2 should be larger;
+    // the votes of e1 are extended with the missing candidates
+    int m1 = el1.width;
+    std::vector<int32_t> el1_ext((size_t) n * m);
+
+    for(int t=0; t<n; t++) {
+        for (int j = 0; j < m1; j++) {
+            el1_ext[(size_t) t * m + j] = el1[t][j];
+        }
+        for (int j = m1; j < m; j++) {
+            el1_ext[(size_t) t * m + j] = j;
+        }
     }
-    int** e1mapped_reversed;
-    int** e2;
-    e1mapped_reversed = new int*[n];
-    e2 = new int*[n];
-    int votecomb = 0;
-    for(int t=0;t<n;t++){
-        e1mapped_reversed[t]  =  new int[m];
-        e2[t]  =  new int[m];
+
+    return swapDistance_election(n, m, Votes{el1_ext.data(), m}, el2, lookup_trunc);
+}
+
+/*Exact isomorphic swap / Spearman distance computed by a branch and bound search
+  over partial mappings of the candidates (instead of enumerating all m! mappings).
+
+  For a partial mapping, each entry of the voter cost matrix is bounded from below by
+  the cost of the mapped candidates (swaps between pairs of mapped candidates, or
+  displacements of mapped candidates) plus a bound for the rest: the Spearman cost of
+  the unmapped candidates is at least the cost of matching their sorted positions, and
+  each mapped candidate is in at least |alpha - beta| swaps with unmapped ones, where
+  alpha and beta count the unmapped candidates above it in the two votes. The optimal
+  voter matching for these bounds is a lower bound for every completion, so subtrees
+  whose bound is not smaller than the incumbent are pruned. The incumbent is seeded by
+  an alternating voter/candidate assignment heuristic followed by pairwise exchanges.
+
+  Only the cost of the mapped candidates of the current node is kept (it is updated in
+  place when descending and restored when backtracking). The voter matching of a child
+  is warm-started from the column prices and assignment of its parent, whose bound
+  matrix differs only slightly. Before that, children are
+  pruned by the (much cheaper) positionwise bound of the partial mapping: the cost of
+  the mapped candidates plus an optimal matching of the unmapped ones, where matching
+  two candidates costs the EMD between their position distributions.
+
+  With a time budget, the search stops when the budget is exhausted; then `best` is an
+  upper bound and `lower` a certified lower bound (the smallest bound of the unexplored
+  subtrees, or the positionwise bound: the isomorphic Spearman distance is at least the
+  positionwise distance with the EMD inner distance, and the swap distance is at least
+  half of the Spearman distance).
+
+  The swap variant also accepts votes of the first election over fewer candidates (m1 <
+  m): they are treated as truncated votes, in which the m - m1 candidates of the second
+  election that are not mapped to are tied below all ranked candidates, and pairs of
+  two such (missing) candidates are not counted. Then a mapped candidate with alpha and
+  beta unmapped candidates above it is in at least beta - alpha swaps if alpha <=
+  min(beta, r) and otherwise in alpha + beta - 2 min(beta, r) (r unmapped candidates of
+  the first election remain; the others of the second one are missing). There is no
+  positionwise bound for truncated votes.*/
+template <typename T>
+class IsomorphicSearch {
+public:
+    int best;
+    int lower;
+    std::vector<int> best_mapping;
+
+    IsomorphicSearch(int n, int m, VotesOf<T> el1, VotesOf<T> el2, bool is_swap)
+        : n(n), m(m), m1(el1.width), el1(el1), el2(el2), is_swap(is_swap),
+          pos1((size_t) n * el1.width), pos2((size_t) n * m), mapping(el1.width, -1),
+          inverse(m, -1), assigned(el1.width), partial((size_t) n * n, 0),
+          bound((size_t) n * n), extra((size_t) n * n), helper1((size_t) n * m),
+          helper2((size_t) n * m), rows(max(n, m)), rowsol(max(n, m)), colsol(max(n, m)),
+          u(max(n, m)), v(max(n, m)), node_rowsol(el1.width + 1, std::vector<int>(n)),
+          node_v(el1.width + 1, std::vector<int>(n)), warm_rowsol(n), warm_v(n), warm_colsol(n),
+          warm_u(n),
+          positionwise_costs((size_t) m * m), lookup(nullptr) {
+        for (int t = 0; t < n; t++) {
+            for (int p = 0; p < m1; p++) { pos1[(size_t) t * m1 + el1[t][p]] = p; }
+            for (int p = 0; p < m; p++) { pos2[(size_t) t * m + el2[t][p]] = p; }
+        }
+        if (m1 == m) {
+            compute_positionwise_costs();
+        }
+        if (is_swap && m1 <= 10) {
+            lookup = swap_lookup(m1, false);
+        }
+        best = std::numeric_limits<int>::max();
+        lower = 0;
+        has_deadline = false;
     }
-    std::vector<std::vector<int>> el1_ext(n, std::vector<int>(8, 0));
 
-    for(int t=0; t<n; t++) {
-        for (int j = 0; j < 4; j++) {
-            el1_ext[t][j] = el1[t][j];
+    int solve() {
+        heuristic();
+        lower = m1 == m ? positionwise_bound() : 0;
+        if (lower < best && !out_of_time()) {
+            lower = max(lower, min(best, search(0, init_root())));
         }
-        for (int j = 4; j < 8; j++) {
-            el1_ext[t][j] = j;
+        return best;
+    }
+
+    /*Anytime variant of `solve`, limited to the given number of seconds*/
+    int solve(double time_budget) {
+        has_deadline = true;
+        deadline = std::chrono::steady_clock::now()
+            + std::chrono::duration_cast<std::chrono::steady_clock::duration>(
+                std::chrono::duration<double>(time_budget));
+        return solve();
+    }
+
+    /*Lower bound: the optimal candidate matching for the EMD between position distributions*/
+    int positionwise_bound() {
+        std::vector<int> costs(positionwise_costs);
+        int spearman = lap_value(costs, m);
+        return is_swap ? (spearman + 1) / 2 : spearman;
+    }
+
+    /*Cost of the optimal voter matching for a complete candidate mapping; if the time
+      runs out meanwhile, the cost of the identity voter matching (an upper bound)*/
+    int evaluate(const std::vector<int> & candidate_mapping) {
+        std::vector<int> candidate_inverse(m, -1);
+        for (int c = 0; c < m1; c++) { candidate_inverse[candidate_mapping[c]] = c; }
+        std::vector<int> votecomb(m1);
+        auto voter_cost = [&](int t, int j) {
+            const int* p1 = &pos1[(size_t) t * m1];
+            int value = 0;
+            if (is_swap) {
+                // positions (in vote t) of the candidates ranked by vote j; each missing
+                // candidate is swapped with all the mapped candidates below it in vote j
+                int missing = 0, length = 0;
+                for (int k = 0; k < m; k++) {
+                    int c = candidate_inverse[el2[j][k]];
+                    if (c < 0) { missing++; } else { value += missing; votecomb[length++] = p1[c]; }
+                }
+                if (lookup != nullptr) {
+                    value += lookup[permutation_rank(votecomb.data(), m1)];
+                } else {
+                    for (int k = 0; k < m1 - 1; k++)
+                        for (int l = k + 1; l < m1; l++)
+                            if (votecomb[k] > votecomb[l]) { value++; }
+                }
+            } else {
+                const int* p2 = &pos2[(size_t) j * m];
+                for (int c = 0; c < m; c++) { value += abs(p1[c] - p2[candidate_mapping[c]]); }
+            }
+            return value;
+        };
+        for (int t = 0; t < n; t++) {
+            if (out_of_time()) {
+                int value = 0;
+                for (int s = 0; s < n; s++) { value += s < t ? bound[(size_t) s * n + s] : voter_cost(s, s); }
+                return value;
+            }
+            for (int j = 0; j < n; j++) { bound[(size_t) t * n + j] = voter_cost(t, j); }
         }
+        return lap_value(bound, n);
     }
 
-    for(int i=0; i<m; i++){mapping[i]=i;}
-    do {
-        for(int t=0; t<n; t++) {
-            for (int j = 0; j < m; j++) {
-                e1mapped_reversed[t][mapping[el1_ext[t][j]]] = j;
-                e2[t][j]=el2[t][j];
+private:
+    // numbers of candidates of the second and of the first election (m1 <= m)
+    int n, m, m1;
+    VotesOf<T> el1, el2;
+    bool is_swap;
+    std::vector<int> pos1, pos2;
+    std::vector<int> mapping, inverse, assigned;
+    // cost of the mapped candidates of the current node for each pair of voters
+    std::vector<int> partial;
+    std::vector<int> bound, extra, helper1, helper2;
+    std::vector<int*> rows;
+    std::vector<int> rowsol, colsol, u, v;
+    // voter matching (assignment and column prices) of the nodes on the current path
+    std::vector<std::vector<int>> node_rowsol, node_v;
+    std::vector<int> warm_rowsol, warm_v, warm_colsol, warm_u;
+    std::vector<int> positionwise_costs;
+    const uint8_t* lookup;
+    bool has_deadline;
+    std::chrono::steady_clock::time_point deadline;
+
+    bool out_of_time() {
+        return has_deadline && std::chrono::steady_clock::now() >= deadline;
+    }
+
+    int lap_value(std::vector<int> & matrix, int dim) {
+        for (int t = 0; t < dim; t++) { rows[t] = matrix.data() + (size_t) t * dim; }
+        return lap(dim, rows.data(), rowsol.data(), colsol.data(), u.data(), v.data());
+    }
+
+    /*EMD between the position distributions of each pair of candidates*/
+    void compute_positionwise_costs() {
+        std::vector<int> sorted1((size_t) m * n), sorted2((size_t) m * n);
+        for (int c = 0; c < m; c++) {
+            for (int t = 0; t < n; t++) {
+                sorted1[(size_t) c * n + t] = pos1[(size_t) t * m + c];
+                sorted2[(size_t) c * n + t] = pos2[(size_t) t * m + c];
             }
+            std::sort(sorted1.begin() + (size_t) c * n, sorted1.begin() + (size_t) (c + 1) * n);
+            std::sort(sorted2.begin() + (size_t) c * n, sorted2.begin() + (size_t) (c + 1) * n);
         }
-//
-
-//    for(int t=0; t<el1[0].size(); t++){
-//        cout << el1[0][t] << ' ';
-//    } cout << endl;
-//
-//    for(int t=0; t<el1_ext[0].size(); t++){
-//        cout << el1_ext[0][t] << ' ';
-//    } cout << endl;
-//
-//    for(int t=0; t<el2[0].size(); t++){
-//        cout << el2[0][t]  << ' ';
-//    } cout << endl;
+        for (int c = 0; c < m; c++) {
+            for (int d = 0; d < m; d++) {
+                int value = 0;
+                for (int t = 0; t < n; t++) {
+                    value += abs(sorted1[(size_t) c * n + t] - sorted2[(size_t) d * n + t]);
+                }
+                positionwise_costs[(size_t) c * m + d] = value;
+            }
+        }
+    }
 
-        for(int t=0; t<n; t++){
-            for(int j=0; j<n; j++){
-                switch (m) {
-                    case 10: votecomb=e1mapped_reversed[t][e2[j][0]]*100000000+e1mapped_reversed[t][e2[j][1]]*10000000+e1mapped_reversed[t][e2[j][2]]*1000000+
-                                      e1mapped_reversed[t][e2[j][3]]*100000+e1mapped_reversed[t][e2[j][4]]*10000+e1mapped_reversed[t][e2[j][5]]*1000+e1mapped_reversed[t][e2[j][6]]*100+e1mapped_reversed[t][e2[j][7]]*10+e1mapped_reversed[t][e2[j][8]];break;
-                    case 9: votecomb=e1mapped_reversed[t][e2[j][0]]*10000000+e1mapped_reversed[t][e2[j][1]]*1000000+e1mapped_reversed[t][e2[j][2]]*100000+
-                                     e1mapped_reversed[t][e2[j][3]]*10000+e1mapped_reversed[t][e2[j][4]]*1000+e1mapped_reversed[t][e2[j][5]]*100+e1mapped_reversed[t][e2[j][6]]*10+e1mapped_reversed[t][e2[j][7]];break;      //execution starts at this case label
-                    case 8: votecomb=e1mapped_reversed[t][e2[j][0]]*1000000+e1mapped_reversed[t][e2[j][1]]*100000+e1mapped_reversed[t][e2[j][2]]*10000+
-                                     e1mapped_reversed[t][e2[j][3]]*1000+e1mapped_reversed[t][e2[j][4]]*100+e1mapped_reversed[t][e2[j][5]]*10+e1mapped_reversed[t][e2[j][6]];break;
-                    case 7: votecomb=e1mapped_reversed[t][e2[j][0]]*100000+e1mapped_reversed[t][e2[j][1]]*10000+e1mapped_reversed[t][e2[j][2]]*1000+
-                                    e1mapped_reversed[t][e2[j][3]]*100+e1mapped_reversed[t][e2[j][4]]*10+e1mapped_reversed[t][e2[j][5]];break;
-                    case 6: votecomb=e1mapped_reversed[t][e2[j][0]]*10000+e1mapped_reversed[t][e2[j][1]]*1000+e1mapped_reversed[t][e2[j][2]]*100+
-                                     e1mapped_reversed[t][e2[j][3]]*10+e1mapped_reversed[t][e2[j][4]];break;
-                    case 5: votecomb=e1mapped_reversed[t][e2[j][0]]*1000+e1mapped_reversed[t][e2[j][1]]*100+e1mapped_reversed[t][e2[j][2]]*10+
-                                     e1mapped_reversed[t][e2[j][3]];break;
-                    case 4: votecomb=e1mapped_reversed[t][e2[j][0]]*100+e1mapped_reversed[t][e2[j][1]]*10+e1mapped_reversed[t][e2[j][2]];break;
-                    case 3: votecomb=e1mapped_reversed[t][e2[j][0]]*10+e1mapped_reversed[t][e2[j][1]];break;
+    /*Positionwise bound of the child mapping candidate c (= depth) to d (0 for truncated
+      votes)*/
+    int positionwise_child_bound(int depth, int c, int d) {
+        if (m1 < m) { return 0; }
+        int value = positionwise_costs[(size_t) c * m + d];
+        for (int k = 0; k < depth; k++) {
+            value += positionwise_costs[(size_t) assigned[k] * m + mapping[assigned[k]]];
+        }
+        int remaining = m - depth - 1;
+        if (remaining > 0) {
+            std::vector<int> costs;
+            costs.reserve((size_t) remaining * remaining);
+            for (int a = c + 1; a < m; a++) {
+                for (int b = 0; b < m; b++) {
+                    if (inverse[b] < 0 && b != d) { costs.push_back(positionwise_costs[(size_t) a * m + b]); }
                 }
+            }
+            value += lap_value(costs, remaining);
+        }
+        return is_swap ? (value + 1) / 2 : value;
+    }
 
-                costMatrix[t][j]=lookup_trunc[votecomb];
+    /*Solves the voter matching of the root (no candidate mapped) from scratch.
+      Return: the bound of the root*/
+    int init_root() {
+        completion(0);
+        int value = lap_value(extra, n);
+        std::copy(rowsol.begin(), rowsol.begin() + n, node_rowsol[0].begin());
+        std::copy(v.begin(), v.begin() + n, node_v[0].begin());
+        return value;
+    }
 
+    /*Adds (sign = 1) or subtracts (sign = -1) the cost of the candidate mapped at the
+      given depth (to d) for each pair of voters to the partial costs, into target*/
+    void increment(int depth, int c, int d, std::vector<int> & target, int sign = 1) {
+        const std::vector<int> & parent = partial;
+        std::vector<int> & child = target;
+        // per-voter features, so that the inner loop over the voters of el2 is contiguous
+        int* f1 = helper1.data();
+        int* f2 = helper2.data();
+        for (int t = 0; t < n; t++) {
+            const int* p1 = &pos1[(size_t) t * m1];
+            const int* p2 = &pos2[(size_t) t * m];
+            if (is_swap) {
+                // which of the (at most 16) already mapped candidates are below c (resp. d)
+                int mask1 = 0, mask2 = 0;
+                for (int k = 0; k < depth && k < 16; k++) {
+                    int a = assigned[k];
+                    mask1 |= (p1[c] < p1[a]) << k;
+                    mask2 |= (p2[d] < p2[mapping[a]]) << k;
+                }
+                f1[t] = mask1;
+                f2[t] = mask2;
+            } else {
+                f1[t] = p1[c];
+                f2[t] = p2[d];
+            }
+        }
+        for (int t = 0; t < n; t++) {
+            const int* parent_row = &parent[(size_t) t * n];
+            int* child_row = &child[(size_t) t * n];
+            int x = f1[t];
+            if (!is_swap) {
+                for (int j = 0; j < n; j++) { child_row[j] = parent_row[j] + sign * abs(x - f2[j]); }
+            } else if (depth <= 16) {
+                for (int j = 0; j < n; j++) {
+                    child_row[j] = parent_row[j] + sign * popcount_table.bits[x ^ f2[j]];
+                }
+            } else {
+                const int* p1 = &pos1[(size_t) t * m1];
+                for (int j = 0; j < n; j++) {
+                    const int* p2 = &pos2[(size_t) j * m];
+                    int delta = 0;
+                    for (int k = 0; k < depth; k++) {
+                        int a = assigned[k];
+                        delta += (p1[c] < p1[a]) != (p2[d] < p2[mapping[a]]);
+                    }
+                    child_row[j] = parent_row[j] + sign * delta;
+                }
+            }
+        }
+    }
 
+    /*Lower bound on the cost of the unmapped candidates for each pair of voters*/
+    void completion(int num_assigned) {
+        int remaining = m1 - num_assigned;
+        if (remaining == 0 && m1 == m) {
+            std::fill(extra.begin(), extra.end(), 0);
+            return;
+        }
+        // helper1 is stored per voter of el1, helper2 transposed (per feature, then voter)
+        for (int t = 0; t < n; t++) {
+            int* h1 = &helper1[(size_t) t * m];
+            int count1 = 0, count2 = 0;
+            for (int p = 0; p < m1; p++) {
+                int a = el1[t][p];
+                if (is_swap) {
+                    // number of unmapped candidates above each mapped one
+                    if (mapping[a] < 0) { count1++; } else { h1[a] = count1; }
+                } else if (mapping[a] < 0) {
+                    // sorted positions of the unmapped candidates
+                    h1[count1++] = p;
+                }
+            }
+            for (int p = 0; p < m; p++) {
+                int d = el2[t][p];
+                if (is_swap) {
+                    if (inverse[d] < 0) { count2++; } else { helper2[(size_t) inverse[d] * n + t] = count2; }
+                } else if (inverse[d] < 0) {
+                    helper2[(size_t) (count2++) * n + t] = p;
+                }
             }
         }
+        int num_features = is_swap ? num_assigned : remaining;
+        for (int t = 0; t < n; t++) {
+            const int* h1 = &helper1[(size_t) t * m];
+            int* row = &extra[(size_t) t * n];
+            std::fill(row, row + n, 0);
+            for (int k = 0; k < num_features; k++) {
+                int feature = is_swap ? assigned[k] : k;
+                int x = h1[feature];
+                const int* h2 = &helper2[(size_t) feature * n];
+                if (m1 == m) {
+                    for (int j = 0; j < n; j++) { row[j] += abs(x - h2[j]); }
+                } else {
+                    for (int j = 0; j < n; j++) {
+                        int most = min(h2[j], remaining);
+                        row[j] += x <= most ? h2[j] - x : x + h2[j] - 2 * most;
+                    }
+                }
+            }
+        }
+    }
 
-        int dist = lap(n,costMatrix, rowsol, colsol, u, v);
-        if(dist<min_dist){min_dist=dist;}
-    } while ( std::next_permutation(mapping,mapping+m) );
-    delete[] mapping;
-    delete[] rowsol;
-    delete[] colsol;
-    delete[] u;
-    delete[] v;
-    for( int i = 0 ; i < n ; i++ )
-    {
-        delete[] costMatrix[i];
-        delete[] e1mapped_reversed[i];
-        delete[] e2[i];
+    void assign(int depth, int c, int d) {
+        mapping[c] = d;
+        inverse[d] = c;
+        assigned[depth] = c;
     }
-    delete[] costMatrix;
-    delete[] e1mapped_reversed;
-    delete[] e2;
 
-    return min_dist;
-}
+    void unassign(int c) {
+        inverse[mapping[c]] = -1;
+        mapping[c] = -1;
+    }
 
+    /*Voter matching for the bounds (in bound, without the completion) of a node whose
+      candidate at depth - 1 is mapped, warm-started from its parent; the matching is
+      written to solution and prices*/
+    int warm_bound(int depth, std::vector<int> & solution, std::vector<int> & prices) {
+        completion(depth);
+        for (size_t k = 0; k < bound.size(); k++) { bound[k] += extra[k]; }
+        for (int t = 0; t < n; t++) { rows[t] = bound.data() + (size_t) t * n; }
+        std::copy(node_rowsol[depth - 1].begin(), node_rowsol[depth - 1].end(), solution.begin());
+        std::copy(node_v[depth - 1].begin(), node_v[depth - 1].end(), prices.begin());
+        return lap_warm(n, rows.data(), solution.data(), warm_colsol.data(), warm_u.data(),
+                        prices.data());
+    }
 
-uint8_t* prec_map(int m){
-    uint8_t* swap_lookup = new uint8_t[999999999];
-    int* mapping = new int [m];
-    for(int i=0; i<m; i++){mapping[i]=i;}
-    do {
-        uint32_t id=0;
-        for(int t=0; t<m-1; t++) {
-            id=id+mapping[t]*pow(10,m-t-2);
+    int child_bound(int depth, int c, int d) {
+        increment(depth, c, d, bound);
+        assign(depth, c, d);
+        int value = warm_bound(depth + 1, warm_rowsol, warm_v);
+        unassign(c);
+        return value;
+    }
+
+    /*Searches the subtree of the current node (whose bound is node_bound). Return: lower
+      bound on the subtrees left unexplored (when out of time), or the maximal int if the
+      whole subtree was explored or pruned*/
+    int search(int depth, int node_bound) {
+        // the candidates are mapped in their natural order
+        int c = depth;
+        std::vector<std::pair<int, int>> children;
+        for (int d = 0; d < m; d++) {
+            if (out_of_time()) { return node_bound; }
+            if (inverse[d] < 0 && positionwise_child_bound(depth, c, d) < best) {
+                children.push_back(std::make_pair(child_bound(depth, c, d), d));
+            }
         }
-       swap_lookup[id]=getIvCount(mapping, m);
-    } while ( std::next_permutation(mapping,mapping+m) );
+        std::sort(children.begin(), children.end());
 
-    delete mapping;
-    return swap_lookup;
-}
+        int unexplored = std::numeric_limits<int>::max();
+        for (const std::pair<int, int> & child : children) {
+            if (child.first >= best) { break; }
+            if (out_of_time()) { return min(unexplored, child.first); }
+            int d = child.second;
+            if (depth + 1 == m1) {
+                // all candidates are mapped, so the bound is exact
+                best = child.first;
+                best_mapping = mapping;
+                best_mapping[c] = d;
+                break;
+            }
+            // the matching of the child is solved again rather than kept for all children
+            increment(depth, c, d, bound);
+            assign(depth, c, d);
+            warm_bound(depth + 1, node_rowsol[depth + 1], node_v[depth + 1]);
+            increment(depth, c, d, partial);
+            unexplored = min(unexplored, search(depth + 1, child.first));
+            unassign(c);
+            increment(depth, c, d, partial, -1);
+        }
+        return unexplored;
+    }
 
-uint8_t* prec_map_trunc(int m){
-    uint8_t* swap_lookup = new uint8_t[999999999];
+    /*Alternating voter/candidate assignment followed by pairwise exchanges (for truncated
+      votes, the missing candidates are placed in the middle of the bottom positions)*/
+    void heuristic() {
+        std::vector<std::pair<long, int>> order1(m1), order2(m);
+        for (int c = 0; c < m; c++) {
+            long sum1 = 0, sum2 = 0;
+            for (int t = 0; t < n; t++) {
+                if (c < m1) { sum1 += pos1[(size_t) t * m1 + c]; }
+                sum2 += pos2[(size_t) t * m + c];
+            }
+            if (c < m1) { order1[c] = std::make_pair(sum1, c); }
+            order2[c] = std::make_pair(sum2, c);
+        }
+        std::sort(order1.begin(), order1.end());
+        std::sort(order2.begin(), order2.end());
+        std::vector<int> current(m1);
+        for (int k = 0; k < m1; k++) { current[order1[k].second] = order2[k].second; }
+        best = evaluate(current);
+        best_mapping = current;
 
-    int* mapping = new int [m];
-    for(int i=0; i<m; i++){mapping[i]=i;}
-    do {
-        uint32_t id=0;
-        for(int t=0; t<m-1; t++) {
-            id=id+mapping[t]*pow(10,m-t-2);
+        std::vector<int> candidate_costs((size_t) m * m);
+        for (int iteration = 0; iteration < 20 && !out_of_time(); iteration++) {
+            evaluate(best_mapping);
+            if (out_of_time()) { break; }
+            std::vector<int> voters(rowsol.begin(), rowsol.begin() + n);
+            std::fill(candidate_costs.begin(), candidate_costs.end(), 0);
+            int missing_position = m1 + (m - m1 - 1) / 2;
+            for (int t = 0; t < n; t++) {
+                const int* p1 = &pos1[(size_t) t * m1];
+                const int* p2 = &pos2[(size_t) voters[t] * m];
+                for (int c = 0; c < m; c++) {
+                    int x = c < m1 ? p1[c] : missing_position;
+                    for (int d = 0; d < m; d++)
+                        candidate_costs[(size_t) c * m + d] += abs(x - p2[d]);
+                }
+            }
+            lap_value(candidate_costs, m);
+            current.assign(rowsol.begin(), rowsol.begin() + m1);
+            int value = evaluate(current);
+            if (value >= best) { break; }
+            best = value;
+            best_mapping = current;
         }
-       swap_lookup[id]=getIvCountTrunc(mapping, m);
-    } while ( std::next_permutation(mapping,mapping+m) );
-    delete mapping;
 
-    return swap_lookup;
+        bool improved = true;
+        for (int round = 0; improved && round < 3 && !out_of_time(); round++) {
+            improved = false;
+            for (int a = 0; a < m1 && !out_of_time(); a++) {
+                for (int b = a + 1; b < m && !out_of_time(); b++) {
+                    // b >= m1 exchanges the image of a with a missing candidate
+                    std::vector<int> images(best_mapping);
+                    for (int d = 0; d < m; d++) {
+                        if (std::find(best_mapping.begin(), best_mapping.end(), d) == best_mapping.end()) {
+                            images.push_back(d);
+                        }
+                    }
+                    std::swap(images[a], images[b]);
+                    current.assign(images.begin(), images.begin() + m1);
+                    int value = evaluate(current);
+                    if (value < best) {
+                        best = value;
+                        best_mapping = current;
+                        improved = true;
+                    }
+                }
+            }
+        }
+    }
+};
+
+template <typename T>
+int swapDistance_bnb(int n, int m, VotesOf<T> el1, VotesOf<T> el2){
+    IsomorphicSearch<T> search(n, m, el1, el2, true);
+    return search.solve();
+}
+
+template <typename T>
+int spearDistance_election(int n, int m, VotesOf<T> el1, VotesOf<T> el2){
+    IsomorphicSearch<T> search(n, m, el1, el2, false);
+    return search.solve();
+}
+
+/*Truncated swap distance (see IsomorphicSearch); the election with fewer candidates
+  is the truncated one*/
+template <typename T>
+int truncated_swapDistance(int n, VotesOf<T> el1, VotesOf<T> el2){
+    if (el1.width > el2.width) { std::swap(el1, el2); }
+    IsomorphicSearch<T> search(n, el2.width, el1, el2, true);
+    return search.solve();
+}
+
+/*Return: upper bound, certified lower bound, and the candidate mapping of the upper bound*/
+template <typename T>
+std::tuple<int, int, std::vector<int>> swapDistance_approx(int n, int m, VotesOf<T> el1,
+                                                           VotesOf<T> el2, double time_budget){
+    IsomorphicSearch<T> search(n, m, el1, el2, true);
+    search.solve(time_budget);
+    return std::make_tuple(search.best, search.lower, search.best_mapping);
+}
+
+/*Votes are accepted as C-contiguous int8, int16 or int32 arrays (the types of the
+  compact votes of the elections) without copying; other objects are converted to int32*/
+typedef py::array_t<int32_t, py::array::c_style | py::array::forcecast> VotesArray;
+template <typename T>
+using CompactVotesArray = py::array_t<T, py::array::c_style>;
+typedef py::array_t<int64_t, py::array::c_style | py::array::forcecast> PairsArray;
+
+template <typename Array>
+VotesOf<typename Array::value_type> votes_view(const Array & votes){
+  if (votes.ndim() != 2) {
+    throw py::value_error("Votes must be a two-dimensional array.");
+  }
+  return VotesOf<typename Array::value_type>{votes.data(), (int) votes.shape(1)};
+}
+
+template <typename Array>
+int compute_swap(const Array & elc1, const Array & elc2){
+  auto el1 = votes_view(elc1), el2 = votes_view(elc2);
+  int mm = el2.width;
+  int nn = elc1.shape(0);
+  py::gil_scoped_release release;
+  return swapDistance_bnb(nn, mm, el1, el2);
+}
+
+template <typename Array>
+int compute_tswap(const Array & elc1, const Array & elc2){
+  auto el1 = votes_view(elc1), el2 = votes_view(elc2);
+  int mm = el2.width;
+  int nn = elc1.shape(0);
+  py::gil_scoped_release release;
+  return tswapDistance_election(nn, mm, el1, el2, swap_lookup(mm, true));
+}
+
+template <typename Array>
+int compute_truncated_swap(const Array & elc1, const Array & elc2){
+  auto el1 = votes_view(elc1), el2 = votes_view(elc2);
+  int nn = elc1.shape(0);
+  if (elc2.shape(0) != nn) {
+    throw py::value_error("Both elections must have the same number of voters.");
+  }
+  py::gil_scoped_release release;
+  return truncated_swapDistance(nn, el1, el2);
+}
+
+template <typename Array>
+int compute_spear(const Array & elc1, const Array & elc2){
+  auto el1 = votes_view(elc1), el2 = votes_view(elc2);
+  int mm = el1.width;
+  int nn = elc1.shape(0);
+  py::gil_scoped_release release;
+  return spearDistance_election(nn, mm, el1, el2);
+}
+
+template <typename Array>
+py::tuple compute_swap_approx(const Array & elc1, const Array & elc2, double time_budget){
+  auto el1 = votes_view(elc1), el2 = votes_view(elc2);
+  int mm = el1.width;
+  int nn = elc1.shape(0);
+  std::tuple<int, int, std::vector<int>> result;
+  {
+    py::gil_scoped_release release;
+    result = swapDistance_approx(nn, mm, el1, el2, time_budget);
+  }
+  return py::make_tuple(std::get<0>(result), std::get<1>(result), std::get<2>(result));
 }
 
-int compute_swap(const std::vector<std::vector<int>>  & elc1, const
-std::vector<std::vector<int>> & elc2){
+/*Computes the distances for the given pairs of elections (stacked into an E x n x m
+  array), distributing the pairs among native threads*/
+template <typename Array, typename Distance>
+py::array_t<int64_t> compute_many(const Array & votes, const PairsArray & pairs,
+                                  int num_threads, Distance distance){
+  typedef typename Array::value_type T;
+  if (votes.ndim() != 3) {
+    throw py::value_error("Votes must be a three-dimensional array (E x n x m).");
+  }
+  if (pairs.ndim() != 2 || pairs.shape(1) != 2) {
+    throw py::value_error("Pairs must be an array of shape (P, 2).");
+  }
+  size_t num_elections = votes.shape(0);
+  int nn = votes.shape(1);
+  int mm = votes.shape(2);
+  size_t num_pairs = pairs.shape(0);
+  const int64_t* pair_data = pairs.data();
+  for (size_t p = 0; p < 2 * num_pairs; p++) {
+    if (pair_data[p] < 0 || (size_t) pair_data[p] >= num_elections) {
+      throw py::index_error("Election index out of range.");
+    }
+  }
+
+  py::array_t<int64_t> distances(num_pairs);
+  int64_t* out = distances.mutable_data();
+  const T* data = votes.data();
+  size_t election_size = (size_t) nn * mm;
+
+  if (num_threads <= 0) {
+    num_threads = std::max(1u, std::thread::hardware_concurrency());
+  }
+  num_threads = std::min<size_t>(num_threads, std::max<size_t>(1, num_pairs));
+
+  {
+    py::gil_scoped_release release;
+    std::atomic<size_t> next(0);
+    auto worker = [&]() {
+      for (size_t p = next++; p < num_pairs; p = next++) {
+        VotesOf<T> el1{data + pair_data[2 * p] * election_size, mm};
+        VotesOf<T> el2{data + pair_data[2 * p + 1] * election_size, mm};
+        out[p] = distance(nn, mm, el1, el2);
+      }
+    };
+    std::vector<std::thread> threads;
+    for (int t = 1; t < num_threads; t++) { threads.emplace_back(worker); }
+    worker();
+    for (std::thread & thread : threads) { thread.join(); }
+  }
+  return distances;
+}
 
-  int mm = elc2[0].size();
-  int nn = elc1.size();
-  uint8_t* sswap_look=prec_map(mm);
-  int ddistance;
-  ddistance=swapDistance_election(nn, mm, elc1, elc2, sswap_look);
-  delete sswap_look;
-  return ddistance;
+template <typename Array>
+py::array_t<int64_t> compute_swap_many(const Array & votes, const PairsArray & pairs,
+                                       int num_threads){
+  return compute_many(votes, pairs, num_threads, swapDistance_bnb<typename Array::value_type>);
 }
 
-int compute_tswap(const std::vector<std::vector<int>>  & elc1, const
-std::vector<std::vector<int>> & elc2){
-
-  int mm = elc2[0].size();
-  int nn = elc1.size();
-  uint8_t* sswap_look=prec_map(8);
-  uint8_t* sswap_look_trunc=prec_map_trunc(8);
-  int ddistance;
-  ddistance=tswapDistance_election(nn, mm, elc1, elc2, sswap_look, sswap_look_trunc);
-  delete sswap_look;
-  return ddistance;
+template <typename Array>
+py::array_t<int64_t> compute_spear_many(const Array & votes, const PairsArray & pairs,
+                                        int num_threads){
+  return compute_many(votes, pairs, num_threads,
+                      spearDistance_election<typename Array::value_type>);
 }
 
-int compute_spear(const std::vector<std::vector<int>>  & elc1, const
-std::vector<std::vector<int>> & elc2){
-  int mm = elc1[0].size();
-  int nn = elc1.size();
-  int ddistance;
-  ddistance=spearDistance_election(nn, mm,elc1, elc2);
-  return ddistance;
+/*Registers the functions for votes given as the given type of arrays (the overloads
+  are tried in the order of registration)*/
+template <typename Array>
+void def_distances(py::module_ & m) {
+    m.def("swapd", &compute_swap<Array>, "Computes the swap distance between two elections.");
+    m.def("tswapd", &compute_tswap<Array>,
+          "Computes the truncated swap distance between two elections.");
+    m.def("speard", &compute_spear<Array>, "Computes the Spearman distance between two elections.");
+    m.def("truncated_swapd", &compute_truncated_swap<Array>,
+          "Computes the truncated swap distance between two elections (the votes of the "
+          "election with fewer candidates are truncated).");
+    m.def("swapd_approx", &compute_swap_approx<Array>,
+          "Computes an upper bound, a lower bound and a candidate mapping for the swap "
+          "distance between two elections within the given time budget (in seconds).",
+          py::arg("election_1"), py::arg("election_2"), py::arg("time_budget") = 1.0);
+    m.def("swapd_many", &compute_swap_many<Array>,
+          "Computes the swap distances between the given pairs of elections.",
+          py::arg("votes"), py::arg("pairs"), py::arg("num_threads") = 0);
+    m.def("speard_many", &compute_spear_many<Array>,
+          "Computes the Spearman distances between the given pairs of elections.",
+          py::arg("votes"), py::arg("pairs"), py::arg("num_threads") = 0);
 }
 
 PYBIND11_MODULE(cppdistances, m) {
     m.doc() = "C++ extension computing the swap and the Spearman distances";
-    m.def("swapd", &compute_swap, "Computes the swap distance between two elections.");
-    m.def("tswapd", &compute_tswap, "Computes the truncated swap distance between two elections.");
-    m.def("speard", &compute_spear, "Computes the Spearman distance between two elections.");
+    // int32 arrays (and, after conversion, any other votes) first; arrays of the compact
+    // types match their overloads exactly, in the first (non-converting) pass
+    def_distances<VotesArray>(m);
+    def_distances<CompactVotesArray<int8_t>>(m);
+    def_distances<CompactVotesArray<int16_t>>(m);
 }
@@ -0,0 +1,268 @@
+"""
+Persistent, content-addressed cache of distances between elections.
+
+Each entry is keyed by the fingerprints of the two elections (hashes of their
+votes, or of the frequency matrix for pseudo-elections) and the distance id,
+so the cache can be shared between experiments and between runs. Arguments of
+the distance that change its value (e.g., the time budget of `swap_approx`) are
+part of the key as well.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+DEFAULT_MAX_ENTRIES = 10 ** 7
+
+# Number of cache hits whose recency is recorded in memory before being written
+TOUCH_BATCH_SIZE = 10 ** 4
+
+
+def election_fingerprint(election) -> str:
+    """
+    Computes a hash of the content of the election.
+
+    Parameters
+    ----------
+        election : Election
+            Election to hash.
+
+    Returns
+    -------
+        str
+            Hexadecimal digest.
+    """
+    digest = hashlib.sha1()
+    digest.update(f'{election.instance_type};{election.num_candidates};'
+                  f'{election.num_voters};'.encode())
+
+    if election.instance_type == 'approval':
+        votes = sorted(tuple(sorted(int(c) for c in vote)) for vote in election.votes)
+        digest.update(repr(votes).encode())
+    elif election.is_pseudo or election.votes is None:
+        digest.update(f'{election.culture_id};{sorted((election.params or {}).items())};'.encode())
+        matrix = np.ascontiguousarray(election.get_frequency_matrix(), dtype=np.float64)
+        digest.update(matrix.tobytes())
+    else:
+        votes = np.ascontiguousarray(election.votes, dtype=np.int64)
+        digest.update(str(votes.shape).encode())
+        digest.update(votes.tobytes())
+
+    return digest.hexdigest()
+
+
+def cache_distance_id(distance_id: str, distance_kwargs: dict = None) -> str:
+    """
+    Combines the distance id with the arguments of the distance.
+
+    Parameters
+    ----------
+        distance_id : str
+            Name of the distance.
+        distance_kwargs : dict
+            Additional arguments of the distance (e.g., `time_budget`).
+
+    Returns
+    -------
+        str
+            The distance id, followed by the sorted arguments (if any).
+    """
+    if not distance_kwargs:
+        return distance_id
+    return f'{distance_id}:{json.dumps(distance_kwargs, sort_keys=True, default=repr)}'
+
+
+class DistanceCache:
+    """
+    Distance cache stored in an SQLite file, with a size cap and LRU eviction.
+
+    Parameters
+    ----------
+        path : str
+            Path to the SQLite file (created if missing).
+        max_entries : int
+            Maximal number of stored distances; the least recently used entries
+            are evicted when the limit is exceeded. The recency of cache hits is
+            written in batches (on `put`, `flush` and `close`), so lookups do not
+            write to the file.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._touched = {}
+
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+
+        self.connection = self._connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS distances ("
+            "key_1 TEXT, key_2 TEXT, distance_id TEXT, "
+            "distance REAL, matching TEXT, last_used INTEGER, "
+            "PRIMARY KEY (key_1, key_2, distance_id))")
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS distances_last_used ON distances (last_used)")
+        self.connection.commit()
+        self._clock, self.num_entries = self.connection.execute(
+            "SELECT COALESCE(MAX(last_used), 0), COUNT(*) FROM distances").fetchone()
+
+    def __len__(self):
+        return self.num_entries
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['connection'] = None
+        state['_touched'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.connection = self._connect(self.path)
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        # WAL lets several experiments (or runs) read the cache while one writes.
+        connection = sqlite3.connect(path, timeout=60)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    @staticmethod
+    def _ordered_keys(key_1: str, key_2: str) -> (str, str, bool):
+        """ Return: keys in canonical order, and whether they were swapped """
+        if key_1 <= key_2:
+            return key_1, key_2, False
+        return key_2, key_1, True
+
+    def get(self, key_1: str, key_2: str, distance_id: str, **distance_kwargs):
+        """
+        Looks up a distance.
+
+        Returns
+        -------
+            float or (float, list) or None
+                The stored result, in the same form as returned by the distance,
+                or None if the pair is not in the cache.
+        """
+        distance_id = cache_distance_id(distance_id, distance_kwargs)
+        first, second, swapped = self._ordered_keys(key_1, key_2)
+        row = self.connection.execute(
+            "SELECT distance, matching FROM distances "
+            "WHERE key_1 = ? AND key_2 = ? AND distance_id = ?",
+            (first, second, distance_id)).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._touched[(first, second, distance_id)] = self._tick()
+        if len(self._touched) >= TOUCH_BATCH_SIZE:
+            self.flush()
+
+        distance, matching = row
+        if matching is None:
+            return distance
+        matching = json.loads(matching)
+        if matching is not None and swapped:
+            matching = [int(x) for x in np.argsort(matching)]
+        return distance, matching
+
+    def put(self, key_1: str, key_2: str, distance_id: str, result, **distance_kwargs) -> None:
+        """
+        Stores the result of a distance: either a number, or a (distance, matching) tuple.
+        """
+        distance_id = cache_distance_id(distance_id, distance_kwargs)
+        first, second, swapped = self._ordered_keys(key_1, key_2)
+        if type(result) is tuple:
+            distance, matching = result
+            if matching is not None:
+                matching = [int(x) for x in matching]
+                if swapped:
+                    matching = [int(x) for x in np.argsort(matching)]
+            matching = json.dumps(matching)
+        else:
+            distance, matching = result, None
+
+        self._write_touched()
+        values = (float(distance), matching, self._tick(), first, second, distance_id)
+        updated = self.connection.execute(
+            "UPDATE distances SET distance = ?, matching = ?, last_used = ? "
+            "WHERE key_1 = ? AND key_2 = ? AND distance_id = ?", values).rowcount
+        if not updated:
+            self.connection.execute(
+                "INSERT INTO distances (distance, matching, last_used, key_1, key_2, "
+                "distance_id) VALUES (?, ?, ?, ?, ?, ?)", values)
+            self.num_entries += 1
+            self._evict()
+        self.connection.commit()
+
+    def _write_touched(self) -> None:
+        """ Writes the recency of the recent cache hits (without committing). """
+        if self._touched:
+            self.connection.executemany(
+                "UPDATE distances SET last_used = ? "
+                "WHERE key_1 = ? AND key_2 = ? AND distance_id = ?",
+                [(tick, *key) for key, tick in self._touched.items()])
+            self._touched = {}
+
+    def flush(self) -> None:
+        """ Writes the recency of the recent cache hits to the file. """
+        self._write_touched()
+        self.connection.commit()
+
+    def _evict(self) -> None:
+        """ Removes the least recently used entries above the size cap. """
+        excess = self.num_entries - self.max_entries
+        if excess > 0:
+            self.connection.execute(
+                "DELETE FROM distances WHERE rowid IN "
+                "(SELECT rowid FROM distances ORDER BY last_used LIMIT ?)", (excess,))
+            self.num_entries -= excess
+
+    def get_distance(self, election_1, election_2, distance_id: str, compute: callable,
+                     **distance_kwargs):
+        """
+        Returns the cached distance, or computes it with `compute` and stores it.
+
+        Parameters
+        ----------
+            election_1 : Election
+                First election.
+            election_2 : Election
+                Second election.
+            distance_id : str
+                Name of the distance.
+            compute : callable
+                Function computing the distance between the two elections.
+            **distance_kwargs : dict
+                Additional arguments of the distance (passed to `compute`).
+        """
+        key_1 = election_fingerprint(election_1)
+        key_2 = election_fingerprint(election_2)
+
+        cached = self.get(key_1, key_2, distance_id, **distance_kwargs)
+        if cached is not None:
+            return cached
+
+        result = compute(election_1, election_2, distance_id=distance_id, **distance_kwargs)
+        if result is not None:
+            self.put(key_1, key_2, distance_id, result, **distance_kwargs)
+        return result
+
+    def stats(self) -> dict:
+        """ Return: hit/miss counters and the current number of entries """
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self)}
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
@@ -1,7 +1,14 @@
 import numpy as np
+from scipy.spatial.distance import cdist
 
+from mapof.elections.distances.batched_distances import vector_distance_matrix
 from mapof.elections.distances.register import register_ordinal_election_distance
 
+# Upper bound on the number of entries of a single block of the distance matrix
+MAX_BLOCK_ENTRIES = 2 ** 22
+
+FEATURE_DISTANCE_NORMS = {'feature_l1': 1, 'feature_l2': 2}
+
 
 def _feature_distance(election_1, election_2, feature_ids: list[str], ord: int):
     vector_1 = []
@@ -63,3 +70,72 @@ def features_vector_l2(election_1, election_2, feature_ids: list[str]) -> float:
     return _feature_distance(election_1, election_2, feature_ids, 2)
 
 
+def feature_matrix(features: dict, instance_ids: list, feature_ids: list[str],
+                   is_standardized: bool = False) -> np.ndarray:
+    """
+    Assembles the values of the given features of the given instances into a matrix.
+
+    Parameters
+    ----------
+        features : dict
+            Features of an experiment, i.e., a dictionary mapping each feature id
+            to a dictionary with the values of the instances under the 'value' key.
+        instance_ids : list
+            Ids of the instances (rows of the matrix).
+        feature_ids : list[str]
+            Ids of the features (columns of the matrix).
+        is_standardized : bool
+            If True, every feature is shifted to zero mean and scaled to unit
+            standard deviation (constant features are only shifted).
+
+    Returns
+    -------
+        np.ndarray
+            Array of shape (len(instance_ids), len(feature_ids)).
+    """
+    matrix = np.zeros([len(instance_ids), len(feature_ids)])
+    for k, feature_id in enumerate(feature_ids):
+        try:
+            values = features[feature_id]['value']
+            column = [values[instance_id] for instance_id in instance_ids]
+        except KeyError:
+            raise KeyError(f"Feature {feature_id} not found in the experiment")
+        matrix[:, k] = [value['value'] if type(value) is dict else value for value in column]
+
+    if is_standardized and len(matrix) > 0:
+        deviation = matrix.std(axis=0)
+        deviation[deviation == 0] = 1
+        matrix = (matrix - matrix.mean(axis=0)) / deviation
+    return matrix
+
+
+def feature_distance_matrix(vectors: np.ndarray, ord: int, pairs: list = None) -> np.ndarray:
+    """
+    Computes the ell_1 or ell_2 distances between the rows of a feature matrix.
+
+    Parameters
+    ----------
+        vectors : np.ndarray
+            Array of shape (E, F), as returned by `feature_matrix`.
+        ord : int
+            Either 1 or 2.
+        pairs : list[tuple[int, int]]
+            Pairs of indices (into `vectors`) to compute. By default, the whole
+            matrix is computed, block by block.
+
+    Returns
+    -------
+        np.ndarray
+            Symmetric distance matrix of shape (E, E).
+    """
+    if ord not in {1, 2}:
+        raise ValueError(f'Unsupported norm: {ord}')
+    if pairs is not None:
+        return vector_distance_matrix(vectors, f'l{ord}', pairs)[0]
+
+    metric = 'cityblock' if ord == 1 else 'euclidean'
+    distances = np.zeros([len(vectors), len(vectors)])
+    step = max(1, MAX_BLOCK_ENTRIES // max(1, len(vectors)))
+    for start in range(0, len(vectors), step):
+        distances[start:start + step] = cdist(vectors[start:start + step], vectors, metric)
+    return distances
@@ -1,17 +1,49 @@
 import logging
 
-import gurobipy as gp
-from gurobipy import GRB
-
+from mapof.elections.distances.combinatorial_subelections import \
+    maximum_common_voter_subelection_search
 from mapof.elections.distances.register import register_ordinal_election_distance
 
 
-# THIS FUNCTION HAS NOT BEEN TESTED SINCE CONVERSION TO GUROBI
 @register_ordinal_election_distance("maximum_common_voter_subelection")
-def maximum_common_voter_subelection(election_1, election_2, metric_name='0') -> int:
+def maximum_common_voter_subelection(election_1, election_2, metric_name='0',
+                                     solver: str = None) -> int:
     """
     This function solves the maximum common voter subelection problem between two elections.
 
+    Parameters
+    ----------
+        election_1 : Election
+            The first election.
+        election_2 : Election
+            The second election.
+        metric_name : str
+            Maximal difference between the positions of matched candidates in
+            two votes for these votes to be considered common.
+        solver : str
+            Either 'search' (combinatorial search, only for metric_name '0') or
+            'ilp' (Gurobi). By default, the search is used whenever possible.
+
+    Returns
+    -------
+        int
+            The maximum number of common voters between the two elections.
+    """
+    if solver is None:
+        solver = 'search' if int(metric_name) == 0 else 'ilp'
+
+    if solver == 'search':
+        if int(metric_name) != 0:
+            raise ValueError('The combinatorial search supports only metric_name 0')
+        return maximum_common_voter_subelection_search(election_1, election_2)[0]
+    return maximum_common_voter_subelection_ilp(election_1, election_2, metric_name)
+
+
+# THIS FUNCTION HAS NOT BEEN TESTED SINCE CONVERSION TO GUROBI
+def maximum_common_voter_subelection_ilp(election_1, election_2, metric_name='0') -> int:
+    """
+    Solves the maximum common voter subelection problem with an ILP (Gurobi).
+
     Parameters
     ----------
         election_1 : Election
@@ -25,6 +57,10 @@ def maximum_common_voter_subelection(election_1, election_2, metric_name='0') ->
         int
             The maximum number of common voters between the two elections.
     """
+    # Imported here, so that the combinatorial search works without Gurobi
+    import gurobipy as gp
+    from gurobipy import GRB
+
     # Initialize model
     model = gp.Model()
 
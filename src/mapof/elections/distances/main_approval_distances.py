@@ -1,9 +1,29 @@
-import logging
+import itertools
 
+import numpy as np
+from scipy.optimize import linear_sum_assignment
 
 from mapof.elections.objects.ApprovalElection import ApprovalElection
 from mapof.elections.distances.register import register_approval_election_distance
 
+# Up to this number of candidates the Hamming distance is computed exactly,
+# by solving the voter assignment for every matching of the candidates
+HAMMING_EXACT_MAX_CANDIDATES = 6
+
+# Maximal number of alternating voter/candidate assignment rounds per start
+HAMMING_MAX_ROUNDS = 50
+
+# Up to these numbers of candidates and voters the heuristic is refined by trying
+# all transpositions of matched candidates (each costs one voter assignment)
+HAMMING_LOCAL_SEARCH_MAX_CANDIDATES = 20
+HAMMING_LOCAL_SEARCH_MAX_VOTERS = 100
+HAMMING_LOCAL_SEARCH_ROUNDS = 3
+
+# Upper bound on the number of 64-bit words of a single temporary XOR array
+MAX_CHUNK_WORDS = 2 ** 22
+
+_BYTE_POPCOUNT = np.array([bin(x).count('1') for x in range(256)], dtype=np.uint8)
+
 
 @register_approval_election_distance("approvalwise")
 def approvalwise_distance(
@@ -12,14 +32,180 @@ def approvalwise_distance(
         inner_distance: callable
 ) -> (float, list):
     """ Return: approvalwise distance """
-    election_1.votes_to_approvalwise_vector()
-    election_2.votes_to_approvalwise_vector()
-    return inner_distance(election_1.approvalwise_vector, election_2.approvalwise_vector), None
+    return inner_distance(election_1.get_approvalwise_vector(),
+                          election_2.get_approvalwise_vector()), None
+
+
+def approval_matrix(election: ApprovalElection) -> np.ndarray:
+    """
+    Converts the votes of an approval election to a 0/1 matrix.
+
+    Parameters
+    ----------
+        election : ApprovalElection
+            Approval election.
+
+    Returns
+    -------
+        np.ndarray
+            Boolean array of shape (num_voters, num_candidates).
+    """
+    matrix = np.zeros([len(election.votes), election.num_candidates], dtype=bool)
+    sizes = [len(vote) for vote in election.votes]
+    rows = np.repeat(np.arange(len(sizes)), sizes)
+    cols = np.fromiter(itertools.chain.from_iterable(election.votes), dtype=np.int64)
+    matrix[rows, cols] = True
+    return matrix
+
+
+def pack_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    Packs each row of a 0/1 matrix into 64-bit words.
+
+    Parameters
+    ----------
+        matrix : np.ndarray
+            Boolean array of shape (r, k).
+
+    Returns
+    -------
+        np.ndarray
+            Array of shape (r, ceil(k / 64)) with dtype uint64.
+    """
+    num_words = max(1, -(-matrix.shape[1] // 64))
+    padded = np.zeros([matrix.shape[0], num_words * 64], dtype=bool)
+    padded[:, :matrix.shape[1]] = matrix
+    packed = np.packbits(padded, axis=1, bitorder='little')
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """ Return: number of set bits of every 64-bit word """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words)
+    return _BYTE_POPCOUNT[words.view(np.uint8)].reshape(*words.shape, 8).sum(axis=-1)
+
+
+def hamming_cost_table(packed_1: np.ndarray, packed_2: np.ndarray) -> np.ndarray:
+    """
+    Computes the Hamming distances between all pairs of packed rows.
+
+    Parameters
+    ----------
+        packed_1 : np.ndarray
+            Packed rows of shape (r1, w), as returned by `pack_rows`.
+        packed_2 : np.ndarray
+            Packed rows of shape (r2, w).
+
+    Returns
+    -------
+        np.ndarray
+            Integer array of shape (r1, r2).
+    """
+    cost = np.zeros([len(packed_1), len(packed_2)], dtype=np.int64)
+    step = max(1, MAX_CHUNK_WORDS // max(1, packed_2.size))
+    for start in range(0, len(packed_1), step):
+        xor = packed_1[start:start + step, np.newaxis, :] ^ packed_2[np.newaxis, :, :]
+        cost[start:start + step] = _popcount(xor).sum(axis=2)
+    return cost
+
+
+def _match_voters(matrix_1, matrix_2, candidate_mapping) -> (int, np.ndarray):
+    """ Return: optimal voter assignment for a fixed matching of the candidates """
+    cost = hamming_cost_table(pack_rows(matrix_1), pack_rows(matrix_2[:, candidate_mapping]))
+    _, voter_mapping = linear_sum_assignment(cost)
+    return int(cost[np.arange(len(cost)), voter_mapping].sum()), voter_mapping
+
+
+def _match_candidates(matrix_1, matrix_2, voter_mapping) -> (int, np.ndarray):
+    """ Return: optimal candidate assignment for a fixed matching of the voters """
+    cost = hamming_cost_table(pack_rows(matrix_1.T), pack_rows(matrix_2[voter_mapping].T))
+    _, candidate_mapping = linear_sum_assignment(cost)
+    return int(cost[np.arange(len(cost)), candidate_mapping].sum()), candidate_mapping
+
+
+def _alternating_assignment(matrix_1, matrix_2, candidate_mapping) -> (int, np.ndarray):
+    """ Alternates voter and candidate assignments until the cost stops decreasing. """
+    best, voter_mapping = _match_voters(matrix_1, matrix_2, candidate_mapping)
+    for _ in range(HAMMING_MAX_ROUNDS):
+        value, new_candidate_mapping = _match_candidates(matrix_1, matrix_2, voter_mapping)
+        if value >= best:
+            break
+        candidate_mapping = new_candidate_mapping
+        best, voter_mapping = _match_voters(matrix_1, matrix_2, candidate_mapping)
+    return best, candidate_mapping
+
+
+def _transposition_search(matrix_1, matrix_2, best, candidate_mapping) -> (int, np.ndarray):
+    """ Improves the matching of candidates by swapping the images of two candidates. """
+    for _ in range(HAMMING_LOCAL_SEARCH_ROUNDS):
+        improved = False
+        for a, b in itertools.combinations(range(len(candidate_mapping)), 2):
+            mapping = candidate_mapping.copy()
+            mapping[a], mapping[b] = mapping[b], mapping[a]
+            if _match_voters(matrix_1, matrix_2, mapping)[0] < best:
+                best, candidate_mapping = _alternating_assignment(matrix_1, matrix_2, mapping)
+                improved = True
+        if not improved:
+            break
+    return best, candidate_mapping
 
 
 @register_approval_election_distance("hamming")
-def hamming_distance(election_1: ApprovalElection, election_2: ApprovalElection) -> float:
-    """ Return: Hamming distance """
-    logging.warning("Hamming distance is not implemented yet.")
-    return -1
+def hamming_distance(
+        election_1: ApprovalElection,
+        election_2: ApprovalElection,
+        is_exact: bool = None
+) -> (float, list):
+    """
+    Computes the isomorphic Hamming distance between approval elections, i.e.,
+    the minimal total Hamming distance between matched votes, over all matchings
+    of the voters and of the candidates.
+
+    Parameters
+    ----------
+        election_1 : ApprovalElection
+            First election to compare.
+        election_2 : ApprovalElection
+            Second election to compare.
+        is_exact : bool
+            If True, every matching of the candidates is checked (feasible only
+            for few candidates); otherwise, voter and candidate assignments are
+            alternated from several starting points (and, for small elections,
+            refined by swapping pairs of matched candidates), which gives an
+            upper bound.
+            By default, the exact mode is used for at most
+            HAMMING_EXACT_MAX_CANDIDATES candidates.
+
+    Returns
+    -------
+        (float, list)
+            Hamming distance and the matching of the candidates.
+    """
+    matrix_1 = approval_matrix(election_1)
+    matrix_2 = approval_matrix(election_2)
+    if matrix_1.shape != matrix_2.shape:
+        raise ValueError('Hamming distance requires equal numbers of voters and candidates')
+
+    num_candidates = matrix_1.shape[1]
+    if is_exact is None:
+        is_exact = num_candidates <= HAMMING_EXACT_MAX_CANDIDATES
+
+    if is_exact:
+        candidate_mappings = itertools.permutations(range(num_candidates))
+        results = ((_match_voters(matrix_1, matrix_2, list(mapping))[0], list(mapping))
+                   for mapping in candidate_mappings)
+    else:
+        # Start from the identity and from the matching of candidates by approval score.
+        order_1 = np.argsort(matrix_1.sum(axis=0), kind='stable')
+        order_2 = np.argsort(matrix_2.sum(axis=0), kind='stable')
+        by_score = np.empty(num_candidates, dtype=np.int64)
+        by_score[order_1] = order_2
+        results = [_alternating_assignment(matrix_1, matrix_2, start)
+                   for start in [by_score, np.arange(num_candidates)]]
+        if num_candidates <= HAMMING_LOCAL_SEARCH_MAX_CANDIDATES \
+                and len(matrix_1) <= HAMMING_LOCAL_SEARCH_MAX_VOTERS:
+            results = [_transposition_search(matrix_1, matrix_2, *result) for result in results]
 
+    best, best_mapping = min(results, key=lambda result: result[0])
+    return float(best), [int(c) for c in best_mapping]
@@ -1,15 +1,19 @@
 import logging
-from itertools import combinations, permutations
+from itertools import permutations
 import numpy as np
 
 from mapof.core.matchings import solve_matching_vectors, solve_matching_matrices
 from mapof.elections.objects.OrdinalElection import OrdinalElection
 import mapof.core.utils as utils
-from mapof.core.distances import swap_distance
 import mapof.elections.distances.ilp_isomorphic as ilp_iso
 from mapof.elections.distances.ilp_subelections import maximum_common_voter_subelection
+from mapof.elections.other.compact_votes import native_votes
+from mapof.elections.other.vote_distances import swap_cost_table
 
-from mapof.elections.distances.register import register_ordinal_election_distance
+from mapof.elections.distances.register import (
+    register_ordinal_election_distance,
+    register_ordinal_distance_bounds,
+)
 
 try:
     import mapof.elections.distances.cppdistances as cppd
@@ -17,6 +21,9 @@ except:
     logging.warning("The quick C++ procedures for computing the swap and "
                     "Spearman distance is unavailable: using the (slow) python one instead")
 
+# Default time budget (in seconds) of the anytime swap distance, per pair of elections
+SWAP_APPROX_TIME_BUDGET = 1.
+
 
 @register_ordinal_election_distance("pos_swap")
 def pos_swap_distance(
@@ -61,12 +68,11 @@ def positionwise_distance(
 
 @register_ordinal_election_distance("agg_voterlikeness")
 def agg_voterlikeness_distance(election_1: OrdinalElection, election_2: OrdinalElection,
-                                       inner_distance: callable) -> (float, list):
+                                       inner_distance: callable) -> (float, None):
     """ Compute Aggregated-Voterlikeness distance between ordinal elections """
-    logging.warning("Aggregated-Voterlikeness distance wasn't properly tested.")
-    vector_1, num_possible_scores = election_1.votes_to_agg_voterlikeness_vector()
+    vector_1, _ = election_1.votes_to_agg_voterlikeness_vector()
     vector_2, _ = election_2.votes_to_agg_voterlikeness_vector()
-    return inner_distance(vector_1, vector_2, num_possible_scores)
+    return inner_distance(vector_1, vector_2), None
 
 
 @register_ordinal_election_distance("bordawise")
@@ -121,8 +127,8 @@ def pairwise_distance(
             Pairwise distance between the two elections.
     """
     length = election_1.num_candidates
-    matrix_1 = election_1.votes_to_pairwise_matrix()
-    matrix_2 = election_2.votes_to_pairwise_matrix()
+    matrix_1 = election_1.get_pairwise_matrix()
+    matrix_2 = election_2.get_pairwise_matrix()
     return solve_matching_matrices(matrix_1, matrix_2, length, inner_distance), None
 
 
@@ -177,28 +183,103 @@ def swap_distance(election_1: OrdinalElection,
         logging.warning("Using Python implementation instead of the C++ one")
         return swap_distance_bf(election_1, election_2)
 
+    votes_1 = native_votes(election_1.votes)
+    votes_2 = native_votes(election_2.votes)
     if election_1.num_candidates < election_2.num_candidates:
-        swapd = cppd.tswapd(election_1.votes.tolist(),
-                            election_2.votes.tolist())
+        swapd = cppd.tswapd(votes_1, votes_2)
     elif election_1.num_candidates > election_2.num_candidates:
-        swapd = cppd.tswapd(election_2.votes.tolist(),
-                            election_1.votes.tolist())
+        swapd = cppd.tswapd(votes_2, votes_1)
     else:
-        swapd = cppd.swapd(election_1.votes.tolist(),
-                           election_2.votes.tolist())
+        swapd = cppd.swapd(votes_1, votes_2)
 
     return swapd, None
 
 
+@register_ordinal_distance_bounds("swap_approx")
+def swap_distance_bounds(election_1: OrdinalElection,
+                         election_2: OrdinalElection,
+                         time_budget: float = SWAP_APPROX_TIME_BUDGET) -> (int, int, list):
+    """
+    Computes bounds on the swap distance between elections within a time budget.
+
+    Alternates between a voter assignment and a candidate assignment to find an upper
+    bound, and then searches for the exact value (using the C++ extension) until the
+    time budget is exhausted.
+
+    Parameters
+    ----------
+        election_1 : OrdinalElection
+            First election.
+        election_2 : OrdinalElection
+            Second election (with the same numbers of voters and candidates).
+        time_budget : float
+            Time budget (in seconds).
+
+    Returns
+    -------
+        (int, int, list)
+            Certified lower bound, upper bound, and the candidate matching
+            attaining the upper bound.
+    """
+    if not utils.is_module_loaded("mapof.elections.distances.cppdistances"):
+        logging.warning("Using Python implementation instead of the C++ one")
+        distance, _ = swap_distance_bf(election_1, election_2)
+        return distance, distance, None
+
+    upper, lower, matching = cppd.swapd_approx(native_votes(election_1.votes),
+                                               native_votes(election_2.votes),
+                                               time_budget)
+    return lower, upper, matching
+
+
+@register_ordinal_election_distance("swap_approx")
+def swap_approx_distance(election_1: OrdinalElection,
+                         election_2: OrdinalElection,
+                         time_budget: float = SWAP_APPROX_TIME_BUDGET) -> (int, list):
+    """ Compute an upper bound on the swap distance between elections within a time budget """
+    _, upper, matching = swap_distance_bounds(election_1, election_2, time_budget)
+    return upper, matching
+
+
 @register_ordinal_election_distance("truncated_swap")
 def truncated_swap_distance(election_1: OrdinalElection,
-                                    election_2: OrdinalElection) -> (int, list):
-    """ Compute truncated swap distance between elections """
+                                    election_2: OrdinalElection) -> (int, None):
+    """
+    Computes the truncated swap distance between elections, i.e., the swap distance
+    where the votes of the election with fewer candidates are treated as truncated
+    votes over the candidates of the other election: the missing candidates are
+    ranked below all the others, and pairs of missing candidates are not counted.
+    For equal numbers of candidates it is the swap distance.
+
+    The distance is computed by the branch and bound search of the C++ extension;
+    without it, all injective mappings of the candidates are enumerated.
+
+    Parameters
+    ----------
+        election_1 : OrdinalElection
+            First election to compare.
+        election_2 : OrdinalElection
+            Second election to compare (with the same number of voters).
+
+    Returns
+    -------
+        (int, None)
+            Truncated swap distance between the two elections.
+    """
+    if election_1.num_candidates > election_2.num_candidates:
+        election_1, election_2 = election_2, election_1
+
+    if utils.is_module_loaded("mapof.elections.distances.cppdistances"):
+        return cppd.truncated_swapd(native_votes(election_1.votes),
+                                    native_votes(election_2.votes)), None
+
+    logging.warning("Using Python implementation instead of the C++ one")
+    # Every injective mapping of the candidates of the first election is enumerated.
     obj_values = []
-    for mapping in permutations(range(election_1.num_candidates)):
+    for mapping in permutations(range(election_2.num_candidates), election_1.num_candidates):
         cost_table = get_matching_cost_truncated_swap_bf(election_1, election_2, mapping)
         obj_values.append(solve_matching_vectors(cost_table)[0])
-    return min(obj_values), None
+    return int(min(obj_values)), None
 
 
 @register_ordinal_election_distance("spearman")
@@ -208,8 +289,8 @@ def spearman_distance(election_1: OrdinalElection,
     if not utils.is_module_loaded("mapof.elections.distances.cppdistances"):
         return spearman_distance_ilp_py(election_1, election_2)
 
-    speard = cppd.speard(election_1.votes.tolist(),
-                         election_2.votes.tolist())
+    speard = cppd.speard(native_votes(election_1.votes),
+                         native_votes(election_2.votes))
     return speard, None
 
 
@@ -295,13 +376,11 @@ def discrete_distance(election_1: OrdinalElection,
 
 # HELPER FUNCTIONS #
 def get_matching_cost_pos_swap(election_1: OrdinalElection, election_2: OrdinalElection,
-                               matching) -> list[list]:
+                               matching) -> np.ndarray:
     """ Return: Cost table """
-    votes_1 = election_1.votes
-    votes_2 = election_2.votes
-    size = election_1.num_voters
-    return [[swap_distance(votes_1[i], votes_2[j], matching=matching) for i in range(size)]
-            for j in range(size)]
+    # Relabelling the votes of the second election permutes the columns of their potes.
+    potes_2 = election_2.get_potes()[:, np.argsort(matching)]
+    return swap_cost_table(potes_2, election_1.get_potes())
 
 
 def get_matching_cost_positionwise(election_1: OrdinalElection, election_2: OrdinalElection,
@@ -315,46 +394,24 @@ def get_matching_cost_positionwise(election_1: OrdinalElection, election_2: Ordi
 
 
 def get_matching_cost_swap_bf(election_1: OrdinalElection, election_2: OrdinalElection,
-                              mapping):
+                              mapping) -> np.ndarray:
     """ Return: Cost table """
-    cost_table = np.zeros([election_1.num_voters, election_1.num_voters])
-
-    election_1.get_potes()
-    election_2.get_potes()
-
-    for v1 in range(election_1.num_voters):
-        for v2 in range(election_2.num_voters):
-            swap_distance = 0
-            for i, j in combinations(election_1.potes[0], 2):
-                if (election_1.potes[v1][i] > election_1.potes[v1][j] and
-                    election_2.potes[v2][mapping[i]] < election_2.potes[v2][mapping[j]]) or \
-                        (election_1.potes[v1][i] < election_1.potes[v1][j] and
-                         election_2.potes[v2][mapping[i]] > election_2.potes[v2][mapping[j]]):
-                    swap_distance += 1
-            cost_table[v1][v2] = swap_distance
-    return cost_table
+    potes_2 = election_2.get_potes()[:, list(mapping)]
+    return swap_cost_table(election_1.get_potes(), potes_2)
 
 
 def get_matching_cost_truncated_swap_bf(election_1: OrdinalElection,
                                         election_2: OrdinalElection,
-                                        mapping):
-    """ Return: Cost table """
-    cost_table = np.zeros([election_1.num_voters, election_1.num_voters])
-
-    election_1.get_potes()
-    election_2.get_potes()
-
-    for v1 in range(election_1.num_voters):
-        for v2 in range(election_2.num_voters):
-            swap_distance = 0
-            for i, j in combinations(election_1.potes[0], 2):
-                if (election_1.potes[v1][i] > election_1.potes[v1][j] and
-                    election_2.potes[v2][mapping[i]] < election_2.potes[v2][mapping[j]]) or \
-                        (election_1.potes[v1][i] < election_1.potes[v1][j] and
-                         election_2.potes[v2][mapping[i]] > election_2.potes[v2][mapping[j]]):
-                    swap_distance += 1
-            cost_table[v1][v2] = swap_distance
-    return cost_table
+                                        mapping) -> np.ndarray:
+    """ Return: Cost table (candidate c of the first election is mapped to mapping[c]) """
+    num_candidates = election_2.num_candidates
+    missing = [c for c in range(num_candidates) if c not in set(mapping)]
+    potes_2 = election_2.get_potes()[:, list(mapping) + missing]
+
+    # Candidates missing from the truncated votes are tied below the ranked ones.
+    potes_1 = np.full([election_1.num_voters, num_candidates], election_1.num_candidates)
+    potes_1[:, :election_1.num_candidates] = election_1.get_potes()
+    return swap_cost_table(potes_1, potes_2, is_truncated=True)
 
 
 @register_ordinal_election_distance("blank")
@@ -0,0 +1,277 @@
+"""
+Vantage-point tree over the elections of an experiment, for similarity search
+under a metric distance (e.g., swap, Spearman or EMD-Positionwise).
+
+Every inner node stores a vantage election and splits the other elections of its
+subtree by their distance to it (below or above the median). The ranges of these
+distances are kept for both halves, so that by the triangle inequality a query
+only descends into the halves that may contain elections close enough to it.
+Elections are inserted by routing them down to a leaf, and leaves that grow too
+large are split.
+"""
+import heapq
+import os
+import pickle
+
+import numpy as np
+
+from mapof.elections.distances import get_distance
+
+DEFAULT_LEAF_SIZE = 8
+
+
+class VantagePointNode:
+    """ Node of a vantage-point tree (a leaf if `vantage_id` is None). """
+
+    def __init__(self, instance_ids=None):
+        self.vantage_id = None
+        self.median = None
+        self.inside = None
+        self.outside = None
+        self.inside_range = [np.inf, -np.inf]
+        self.outside_range = [np.inf, -np.inf]
+        self.instance_ids = list(instance_ids or [])
+
+
+class MetricIndex:
+    """
+    Vantage-point tree over elections.
+
+    Parameters
+    ----------
+        distance_id : str
+            Name of the distance (it should be a metric).
+        leaf_size : int
+            Maximal number of elections stored in a leaf.
+        seed : int
+            Seed of the choice of the vantage elections.
+        distance : callable
+            Function computing the distance between two elections. By default,
+            `get_distance` with the given distance id.
+    """
+
+    def __init__(self, distance_id: str, leaf_size: int = DEFAULT_LEAF_SIZE, seed: int = 0,
+                 distance: callable = None):
+        self.distance_id = distance_id
+        self.leaf_size = leaf_size
+        self.rng = np.random.default_rng(seed)
+        self.root = VantagePointNode()
+        self.elections = {}
+        self.removed = set()
+        self.num_evaluations = 0
+        self.distance = distance
+
+    def __len__(self):
+        return len(self.elections) - len(self.removed)
+
+    def __contains__(self, instance_id):
+        return instance_id in self.elections and instance_id not in self.removed
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['elections'] = sorted(self.elections)
+        state['distance'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.elections = {instance_id: None for instance_id in self.elections}
+
+    def attach(self, elections: dict, distance: callable = None) -> None:
+        """
+        Provides the election objects (and the distance) of an unpickled index.
+
+        Parameters
+        ----------
+            elections : dict
+                Dictionary mapping instance ids to elections; it has to contain all
+                the indexed elections.
+            distance : callable
+                Function computing the distance between two elections.
+        """
+        missing = [instance_id for instance_id in self.elections if instance_id not in elections]
+        if missing:
+            raise KeyError(f'Indexed elections not found: {missing}')
+        self.elections = {instance_id: elections[instance_id] for instance_id in self.elections}
+        if distance is not None:
+            self.distance = distance
+
+    def _distance(self, election, instance_id) -> float:
+        self.num_evaluations += 1
+        if self.distance is not None:
+            result = self.distance(election, self.elections[instance_id])
+        else:
+            result = get_distance(election, self.elections[instance_id], self.distance_id)
+        return float(result[0] if type(result) is tuple else result)
+
+    def _build(self, instance_ids: list) -> VantagePointNode:
+        """ Return: subtree over the given elections """
+        node = VantagePointNode(instance_ids)
+        if len(instance_ids) <= self.leaf_size:
+            return node
+
+        vantage_id = instance_ids[self.rng.integers(len(instance_ids))]
+        others = [instance_id for instance_id in instance_ids if instance_id != vantage_id]
+        vantage = self.elections[vantage_id]
+        distances = np.array([self._distance(vantage, instance_id) for instance_id in others])
+
+        node.vantage_id = vantage_id
+        node.median = float(np.median(distances))
+        node.instance_ids = []
+        is_inside = distances < node.median
+        for half, mask in [('inside', is_inside), ('outside', ~is_inside)]:
+            if np.any(mask):
+                setattr(node, f'{half}_range', [float(distances[mask].min()),
+                                                float(distances[mask].max())])
+            setattr(node, half, self._build([instance_id for instance_id, flag
+                                             in zip(others, mask) if flag]))
+        return node
+
+    def build(self, elections: dict) -> None:
+        """
+        Indexes the given elections (replacing the current content of the index).
+
+        Parameters
+        ----------
+            elections : dict
+                Dictionary mapping instance ids to elections.
+        """
+        self.elections = dict(elections)
+        self.removed = set()
+        self.root = self._build(list(self.elections))
+
+    def insert(self, instance_id, election) -> None:
+        """
+        Adds an election to the index.
+
+        Parameters
+        ----------
+            instance_id : str
+                Id of the election.
+            election : Election
+                The election.
+        """
+        if instance_id in self.elections:
+            if self.elections[instance_id] is not election or instance_id in self.removed:
+                # The position of the election in the tree is no longer valid.
+                elections = {other_id: other for other_id, other in self.elections.items()
+                             if other_id not in self.removed}
+                elections[instance_id] = election
+                self.build(elections)
+            return
+
+        self.elections[instance_id] = election
+        node = self.root
+        while node.vantage_id is not None:
+            distance = self._distance(election, node.vantage_id)
+            half = 'inside' if distance < node.median else 'outside'
+            bounds = getattr(node, f'{half}_range')
+            bounds[0], bounds[1] = min(bounds[0], distance), max(bounds[1], distance)
+            node = getattr(node, half)
+
+        node.instance_ids.append(instance_id)
+        if len(node.instance_ids) > self.leaf_size:
+            node.__dict__.update(self._build(node.instance_ids).__dict__)
+
+    def remove(self, instance_id) -> None:
+        """ Removes an election from the results (it still guides the search). """
+        if instance_id in self.elections:
+            self.removed.add(instance_id)
+
+    def _search(self, election, radius: callable, visit: callable) -> None:
+        """
+        Visits (with their distances) the elections whose distance may be at most
+        `radius()`, where the radius may shrink during the search.
+        """
+        stack = [(self.root, 0.)]
+        while stack:
+            node, lower_bound = stack.pop()
+            if lower_bound > radius():
+                continue
+            if node.vantage_id is None:
+                for instance_id in node.instance_ids:
+                    if instance_id not in self.removed:
+                        visit(instance_id, self._distance(election, instance_id))
+                continue
+
+            distance = self._distance(election, node.vantage_id)
+            if node.vantage_id not in self.removed:
+                visit(node.vantage_id, distance)
+
+            # The elections of a half are at least this far from the query, by the
+            # triangle inequality; the closer half is explored first (pushed last).
+            halves = []
+            for child, (low, high) in [(node.outside, node.outside_range),
+                                       (node.inside, node.inside_range)]:
+                halves.append((child, max(0., distance - high, low - distance)))
+            if distance >= node.median:
+                halves.reverse()
+            stack.extend(halves)
+
+    def query_radius(self, election, radius: float) -> list:
+        """
+        Finds the indexed elections within the given distance from the election.
+
+        Parameters
+        ----------
+            election : Election
+                Query election.
+            radius : float
+                Maximal distance.
+
+        Returns
+        -------
+            list[tuple]
+                List of (instance id, distance) pairs, sorted by distance.
+        """
+        found = []
+
+        def visit(instance_id, distance):
+            if distance <= radius:
+                found.append((instance_id, distance))
+
+        self._search(election, lambda: radius, visit)
+        return sorted(found, key=lambda result: result[1])
+
+    def query_nearest(self, election, k: int = 1) -> list:
+        """
+        Finds the k indexed elections closest to the election.
+
+        Parameters
+        ----------
+            election : Election
+                Query election.
+            k : int
+                Number of elections.
+
+        Returns
+        -------
+            list[tuple]
+                List of (instance id, distance) pairs, sorted by distance.
+        """
+        nearest = []
+
+        def radius():
+            return -nearest[0][0] if len(nearest) == k else np.inf
+
+        def visit(instance_id, distance):
+            if len(nearest) < k:
+                heapq.heappush(nearest, (-distance, instance_id))
+            elif distance < -nearest[0][0]:
+                heapq.heapreplace(nearest, (-distance, instance_id))
+
+        self._search(election, radius, visit)
+        return [(instance_id, -distance) for distance, instance_id in sorted(nearest,
+                                                                             reverse=True)]
+
+    def save(self, path: str) -> None:
+        """ Stores the index (without the elections) in the given file. """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'wb') as file_:
+            pickle.dump(self, file_)
+
+    @staticmethod
+    def load(path: str) -> 'MetricIndex':
+        """ Loads an index stored with `save`; the elections have to be attached. """
+        with open(path, 'rb') as file_:
+            return pickle.load(file_)
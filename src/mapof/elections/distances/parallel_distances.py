@@ -0,0 +1,241 @@
+"""
+Parallel (process pool) computation of distances between elections.
+
+The pairs of elections are split into shards and evaluated by a pool of worker
+processes. The votes and frequency matrices of ordinal elections are published
+once through shared memory (instead of being pickled for every task), and the
+workers write the results directly into a shared output matrix. Optionally, the
+results are also streamed into a binary `DistanceStore`, where the pairs of every
+finished shard are marked as done, so that an interrupted computation can resume.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+from tqdm import tqdm
+
+from mapof.elections.objects.OrdinalElection import OrdinalElection
+from mapof.elections.other.compact_votes import compact_votes
+from mapof.elections.persistence.distance_store import DistanceStore
+
+# Number of shards per worker; more shards give smoother load balancing.
+SHARDS_PER_WORKER = 8
+
+_worker_state = {}
+
+
+class _SharedArray:
+    """ Numpy array backed by a (named) shared memory block. """
+
+    def __init__(self, shape, dtype, name=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.memory.buf)
+
+    def spec(self) -> tuple:
+        return self.memory.name, self.shape, self.dtype.str
+
+    @classmethod
+    def attach(cls, spec):
+        name, shape, dtype = spec
+        return cls(shape, dtype, name=name)
+
+    def close(self) -> None:
+        self.array = None
+        self.memory.close()
+
+    def unlink(self) -> None:
+        self.close()
+        self.memory.unlink()
+
+
+def _can_share_ordinal_data(elections: list) -> bool:
+    """ Checks if the votes and frequency matrices can be stacked into single arrays. """
+    if not elections or not all(type(election) is OrdinalElection for election in elections):
+        return False
+    if any(election.is_pseudo or election.votes is None for election in elections):
+        return False
+    shapes = {np.shape(election.votes) for election in elections}
+    return len(shapes) == 1 and len(next(iter(shapes))) == 2
+
+
+def _election_metadata(election) -> dict:
+    return {
+        'election_id': election.election_id,
+        'culture_id': election.culture_id,
+        'params': election.params,
+        'num_voters': election.num_voters,
+        'num_candidates': election.num_candidates,
+        'label': election.label,
+    }
+
+
+def _rebuild_ordinal_election(metadata: dict, votes: np.ndarray,
+                              frequency_matrix: np.ndarray) -> OrdinalElection:
+    """ Recreates an ordinal election in a worker from the shared data. """
+    return OrdinalElection(votes=votes,
+                           frequency_matrix=frequency_matrix,
+                           is_exported=False,
+                           **metadata)
+
+
+def _init_worker(distance_id, outputs_spec, data_spec, metadata, elections,
+                 store_path=None) -> None:
+    """ Attaches the shared memory blocks (called once per worker). """
+    _worker_state['distance_id'] = distance_id
+    _worker_state['store'] = None
+    if store_path is not None:
+        _worker_state['store'] = DistanceStore(store_path)
+    _worker_state['distances'], _worker_state['times'] = \
+        [_SharedArray.attach(spec) for spec in outputs_spec]
+
+    if data_spec is not None:
+        votes, matrices = [_SharedArray.attach(spec) for spec in data_spec]
+        _worker_state['shared'] = (votes, matrices)
+        # read-only views are kept by the elections as they are (without a private copy)
+        shared_votes = votes.array.view()
+        shared_votes.flags.writeable = False
+        elections = [_rebuild_ordinal_election(metadata[idx],
+                                               shared_votes[idx],
+                                               matrices.array[idx])
+                     for idx in range(len(metadata))]
+
+    _worker_state['elections'] = elections
+
+
+def _release_worker_state() -> None:
+    """ Detaches the shared memory blocks (of a computation run in this process). """
+    for shared in [_worker_state.get('distances'), _worker_state.get('times')] \
+            + list(_worker_state.get('shared', ())):
+        if shared is not None:
+            shared.close()
+    if _worker_state.get('store') is not None:
+        _worker_state['store'].close()
+    _worker_state.clear()
+
+
+def _compute_shard(pairs: list) -> dict:
+    """ Computes distances for a shard of pairs; return: matchings computed in the shard """
+    from mapof.elections.distances import get_distance
+
+    distances = _worker_state['distances'].array
+    times = _worker_state['times'].array
+    elections = _worker_state['elections']
+    matchings = {}
+
+    for i, j in pairs:
+        start = time.time()
+        distance = get_distance(elections[i], elections[j],
+                                distance_id=_worker_state['distance_id'])
+        if type(distance) is tuple:
+            distance, matching = distance
+            if matching is not None:
+                matchings[(i, j)] = np.array(matching)
+        distances[i, j] = distances[j, i] = distance
+        times[i, j] = times[j, i] = time.time() - start
+
+    store = _worker_state['store']
+    if store is not None and pairs:
+        rows, columns = np.array(pairs).T
+        store.write_values(pairs, distances[rows, columns], times[rows, columns])
+        store.flush()
+
+    return matchings
+
+
+def compute_distances_in_parallel(
+        elections: list,
+        distance_id: str,
+        pairs: list = None,
+        num_workers: int = 2,
+        store: DistanceStore = None,
+) -> (np.ndarray, np.ndarray, dict):
+    """
+    Computes distances between pairs of elections using a pool of processes.
+
+    The result does not depend on the number of workers nor on the scheduling,
+    since each pair is computed exactly once and written to its own cell.
+
+    Parameters
+    ----------
+        elections : list
+            List of elections.
+        distance_id : str
+            Name of the distance.
+        pairs : list[tuple[int, int]]
+            Pairs of indices (into `elections`) to compute. By default, all i < j.
+        num_workers : int
+            Number of worker processes (if 1, the pairs are computed in this process).
+        store : DistanceStore
+            Store (over the same elections) into which the results are streamed.
+
+    Returns
+    -------
+        (np.ndarray, np.ndarray, dict)
+            Distance matrix, matrix with computation times, and a dictionary mapping
+            (i, j) to the optimal matching (if the distance provides one).
+    """
+    num_elections = len(elections)
+    if pairs is None:
+        pairs = [(i, j) for i in range(num_elections) for j in range(i + 1, num_elections)]
+    pairs = [(int(i), int(j)) for i, j in pairs]
+
+    outputs = [_SharedArray((num_elections, num_elections), np.float64) for _ in range(2)]
+    shared_data = []
+    try:
+        if _can_share_ordinal_data(elections):
+            votes = compact_votes(np.stack([np.asarray(election.votes)
+                                            for election in elections]))
+            matrices = np.stack([np.asarray(election.get_frequency_matrix(), dtype=float)
+                                 for election in elections])
+            shared_data = [_SharedArray(votes.shape, votes.dtype),
+                           _SharedArray(matrices.shape, matrices.dtype)]
+            shared_data[0].array[:] = votes
+            shared_data[1].array[:] = matrices
+            data_spec = [shared.spec() for shared in shared_data]
+            metadata = [_election_metadata(election) for election in elections]
+            initargs = (distance_id, [out.spec() for out in outputs], data_spec, metadata, None)
+        else:
+            initargs = (distance_id, [out.spec() for out in outputs], None, None, elections)
+        if store is not None:
+            initargs += (store.path,)
+
+        shard_size = max(1, -(-len(pairs) // (num_workers * SHARDS_PER_WORKER)))
+        shards = [pairs[start:start + shard_size]
+                  for start in range(0, len(pairs), shard_size)]
+
+        matchings = {}
+        if num_workers <= 1:
+            _init_worker(*initargs)
+            try:
+                for shard in tqdm(shards, desc="Computing distances"):
+                    matchings.update(_compute_shard(shard))
+                    if store is not None:
+                        store.mark_done(shard)
+            finally:
+                _release_worker_state()
+        else:
+            with ProcessPoolExecutor(max_workers=num_workers,
+                                     initializer=_init_worker,
+                                     initargs=initargs) as executor:
+                futures = {executor.submit(_compute_shard, shard): shard for shard in shards}
+                with tqdm(total=len(pairs), desc="Computing distances") as progress:
+                    for future in as_completed(futures):
+                        matchings.update(future.result())
+                        if store is not None:
+                            store.mark_done(futures[future])
+                        progress.update(len(futures[future]))
+
+        distances = np.array(outputs[0].array)
+        times = np.array(outputs[1].array)
+    finally:
+        for shared in outputs + shared_data:
+            shared.unlink()
+
+    return distances, times, dict(sorted(matchings.items()))
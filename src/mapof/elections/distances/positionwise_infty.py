@@ -5,6 +5,7 @@ Code name: 'ep' (as in 'extended positionwise')
 import math
 
 import numpy as np
+from scipy.optimize import linear_sum_assignment, linprog
 
 from mapof.core.matchings import solve_matching_vectors
 from mapof.elections.objects import Election
@@ -123,7 +124,6 @@ def lcm(a, b):
     return abs(a * b) // math.gcd(a, b)
 
 
-@register_ordinal_election_distance("positionwise_infty")
 def positionwise_size_independent(e1: Election, e2: Election):
     """
     Main function of the positionwise infinity distance, pointer to this function is added to the experiment when I wish to compute the positionwise infinity distance for an experiment.
@@ -144,3 +144,143 @@ def positionwise_size_independent(e1: Election, e2: Election):
     distance, mapping = solve_matching_vectors(cost_table)
     normalized_distance = distance / (e1.num_candidates * int(election_lcm / e1.num_candidates))
     return normalized_distance, mapping
+
+
+def emd_infty_cost_table(matrix_1: np.ndarray, matrix_2: np.ndarray) -> np.ndarray:
+    """
+    Computes `emd_infty` between the stretched columns of two frequency matrices,
+    without stretching them.
+
+    A stretched column is the original one with each entry spread over `factor`
+    equal parts, so its cumulative distribution (on [0, 1]) is the piecewise linear
+    interpolation of the cumulative distribution of the original column. Hence, the
+    difference of two such distributions is linear between consecutive points of the
+    union of both grids, and `emd_infty` (the area between them) is the sum of the
+    areas over these segments.
+
+    Parameters
+    ----------
+        matrix_1 : np.ndarray
+            Frequency matrix of shape (m1, m1).
+        matrix_2 : np.ndarray
+            Frequency matrix of shape (m2, m2).
+
+    Returns
+    -------
+        np.ndarray
+            Cost table of shape (m1, m2), where entry [i, j] is the distance between
+            the i-th column of `matrix_1` and the j-th column of `matrix_2`.
+    """
+    matrix_1 = np.asarray(matrix_1, dtype=float)
+    matrix_2 = np.asarray(matrix_2, dtype=float)
+    size_1, size_2 = matrix_1.shape[0], matrix_2.shape[0]
+
+    grid = np.union1d(np.arange(size_1 + 1) * size_2, np.arange(size_2 + 1) * size_1)
+    grid = grid / (size_1 * size_2)
+
+    def cumulative(matrix, size):
+        values = np.vstack([np.zeros(matrix.shape[1]), np.cumsum(matrix, axis=0)])
+        points = np.arange(size + 1) / size
+        return np.stack([np.interp(grid, points, column) for column in values.T])
+
+    diff = cumulative(matrix_1, size_1)[:, np.newaxis, :] \
+        - cumulative(matrix_2, size_2)[np.newaxis, :, :]
+    d_1, d_2 = diff[:, :, :-1], diff[:, :, 1:]
+    abs_1, abs_2 = np.abs(d_1), np.abs(d_2)
+    widths = np.diff(grid)
+
+    same_sign = np.sign(d_1) == np.sign(d_2)
+    denominator = np.where(same_sign, 1., abs_1 + abs_2)
+    areas = np.where(same_sign,
+                     (abs_1 + abs_2) / 2,
+                     (abs_1 * abs_1 + abs_2 * abs_2) / denominator / 2)
+    return (areas * widths).sum(axis=2)
+
+
+def solve_transportation(
+        cost_table: np.ndarray,
+        supplies: np.ndarray,
+        demands: np.ndarray
+) -> (float, np.ndarray):
+    """
+    Solves the transportation problem (an assignment with multiplicities).
+
+    Parameters
+    ----------
+        cost_table : np.ndarray
+            Cost of sending a unit from each source (row) to each target (column).
+        supplies : np.ndarray
+            Integer supply of each source.
+        demands : np.ndarray
+            Integer demand of each target (with the same total as the supplies).
+
+    Returns
+    -------
+        (float, np.ndarray)
+            Objective value and the (integer) flow matrix.
+    """
+    num_sources, num_targets = cost_table.shape
+    if np.all(supplies == 1) and np.all(demands == 1):
+        row_ind, col_ind = linear_sum_assignment(cost_table)
+        flows = np.zeros(cost_table.shape, dtype=int)
+        flows[row_ind, col_ind] = 1
+        return cost_table[row_ind, col_ind].sum(), flows
+
+    equalities = np.zeros([num_sources + num_targets, num_sources * num_targets])
+    for source in range(num_sources):
+        equalities[source, source * num_targets:(source + 1) * num_targets] = 1
+    for target in range(num_targets):
+        equalities[num_sources + target, target::num_targets] = 1
+
+    result = linprog(cost_table.ravel(),
+                     A_eq=equalities,
+                     b_eq=np.concatenate([supplies, demands]),
+                     bounds=(0, None),
+                     method='highs')
+    # the transportation polytope is integral, so the optimal vertex is integral
+    flows = np.rint(result.x).astype(int).reshape(num_sources, num_targets)
+    return float((cost_table * flows).sum()), flows
+
+
+def _expand_flows(flows: np.ndarray, factor_1: int, factor_2: int) -> list:
+    """ Return: matching between the copies of the columns, given the flows """
+    next_copy = np.arange(flows.shape[1]) * factor_2
+    mapping = []
+    for source in range(flows.shape[0]):
+        for target in np.repeat(np.arange(flows.shape[1]), flows[source]):
+            mapping.append(int(next_copy[target]))
+            next_copy[target] += 1
+    return mapping
+
+
+@register_ordinal_election_distance("positionwise_infty")
+def positionwise_infty_distance(e1: Election, e2: Election) -> (float, list):
+    """
+    Computes the positionwise infinity distance between elections of any sizes.
+
+    Equivalent to `positionwise_size_independent`, but the stretched frequency matrices
+    are never built: the costs are computed directly from the original matrices, and
+    each column is matched with a multiplicity equal to its stretching factor.
+
+    Parameters
+    ----------
+        e1 : Election
+            First election.
+        e2 : Election
+            Second election.
+
+    Returns
+    -------
+        (float, list)
+            Distance, and the matching between the copies of the columns
+            (as returned by `positionwise_size_independent`).
+    """
+    election_lcm = lcm(e1.num_candidates, e2.num_candidates)
+    factor_1 = election_lcm // e1.num_candidates
+    factor_2 = election_lcm // e2.num_candidates
+
+    cost_table = emd_infty_cost_table(e1.get_frequency_matrix(), e2.get_frequency_matrix())
+    distance, flows = solve_transportation(cost_table,
+                                           np.full(e1.num_candidates, factor_1),
+                                           np.full(e2.num_candidates, factor_2))
+    return distance / election_lcm, _expand_flows(flows, factor_1, factor_2)
@@ -20,3 +20,50 @@ def register_approval_election_distance(feature_id: str):
         return func
 
     return decorator
+
+
+registered_ordinal_experiment_distances = {}
+
+registered_approval_experiment_distances = {}
+
+
+def register_ordinal_experiment_distance(distance_id: str):
+
+    def decorator(func):
+        registered_ordinal_experiment_distances[distance_id] = func
+        return func
+
+    return decorator
+
+
+def register_approval_experiment_distance(distance_id: str):
+
+    def decorator(func):
+        registered_approval_experiment_distances[distance_id] = func
+        return func
+
+    return decorator
+
+
+registered_ordinal_distance_bounds = {}
+
+
+def register_ordinal_distance_bounds(distance_id: str):
+
+    def decorator(func):
+        registered_ordinal_distance_bounds[distance_id] = func
+        return func
+
+    return decorator
+
+
+registered_ordinal_distance_lower_bounds = {}
+
+
+def register_ordinal_distance_lower_bound(distance_id: str):
+
+    def decorator(func):
+        registered_ordinal_distance_lower_bounds[distance_id] = func
+        return func
+
+    return decorator
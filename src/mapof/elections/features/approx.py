@@ -56,24 +56,28 @@ def get_winners_approx_greedy(election, committee_size, rule):
         return income
 
 
+    # Voters casting the same vote are handled at once
+    profile = election.get_weighted_profile()
+    votes, weights = profile.votes.tolist(), profile.weights.tolist()
+
     winners = []
-    voter_sat = [0 for _ in range(election.num_voters)]
+    voter_sat = [0 for _ in range(len(votes))]
     active = [True for _ in range(election.num_candidates)]
 
     for Z in range(committee_size):
 
         points = [0 for _ in range(election.num_candidates)]
-        income = np.zeros([election.num_voters, election.num_candidates], dtype=float)
+        income = np.zeros([len(votes), election.num_candidates], dtype=float)
 
         # Compute points
-        for i in range(election.num_voters):
+        for i in range(len(votes)):
             # ctr = 1.
             for j in range(election.num_candidates):
-                if active[election.votes[i][j]]:
-                    value = simple(active, election.votes[i], election.votes[i][j],
+                if active[votes[i][j]]:
+                    value = simple(active, votes[i], votes[i][j],
                                    owa_vector, scoring_vector)
-                    points[election.votes[i][j]] += value - voter_sat[i]
-                    income[i][election.votes[i][j]] = value
+                    points[votes[i][j]] += weights[i] * (value - voter_sat[i])
+                    income[i][votes[i][j]] = value
                 # else:
                     # ctr += 1.
 
@@ -89,7 +93,7 @@ def get_winners_approx_greedy(election, committee_size, rule):
                 winner_id = i
 
         # Update voter satisfaction
-        for i in range(election.num_voters):
+        for i in range(len(votes)):
             voter_sat[i] = income[i][winner_id]
 
         winners.append(winner_id)
@@ -134,9 +138,10 @@ def get_winners_approx_removal(election, committee_size, rule):
                 ctr += 1
         return income
 
-    num_voters = election.num_voters
+    profile = election.get_weighted_profile()
+    votes, weights = profile.votes.tolist(), profile.weights.tolist()
+    num_voters = len(votes)
     num_candidates = election.num_candidates
-    votes = election.votes
     removed = 0
     active = [True for _ in range(num_candidates)]
 
@@ -145,22 +150,22 @@ def get_winners_approx_removal(election, committee_size, rule):
     for i, x in enumerate(owa_vector):
         starting_voter_sat += scoring_vector[i] * x
 
-    voter_sat = [starting_voter_sat for _ in range(election.num_voters)]
+    voter_sat = [starting_voter_sat for _ in range(num_voters)]
 
     # STANDARD
     for Z in range(num_candidates - committee_size):
 
         points = [0. for _ in range(num_candidates)]
-        income = np.zeros([election.num_voters, election.num_candidates], dtype=float)
+        income = np.zeros([num_voters, election.num_candidates], dtype=float)
 
         for i in range(num_voters):
             for j in range(num_candidates):
                 if active[votes[i][j]]:
 
-                    value = simple(active, election.votes[i], election.votes[i][j],
+                    value = simple(active, votes[i], votes[i][j],
                                    owa_vector, scoring_vector)
-                    points[election.votes[i][j]] += voter_sat[i] - value
-                    income[i][election.votes[i][j]] = value
+                    points[votes[i][j]] += weights[i] * (voter_sat[i] - value)
+                    income[i][votes[i][j]] = value
 
         loser_id = -1
         loser_value = 9999999
@@ -173,7 +178,7 @@ def get_winners_approx_removal(election, committee_size, rule):
         removed += 1
 
         # Update voter satisfaction
-        for i in range(election.num_voters):
+        for i in range(num_voters):
             voter_sat[i] = income[i][loser_id]
 
     winners = []
@@ -13,6 +13,7 @@ def get_banzhaf_cc_score(election, committee_size=1):
     winners = set()
     BASE = {}
     BINOM = {}
+    profile = election.get_weighted_profile()
 
     for _ in range(committee_size):
         highest_c = 0
@@ -20,8 +21,10 @@ def get_banzhaf_cc_score(election, committee_size=1):
         for c in range(election.num_candidates):
             if c in winners:
                 continue
-            candidate_score = sum([voter_score(BASE, BINOM, election, v, c, committee_size, winners)
-                                   for v in range(election.num_voters)])
+            candidate_score = sum([weight * voter_score(BASE, BINOM, election, vote, pote, c,
+                                                        committee_size, winners)
+                                   for vote, pote, weight in zip(profile.votes, profile.potes,
+                                                                 profile.weights.tolist())])
             if candidate_score > highest_score:
                 highest_score = candidate_score
                 highest_c = c
@@ -30,27 +33,26 @@ def get_banzhaf_cc_score(election, committee_size=1):
     return {'value': get_cc_score(election, winners), 'dissat': get_cc_dissat(election, winners)}
 
 
-def voter_score(BASE, BINOM, election, v, c, committee_size, winners):
+def voter_score(BASE, BINOM, election, vote, pote, c, committee_size, winners):
 
-    potes = election.get_potes()
     m = election.num_candidates
 
     Wa = 0
-    for i in range(potes[v][c]):
-        if election.votes[v][i] in winners:
+    for i in range(pote[c]):
+        if vote[i] in winners:
             Wa += 1
     Wb = len(winners) - Wa
 
-    c_score = delta_c(BASE, BINOM, potes[v][c], Wa, Wb, m, committee_size)
+    c_score = delta_c(BASE, BINOM, int(pote[c]), Wa, Wb, m, committee_size)
 
     r = []
     for i in range(m):
-        if potes[v][i] < potes[v][c]:
+        if pote[i] < pote[c]:
             r.append(0)
         else:
             r.append(1)
 
-    d_score = sum(delta_d(BASE, BINOM, potes[v][d], Wa, Wb, m, committee_size, r[d])
+    d_score = sum(delta_d(BASE, BINOM, int(pote[d]), Wa, Wb, m, committee_size, r[d])
                   for d in range(election.num_candidates) if d != c)
 
     return c_score + d_score
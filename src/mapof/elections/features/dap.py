@@ -3,6 +3,9 @@ import itertools
 import numpy as np
 
 from mapof.elections.features.register import register_ordinal_election_feature
+from mapof.elections.other.vote_distances import vote_distance_matrix, \
+    candidate_distance_matrix
+from mapof.elections.other.vote_kernels import votes_to_potes
 
 ### AUXILLIARY FUNCTIONS ###
 
@@ -18,56 +21,17 @@ def _remove_diag(mtrx):
     return res
 
 
-def _vote2pote(vote, m):
-    reported = vote[vote != -1]
-    part_pote = np.argsort(reported)
-    res = []
-    i = 0
-    non_reported_pos = len(reported) + (m - 1 - len(reported)) / 2
-    for c in range(m):
-        if c in reported:
-            res.append(part_pote[i])
-            i = i + 1
-        else:
-            res.append(non_reported_pos)
-    return np.array(res)
-
-
 def _get_potes(election):
-    if election.potes is not None:
-        return election.potes
-    else:
-        res = []
-        for v in election.votes:
-            res.append(_vote2pote(v, election.num_candidates))
-        res = np.array(res)
-        election.potes = res
-        return res
-
-
-def _swap_distance_between_potes(pote_1: list, pote_2: list, m: int) -> int:
-    """ Return: Swap distance between two potes """
-    swap_distance = 0
-    for a in range(m):
-        for b in range(m):
-            if (pote_1[a] < pote_1[b] and pote_2[a] >= pote_2[b]):
-                swap_distance += 0.5
-            if (pote_1[a] <= pote_1[b] and pote_2[a] > pote_2[b]):
-                swap_distance += 0.5
-    return swap_distance
+    if election.potes is None:
+        election.potes = votes_to_potes(election.votes, election.num_candidates)
+    return election.potes
 
 
 def _get_vote_dists(election):
     try:
         return election.vote_dists
     except:
-        potes = _get_potes(election)
-        distances = np.zeros([election.num_voters, election.num_voters])
-        for v1 in range(election.num_voters):
-            for v2 in range(v1 + 1, election.num_voters):
-                distances[v1][v2] = _swap_distance_between_potes(potes[v1], potes[v2],
-                                                                election.num_candidates)
-                distances[v2][v1] = distances[v1][v2]
+        distances = vote_distance_matrix(_get_potes(election), 'swap')
         election.vote_dists = distances
         return distances
 
@@ -76,32 +40,18 @@ def _get_candidate_dists(election):
     try:
         return election.candidate_dists
     except:
-        potes = _get_potes(election)
-        distances = np.zeros([election.num_candidates, election.num_candidates])
-        for a in range(election.num_candidates):
-            for b in range(a + 1, election.num_candidates):
-                for v in range(election.num_voters):
-                    distances[a][b] += abs(potes[v][a] - potes[v][b])
-                distances[b][a] = distances[a][b]
+        profile = election.get_weighted_profile()
+        distances = candidate_distance_matrix(profile.potes, weights=profile.weights)
         election.candidate_dists = distances
         return distances
 
 
 def _calculate_borda_scores(election):
-    m = election.num_candidates
-    borda = np.zeros(m, int)
-    for v in election.votes:
-        for i, c in enumerate(v):
-            borda[c] = borda[c] + m - i - 1
-    return borda
-
-def _geom_mean(x):
-    x = np.log(x)
-    return np.exp(x.mean())
+    return election.get_weighted_profile().borda_scores().astype(int)
 
 def _kemeny_ranking(election):
     m = election.num_candidates
-    wmg = election.votes_to_pairwise_matrix()
+    wmg = election.get_pairwise_matrix()
     best_d = np.inf
     for test_ranking in itertools.permutations(list(range(m))):
         dist = 0
@@ -141,16 +91,11 @@ def agreement_index(election) -> dict:
     """
     if election.is_pseudo:
         return {'value': None}
-    potes = _get_potes(election)
+    preferences = election.get_weighted_profile().pairwise_counts().astype(int).tolist()
     res = 0
     for a, b in itertools.combinations(range(election.num_candidates), 2):
-        a_b = 0
-        b_a = 0
-        for p in potes:
-            if p[a] < p[b]:
-                a_b += 1
-            elif p[b] < p[a]:
-                b_a += 1
+        a_b = preferences[a][b]
+        b_a = preferences[b][a]
         res += max(abs(a_b - b_a), election.num_voters - a_b - b_a)
     return {'value': res / election.num_voters / (
                 election.num_candidates - 1) / election.num_candidates * 2}
@@ -174,8 +119,9 @@ def avg_vote_dist(election) -> dict:
     """
     if election.is_pseudo:
         return {'value': None}
-    distances = _get_vote_dists(election)
-    return {'value': distances.sum() / election.num_voters / (election.num_voters - 1)}
+    profile = election.get_weighted_profile()
+    total = profile.weights @ profile.vote_distances('swap') @ profile.weights
+    return {'value': total / election.num_voters / (election.num_voters - 1)}
 
 
 @register_ordinal_election_feature('max_vote_dist')
@@ -185,7 +131,7 @@ def max_vote_dist(election) -> dict:
     """
     if election.is_pseudo:
         return {'value': None}
-    distances = _get_vote_dists(election)
+    distances = election.get_weighted_profile().vote_distances('swap')
     return {'value': distances.max()}
 
 @register_ordinal_election_feature('karpov_index')
@@ -196,11 +142,14 @@ def karpov_index(election):
     """
     if election.is_pseudo:
         return {'value': None}
-    distances = _get_vote_dists(election)
-    distances = _remove_diag(distances)
+    profile = election.get_weighted_profile()
+    distances = profile.vote_distances('swap')
     distances = distances + 0.5
     distances[distances == 0.5] = 1
-    return {'value': _geom_mean(distances)}
+    # Geometric mean over all pairs of distinct voters
+    log_sum = (profile.pair_weights() * np.log(distances)).sum()
+    num_pairs = election.num_voters * (election.num_voters - 1)
+    return {'value': np.exp(log_sum / num_pairs)}
 
 @register_ordinal_election_feature('avg_dist_to_kemeny')
 def avg_dist_to_kemeny(election):
@@ -222,7 +171,7 @@ def avg_dist_to_bord(election) -> dict:
     m = election.num_candidates
     borda = _calculate_borda_scores(election)
     ranking = np.argsort(-borda)
-    wmg = election.votes_to_pairwise_matrix()
+    wmg = election.get_pairwise_matrix()
     dist = 0
     for i in range(m):
         for j in range(i + 1, m):
@@ -338,7 +287,7 @@ def support_diversity(election, tuple_len) -> dict:
     res = 0
     for subset in itertools.combinations(range(m), tuple_len):
         support = []
-        for v in election.votes:
+        for v, _ in election.get_weighted_profile():
             trimmed_v = []
             for c in v:
                 if c in subset:
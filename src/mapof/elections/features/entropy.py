@@ -30,23 +30,18 @@ def _calculate_maximum_entropy(m):
     return average_entropy
 
 
-def _calculate_entropy_ordinal(votes):
-    num_voters = len(votes)
-    num_candidates = len(votes[0])
+def _calculate_entropy_ordinal(profile):
+    num_voters = profile.num_voters
+    num_candidates = profile.num_candidates
 
-    # Initialize a dictionary to count rank frequencies for each candidate
-    rank_frequencies = defaultdict(lambda: [0] * num_candidates)
-
-    # Count rank frequencies for each candidate
-    for vote in votes:
-        for rank, candidate in enumerate(vote):
-            rank_frequencies[candidate][rank] += 1
+    # Count rank frequencies for each candidate (weighted by the multiplicities of the votes)
+    rank_frequencies = profile.position_counts().tolist()
 
     # Calculate the probability for each rank of each candidate
-    probabilities = {candidate: [freq / num_voters for freq in ranks] for candidate, ranks in rank_frequencies.items()}
+    probabilities = [[freq / num_voters for freq in ranks] for ranks in rank_frequencies]
 
     # Calculate the entropy for each candidate
-    candidate_entropies = [-sum(p * math.log2(p) for p in prob if p > 0) for prob in probabilities.values()]
+    candidate_entropies = [-sum(p * math.log2(p) for p in prob if p > 0) for prob in probabilities]
 
     # Calculate the average entropy across all candidates
     average_entropy = sum(candidate_entropies)
@@ -59,6 +54,6 @@ def entropy(election) -> dict:
     if election.is_pseudo:
         return {'value': None}
 
-    score = _calculate_entropy_ordinal(election.votes)
+    score = _calculate_entropy_ordinal(election.get_weighted_profile())
 
     return {'value': score}
\ No newline at end of file
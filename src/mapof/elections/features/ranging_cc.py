@@ -27,18 +27,19 @@ def get_algorithm_p_committee(election, committee_size, x):
 
     winners = set()
 
-    active = [True for _ in range(election.num_voters)]
+    profile = election.get_weighted_profile()
+    active = [True for _ in range(len(profile))]
 
     for i in range(committee_size):
         tops = np.zeros([election.num_candidates])
-        for v, vote in enumerate(election.votes):
+        for v, (vote, weight) in enumerate(profile):
             if active[v]:
                 for c in range(int(x)):
-                    tops[vote[c]] += 1
+                    tops[vote[c]] += weight
 
         winner_id = np.argmax(tops)
         winners.add(winner_id)
-        for v, vote in enumerate(election.votes):
+        for v, (vote, _) in enumerate(profile):
             if active[v]:
                 for c in range(int(x)):
                     if winner_id == vote[c]:
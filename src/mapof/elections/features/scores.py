@@ -23,14 +23,8 @@ def highest_borda_score(election) -> dict:
     """
     if election.is_pseudo:
         return {'value': None}
-    n = election.num_voters
-    m = election.num_candidates
-    scores = [0 for _ in range(m)]
-
-    for i in range(n):
-        for j in range(m):
-            scores[int(election.votes[i][j])] += m - j - 1
-    return {'value': max(scores)}
+    scores = election.get_weighted_profile().borda_scores()
+    return {'value': int(max(scores))}
 
 
 @register_ordinal_election_feature('highest_plurality_score')
@@ -71,15 +65,12 @@ def highest_copeland_score(election) -> dict:
     if election.is_pseudo:
         return {'value': None}
 
-    election.compute_potes()
+    preferences = election.get_weighted_profile().pairwise_counts()
     scores = np.zeros([election.num_candidates])
 
     for i in range(election.num_candidates):
         for j in range(i + 1, election.num_candidates):
-            result = 0
-            for k in range(election.num_voters):
-                if election.potes[k][i] < election.potes[k][j]:
-                    result += 1
+            result = preferences[i][j]
             if result > election.num_voters / 2:
                 scores[i] += 1
             elif result < election.num_voters / 2:
@@ -109,37 +100,24 @@ def lowest_dodgson_score(election):
         return {'value': None}
 
     min_score = math.inf
+    m = election.num_candidates
+    profile = election.get_weighted_profile()
+    potes, N = profile.potes, profile.weights
+    threshold = math.ceil((election.num_voters + 1) / 2.)
 
-    for target_id in range(election.num_candidates):
-
-        # PREPARE N
-        unique_potes, N = _potes_to_unique_potes(election.get_potes())
-
-        e = np.zeros([len(N), election.num_candidates,
-                      election.num_candidates])
+    for target_id in range(m):
 
-        # PREPARE e
-        for i, p in enumerate(unique_potes):
-            for j in range(election.num_candidates):
-                for k in range(election.num_candidates):
-                    if p[target_id] <= p[k] + j:
-                        e[i][j][k] = 1
+        # PREPARE e: e[i][j][k] = 1 iff moving the target up by j positions in the
+        # i-th vote puts it above candidate k
+        lead = potes[:, target_id, np.newaxis] - potes
+        e = (lead[:, np.newaxis, :] <= np.arange(m)[np.newaxis, :, np.newaxis]).astype(float)
 
         # PREPARE D
-        D = [0 for _ in range(election.num_candidates)]
-        threshold = math.ceil((election.num_voters + 1) / 2.)
-        for k in range(election.num_candidates):
-            diff = 0
-            for i, p in enumerate(unique_potes):
-                if p[target_id] < p[k]:
-                    diff += N[i]
-                if diff >= threshold:
-                    D[k] = 0
-                else:
-                    D[k] = threshold - diff
+        diff = N @ (potes[:, target_id, np.newaxis] < potes)
+        D = np.maximum(threshold - diff, 0)
         D[target_id] = 0  # always winning
 
-        score = ilp_other.solve_lp_file_dodgson_score(N=N, e=e, D=D)
+        score = ilp_other.solve_lp_file_dodgson_score(N=N.tolist(), e=e, D=D.tolist())
 
         if score < min_score:
             min_score = score
@@ -218,29 +196,11 @@ def highest_pav_score(election, committee_size: int = 1):
 def borda_spread(election) -> int:
     """ Compute the difference between the highest and the lowest Borda score """
     c = election.num_candidates
-    frequency_matrix = election.get_frequency_matrix()
-    borda = [sum([frequency_matrix[i][pos] * (c - pos - 1) for pos in range(c)])
-             for i in range(c)]
+    frequency_matrix = np.asarray(election.get_frequency_matrix(), dtype=float)
+    borda = frequency_matrix @ np.arange(c - 1, -1, -1)
     return (max(borda) - min(borda)) * election.num_voters
 
 
-# HELPER FUNCTIONS
-def _potes_to_unique_potes(potes):
-    """ Remove repetitions from potes (positional votes) """
-    unique_potes = []
-    n = []
-    for pote in potes:
-        flag_new = True
-        for i, p in enumerate(unique_potes):
-            if list(pote) == list(p):
-                n[i] += 1
-                flag_new = False
-        if flag_new:
-            unique_potes.append(pote)
-            n.append(1)
-    return unique_potes, n
-
-
 # GET SCORE
 def get_score(election, winners, rule) -> float:
     if rule == 'cc':
@@ -252,42 +212,36 @@ def get_score(election, winners, rule) -> float:
 
 
 def get_cc_score(election, winners) -> float:
-    num_voters = election.num_voters
     num_candidates = election.num_candidates
-    votes = election.votes
 
     score = 0
 
-    for i in range(num_voters):
+    for vote, weight in election.get_weighted_profile():
         for j in range(num_candidates):
-            if votes[i][j] in winners:
-                score += num_candidates - j - 1
+            if vote[j] in winners:
+                score += weight * (num_candidates - j - 1)
                 break
 
     return score
 
 
 def get_hb_score(election, winners) -> float:
-    num_voters = election.num_voters
     num_candidates = election.num_candidates
-    votes = election.votes
 
     score = 0
 
-    for i in range(num_voters):
+    for vote, weight in election.get_weighted_profile():
         ctr = 1.
         for j in range(num_candidates):
-            if votes[i][j] in winners:
-                score += (1. / ctr) * (num_candidates - j - 1)
+            if vote[j] in winners:
+                score += weight * (1. / ctr) * (num_candidates - j - 1)
                 ctr += 1
 
     return score
 
 
 def get_pav_score(election, winners) -> float:
-    num_voters = election.num_voters
     num_candidates = election.num_candidates
-    votes = election.votes
 
     score = 0
 
@@ -295,11 +249,11 @@ def get_pav_score(election, winners) -> float:
     for i in range(len(winners)):
         vector[i] = 1.
 
-    for i in range(num_voters):
+    for vote, weight in election.get_weighted_profile():
         ctr = 1.
         for j in range(num_candidates):
-            if votes[i][j] in winners:
-                score += (1. / ctr) * vector[j]
+            if vote[j] in winners:
+                score += weight * (1. / ctr) * vector[j]
                 ctr += 1
 
     return score
@@ -316,38 +270,35 @@ def get_dissat(election, winners, rule) -> float:
 
 
 def get_cc_dissat(election, winners) -> float:
-    num_voters = election.num_voters
     num_candidates = election.num_candidates
 
     dissat = 0
 
-    for i in range(num_voters):
+    for vote, weight in election.get_weighted_profile():
         for j in range(num_candidates):
-            if election.votes[i][j] in winners:
-                dissat += j
+            if vote[j] in winners:
+                dissat += weight * j
                 break
 
     return dissat
 
 
 def get_hb_dissat(election, winners) -> float:
-    num_voters = election.num_voters
     num_candidates = election.num_candidates
 
     dissat = 0
 
-    for i in range(num_voters):
+    for vote, weight in election.get_weighted_profile():
         ctr = 1.
         for j in range(num_candidates):
-            if election.votes[i][j] in winners:
-                dissat += (1. / ctr) * (j)
+            if vote[j] in winners:
+                dissat += weight * (1. / ctr) * (j)
                 ctr += 1
 
     return dissat
 
 
 def get_pav_dissat(election, winners) -> float:
-    num_voters = election.num_voters
     num_candidates = election.num_candidates
 
     dissat = 0
@@ -356,11 +307,11 @@ def get_pav_dissat(election, winners) -> float:
     for i in range(len(winners), num_candidates):
         vector[i] = 1.
 
-    for i in range(num_voters):
+    for vote, weight in election.get_weighted_profile():
         ctr = 1.
         for j in range(num_candidates):
-            if election.votes[i][j] in winners:
-                dissat += ((1. / ctr) * vector[j])
+            if vote[j] in winners:
+                dissat += weight * ((1. / ctr) * vector[j])
                 ctr += 1
 
     return dissat
@@ -45,8 +45,7 @@ def abstract(election) -> dict:
             'value': abstract
     """
     n = election.num_voters
-    election.votes_to_approvalwise_vector()
-    vector = election.approvalwise_vector
+    vector = election.get_approvalwise_vector()
     total_value = 0
     for i in range(election.num_candidates):
         k = vector[i] * n
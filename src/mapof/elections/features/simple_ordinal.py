@@ -21,17 +21,14 @@ def is_condorcet(election) -> dict:
     if election.is_pseudo:
         return {'value': None}
 
-    potes = election.get_potes()  # get positional votes
+    profile = election.get_weighted_profile()
+    potes = profile.potes  # positional votes of the distinct votes
     for i in range(election.num_candidates):
 
         condocret_winner = True
         for j in range(election.num_candidates):
 
-            diff = 0
-            for k in range(election.num_voters):
-
-                if potes[k][i] <= potes[k][j]:
-                    diff += 1
+            diff = profile.weights[potes[:, i] <= potes[:, j]].sum()
 
             if diff < math.ceil((election.num_voters + 1) / 2.):
                 condocret_winner = False
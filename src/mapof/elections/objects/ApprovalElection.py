@@ -1,3 +1,4 @@
+import itertools
 import logging
 from abc import ABC
 from collections import Counter
@@ -46,6 +47,16 @@ class ApprovalElection(Election, ABC):
 
         self.try_updating_params()
 
+    @property
+    def votes(self):
+        return self._votes
+
+    @votes.setter
+    def votes(self, votes):
+        # Reassigning the votes invalidates the statistics cached from them.
+        self._votes = votes
+        self.approvalwise_vector = None
+
     def import_approval_election(self) -> None:
         """
         Imports approval elections from a file.
@@ -81,13 +92,20 @@ class ApprovalElection(Election, ABC):
         Converts votes to an approval-wise frequency vector (fraction of voters approving each candidate).
         The resulting vector is sorted (ascending) to match prior behavior.
         """
-        approvalwise_vector = np.zeros(self.num_candidates, dtype=float)
-        for vote in self.votes:
-            for c in vote:
-                approvalwise_vector[int(c)] += 1
+        approvals = np.fromiter(itertools.chain.from_iterable(self.votes), dtype=np.int64)
+        approvalwise_vector = np.bincount(approvals, minlength=self.num_candidates)
         approvalwise_vector = approvalwise_vector / float(self.num_voters)
         self.approvalwise_vector = np.sort(approvalwise_vector)
 
+    def get_approvalwise_vector(self, is_recomputed: bool = False) -> np.ndarray:
+        """
+        Returns the approval-wise vector, computing it if necessary.
+        The vector is cached until the votes are reassigned.
+        """
+        if self.approvalwise_vector is None or is_recomputed:
+            self.votes_to_approvalwise_vector()
+        return self.approvalwise_vector
+
     def compute_reverse_approvals(self) -> None:
         """
         Computes reverse approvals: for each candidate, the set of voters who approve them.
@@ -18,6 +18,7 @@ import mapof.elections.persistence.election_imports as imports
 from mapof.elections.features import get_local_feature
 from mapof.elections.other.approval_rules import compute_abcvoting_rule_for_single_election
 from mapof.elections.other.glossary import is_pseudo_culture
+from mapof.elections.other.vote_kernels import votes_to_potes
 from mapof.elections.other.ordinal_rules import (
     compute_sntv_voting_rule,
     compute_borda_voting_rule,
@@ -176,12 +177,7 @@ class Election(Instance):
         Returns the computed potes array, or None for pseudo-cultures.
         """
         if not self.is_pseudo:
-            if mapping is None:
-                self.potes = np.array([[list(vote).index(i) for i, _ in enumerate(vote)]
-                                       for vote in self.votes])
-            else:
-                self.potes = np.array([[list(vote).index(mapping[i]) for i, _ in enumerate(vote)]
-                                       for vote in self.votes])
+            self.potes = votes_to_potes(self.votes, mapping=mapping)
             return self.potes
         return None
 
@@ -462,10 +458,9 @@ def _remove_candidate_from_election(election, party_id, party_size) -> Election:
 
     Modifies election.num_candidates accordingly and returns the election.
     """
-    for vote in election.votes:
-        for i in range(party_size):
-            _id = party_id * party_size + i
-            vote.remove(_id)
+    party = set(range(party_id * party_size, (party_id + 1) * party_size))
+    election.votes = [[candidate for candidate in vote if candidate not in party]
+                      for vote in election.votes]
     election.num_candidates -= party_size
     return election
 
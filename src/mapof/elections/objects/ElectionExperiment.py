@@ -1,5 +1,6 @@
 import ast
 import csv
+import heapq
 import logging
 import os
 import shutil
@@ -7,6 +8,7 @@ import time
 import warnings
 from abc import ABCMeta, abstractmethod
 
+import numpy as np
 import mapof.core.persistence.experiment_exports as exports
 import mapof.core.printing as pr
 from mapof.core.features.register import (
@@ -23,7 +25,26 @@ from mapof.elections.cultures.register import (
     registered_pseudo_ordinal_cultures,
     registered_approval_election_cultures
 )
-from mapof.elections.distances import get_distance
+from mapof.elections.distances import (
+    get_distance,
+    get_batched_distances,
+    get_distance_bounds,
+    get_distance_lower_bounds,
+    has_batched_distance,
+    has_distance_bounds
+)
+from mapof.elections.distances.distance_cache import (
+    DistanceCache,
+    DEFAULT_MAX_ENTRIES,
+    election_fingerprint
+)
+from mapof.elections.distances.feature_distance import (
+    FEATURE_DISTANCE_NORMS,
+    feature_matrix,
+    feature_distance_matrix
+)
+from mapof.elections.distances.metric_index import MetricIndex, DEFAULT_LEAF_SIZE
+from mapof.elections.distances.parallel_distances import compute_distances_in_parallel
 from mapof.elections.features.register import (
     features_with_params,
     features_rule_related
@@ -31,6 +52,12 @@ from mapof.elections.features.register import (
 from mapof.elections.objects.ApprovalElection import ApprovalElection
 from mapof.elections.objects.ElectionFamily import ElectionFamily
 from mapof.elections.objects.OrdinalElection import OrdinalElection
+from mapof.elections.other.landmark_embedding import (
+    landmark_mds,
+    maxmin_landmarks,
+    stratified_landmarks
+)
+from mapof.elections.persistence.distance_store import DistanceStore, store_exists
 
 try:
     from sklearn.manifold import MDS
@@ -46,6 +73,9 @@ except ImportError as error:
     Isomap = None
     print(error)
 
+# Number of elections given to a batched distance engine together with the landmarks
+LANDMARK_CHUNK_SIZE = 256
+
 
 class ElectionExperiment(Experiment):
     __metaclass__ = ABCMeta
@@ -63,6 +93,11 @@ class ElectionExperiment(Experiment):
     def add_culture(self, name, function):
         pass
 
+    distance_cache = None
+    distance_bounds = None
+    metric_index = None
+    distance_format = 'csv'
+
     def __init__(self, is_shifted=False, **kwargs):
         self.is_shifted = is_shifted
         self.default_num_candidates = 10
@@ -400,6 +435,9 @@ class ElectionExperiment(Experiment):
         if self.is_exported and not is_temporary:
             self._update_map_csv()
 
+        if not is_temporary:
+            self._update_metric_index(list(new_instances))
+
         return list(new_instances.keys())
 
     def add_existing_family_from_dir(
@@ -567,6 +605,8 @@ class ElectionExperiment(Experiment):
         if self.is_exported:
             self._update_map_csv()
 
+        self._update_metric_index(ids)
+
         return list(new_instances.keys())
 
     def _update_map_csv(self):
@@ -746,7 +786,868 @@ class ElectionExperiment(Experiment):
             distance_id: str = None,
             **kwargs
     ) -> float or (float, list):
-        return get_distance(election_1, election_2, distance_id)
+        return get_distance(election_1, election_2, distance_id, cache=self.distance_cache,
+                            **kwargs)
+
+    def set_distance_cache(
+            self,
+            path: str = None,
+            max_entries: int = DEFAULT_MAX_ENTRIES
+    ) -> DistanceCache:
+        """
+        Enables a persistent distance cache shared between experiments and runs.
+
+        Distances are looked up in the cache (keyed by the content of both elections
+        and the distance id) before they are computed.
+
+        Parameters
+        ----------
+            path : str
+                Path to the cache file. By default, `experiments/distance_cache.sqlite`.
+            max_entries : int
+                Maximal number of cached distances (least recently used are evicted).
+
+        Returns
+        -------
+            DistanceCache
+                The cache (its `stats()` method reports the hit/miss counters).
+        """
+        if path is None:
+            path = os.path.join(os.getcwd(), 'experiments', 'distance_cache.sqlite')
+        self.distance_cache = DistanceCache(path, max_entries=max_entries)
+        return self.distance_cache
+
+    def set_metric_index(
+            self,
+            distance_id: str = 'emd-positionwise',
+            leaf_size: int = DEFAULT_LEAF_SIZE,
+            recompute: bool = False
+    ) -> MetricIndex:
+        """
+        Indexes the elections of the experiment with a vantage-point tree, for
+        similarity search under the given (metric) distance.
+
+        If the experiment is exported, the index is stored next to `map.csv`
+        (and loaded from there, unless `recompute` is true). Elections added
+        later with `add_election` or `add_family` are inserted into the index.
+
+        Parameters
+        ----------
+            distance_id : str
+                Name of the distance.
+            leaf_size : int
+                Maximal number of elections in a leaf of the tree.
+            recompute : bool
+                If true, the stored index is ignored and the index is rebuilt.
+
+        Returns
+        -------
+            MetricIndex
+                The index.
+        """
+        def distance(election_1, election_2):
+            return self.get_distance(election_1, election_2, distance_id)
+
+        elections = {instance_id: self.instances[instance_id]
+                     for instance_id in self.instances
+                     if not self._is_temporary_instance(instance_id)}
+
+        index = None
+        path = self._metric_index_path(distance_id)
+        if path is not None and os.path.isfile(path) and not recompute:
+            index = MetricIndex.load(path)
+            try:
+                index.attach(elections, distance)
+            except KeyError:
+                index = None
+
+        if index is None:
+            index = MetricIndex(distance_id, leaf_size=leaf_size, distance=distance)
+            index.build(elections)
+        else:
+            for instance_id in elections:
+                index.insert(instance_id, elections[instance_id])
+
+        self.metric_index = index
+        self._save_metric_index()
+        return index
+
+    def find_elections_within(self, election, radius: float) -> list:
+        """
+        Finds the indexed elections within the given distance from the election
+        (see `set_metric_index`).
+
+        Parameters
+        ----------
+            election : Election
+                Query election (it does not have to belong to the experiment).
+            radius : float
+                Maximal distance.
+
+        Returns
+        -------
+            list[tuple]
+                List of (instance id, distance) pairs, sorted by distance.
+        """
+        if self.metric_index is None:
+            raise ValueError('No metric index; call set_metric_index first')
+        return self.metric_index.query_radius(election, radius)
+
+    def find_nearest_elections(self, election, k: int = 1) -> list:
+        """
+        Finds the k indexed elections closest to the election (see `set_metric_index`).
+
+        Parameters
+        ----------
+            election : Election
+                Query election (it does not have to belong to the experiment).
+            k : int
+                Number of elections.
+
+        Returns
+        -------
+            list[tuple]
+                List of (instance id, distance) pairs, sorted by distance.
+        """
+        if self.metric_index is None:
+            raise ValueError('No metric index; call set_metric_index first')
+        return self.metric_index.query_nearest(election, k)
+
+    def _metric_index_path(self, distance_id: str):
+        """ Return: path of the stored index (None if the experiment is not exported) """
+        if not self.is_exported or self.experiment_id is None:
+            return None
+        return os.path.join(os.getcwd(), 'experiments', self.experiment_id,
+                            f'index_{distance_id}.pkl')
+
+    def _save_metric_index(self) -> None:
+        path = self._metric_index_path(self.metric_index.distance_id)
+        if path is not None:
+            self.metric_index.save(path)
+
+    def _is_temporary_instance(self, instance_id) -> bool:
+        return any(family.is_temporary and instance_id in (family.instance_ids or [])
+                   for family in self.families.values())
+
+    def _update_metric_index(self, instance_ids: list) -> None:
+        """ Inserts the given elections into the metric index (if there is one). """
+        if self.metric_index is None or not instance_ids:
+            return
+        for instance_id in instance_ids:
+            self.metric_index.insert(instance_id, self.instances[instance_id])
+        self._save_metric_index()
+
+    def compute_distances(
+            self,
+            distance_id: str = None,
+            num_processes: int = 1,
+            self_distances: bool = False,
+            recompute: bool = True,
+            num_workers: int = 1,
+            time_budget: float = None,
+    ) -> None:
+        """
+        Computes distances between elections.
+
+        If `num_workers` > 1, or the distances are streamed into an exported binary
+        store (which can be resumed with `recompute=False`), the pairs are evaluated
+        by a pool of worker processes; this takes precedence over the experiment-level
+        (all-pairs) engine. Otherwise, if the distance has such an engine, all the
+        distances are computed at once, and if not, the pairs are evaluated serially.
+        Distances with bounds (e.g., `swap_approx`) are always computed pair by pair.
+
+        Parameters
+        ----------
+            distance_id : str
+                Name of the distance.
+            num_processes : int
+                Number of processes (used only by the pair-by-pair computation).
+            self_distances : bool
+                If true, the distance between each election and itself is computed.
+            recompute : bool
+                If false, the distances computed earlier (in this session or stored
+                in the exported file) are kept, and only the pairs involving newly
+                added elections are computed and merged into the matrix.
+            num_workers : int
+                Number of worker processes sharing the election data via shared memory.
+                The result is identical to the one of the serial computation.
+            time_budget : float
+                Time budget (in seconds, per pair) of the anytime distances, such as
+                `swap_approx`. For these distances the upper bounds are stored as the
+                distances, and both bounds in `distance_bounds`.
+
+        Returns
+        -------
+            None
+        """
+        if not recompute:
+            self._load_stored_distances(distance_id)
+
+        if has_distance_bounds(distance_id, self.instance_type):
+            return self._compute_bounded_distances(distance_id=distance_id,
+                                                   self_distances=self_distances,
+                                                   recompute=recompute,
+                                                   time_budget=time_budget)
+
+        if num_workers > 1 or (self.distance_format == 'binary' and self.is_exported):
+            return self._compute_parallel_distances(distance_id=distance_id,
+                                                    self_distances=self_distances,
+                                                    recompute=recompute,
+                                                    num_workers=num_workers)
+
+        if has_batched_distance(distance_id, self.instance_type):
+            try:
+                return self._compute_batched_distances(distance_id=distance_id,
+                                                       self_distances=self_distances,
+                                                       recompute=recompute)
+            except NotImplementedError:
+                pass
+
+        return super().compute_distances(distance_id=distance_id,
+                                         num_processes=num_processes,
+                                         self_distances=self_distances,
+                                         recompute=recompute)
+
+    def update_distances(self, distance_id: str = None, **kwargs) -> None:
+        """
+        Computes only the distances involving elections added since the last
+        computation (e.g., with `add_family`), and merges them into the stored
+        distances and the exported file.
+
+        Parameters
+        ----------
+            distance_id : str
+                Name of the distance.
+            **kwargs : dict
+                Additional arguments passed to `compute_distances`.
+
+        Returns
+        -------
+            None
+        """
+        self.compute_distances(distance_id=distance_id, recompute=False, **kwargs)
+
+    def compute_nearest_neighbours(self, k: int = 5, distance_id: str = 'swap') -> (dict, float):
+        """
+        Finds the k nearest elections of every election, without computing
+        the whole distance matrix.
+
+        A lower bound on all distances is first computed with a cheap distance
+        (e.g., for swap and Spearman, from the EMD-Positionwise distance). The
+        candidate neighbours of each election are then examined by increasing
+        lower bound, and the exact distance is computed only as long as the
+        lower bound is smaller than the k-th smallest distance found so far.
+        Distances already stored for `distance_id` are reused.
+
+        Parameters
+        ----------
+            k : int
+                Number of neighbours.
+            distance_id : str
+                Name of the distance.
+
+        Returns
+        -------
+            (dict, float)
+                Dictionary mapping each instance id to the list of (instance id,
+                distance) pairs of its nearest neighbours, sorted by distance, and
+                the fraction of pairs of elections whose distance was not computed.
+        """
+        instance_ids = list(self.instances)
+        elections = [self.instances[instance_id] for instance_id in instance_ids]
+        num_elections = len(elections)
+
+        try:
+            bounds = get_distance_lower_bounds(elections, distance_id, self.instance_type)
+        except NotImplementedError:
+            bounds = np.zeros([num_elections, num_elections])
+
+        known = {}
+        if self.distance_id == distance_id and isinstance(self.distances, dict):
+            for i, instance_1 in enumerate(instance_ids):
+                for j, instance_2 in enumerate(instance_ids):
+                    if i < j and instance_2 in self.distances.get(instance_1, {}):
+                        known[(i, j)] = bounds[i][j] = bounds[j][i] = \
+                            self.distances[instance_1][instance_2]
+
+        num_evaluated = 0
+        neighbours = {}
+        for i, instance_1 in enumerate(instance_ids):
+            nearest = []
+            for j in np.argsort(bounds[i], kind='stable'):
+                if j == i:
+                    continue
+                if len(nearest) == k and bounds[i][j] >= -nearest[0][0]:
+                    break
+                pair = (min(i, j), max(i, j))
+                if pair not in known:
+                    distance = self.get_distance(elections[i], elections[j], distance_id)
+                    known[pair] = float(distance[0] if type(distance) is tuple else distance)
+                    num_evaluated += 1
+                if len(nearest) < k:
+                    heapq.heappush(nearest, (-known[pair], -int(j)))
+                elif known[pair] < -nearest[0][0]:
+                    heapq.heapreplace(nearest, (-known[pair], -int(j)))
+            neighbours[instance_1] = [(instance_ids[-j], -distance)
+                                      for distance, j in sorted(nearest, reverse=True)]
+        if self.distance_cache is not None:
+            self.distance_cache.flush()
+
+        num_pairs = num_elections * (num_elections - 1) // 2
+        return neighbours, 1 - num_evaluated / max(1, num_pairs)
+
+    def embed_landmarks(
+            self,
+            distance_id: str = 'emd-positionwise',
+            num_landmarks: int = 50,
+            landmark_selection: str = 'maxmin',
+            dim: int = 2,
+            seed: int = 0,
+            saveas: str = None,
+            left=None,
+            up=None,
+            right=None,
+            down=None
+    ) -> list:
+        """
+        Embeds the elections using landmark (pivot) MDS, which requires only the
+        distances between all elections and a few landmark elections.
+
+        The landmarks are embedded with classical MDS, and every other election
+        is placed by triangulation from its distances to the landmarks. Hence, only
+        (num elections x num landmarks) distances are computed, instead of all pairs.
+        The coordinates are stored (and exported) as with `embed_2d`.
+
+        Parameters
+        ----------
+            distance_id : str
+                Name of the distance.
+            num_landmarks : int
+                Number of landmark elections.
+            landmark_selection : str
+                Either 'maxmin' (each landmark is the election farthest from the
+                previous ones) or 'stratified' (landmarks chosen at random within
+                families, in numbers proportional to their sizes).
+            dim : int
+                Dimension of the embedding.
+            seed : int
+                Seed of the random choices.
+            saveas : str
+                Name of the exported file. By default, `landmark_<distance_id>_<dim>d`.
+            left, up, right, down : str
+                Ids of the elections used to adjust the map (as in `embed_2d`).
+
+        Returns
+        -------
+            list
+                Ids of the landmark elections.
+        """
+        instance_ids = list(self.instances)
+
+        if landmark_selection == 'maxmin':
+            landmarks, columns = maxmin_landmarks(
+                len(instance_ids), num_landmarks,
+                lambda i: self._distances_to_landmarks(distance_id, [i])[:, 0],
+                seed=seed)
+        elif landmark_selection == 'stratified':
+            positions = {instance_id: i for i, instance_id in enumerate(instance_ids)}
+            groups = [[positions[instance_id] for instance_id in family.instance_ids
+                       if instance_id in positions]
+                      for family in self.families.values()]
+            landmarks = stratified_landmarks(groups, num_landmarks, seed=seed)
+            columns = self._distances_to_landmarks(distance_id, landmarks)
+        else:
+            raise ValueError(f'Unknown landmark selection: {landmark_selection}')
+
+        coordinates = landmark_mds(columns, landmarks, dim=dim)
+        self.coordinates = {instance_id: list(coordinates[i])
+                            for i, instance_id in enumerate(instance_ids)}
+        pr.adjust_the_map(self, left=left, up=up, right=right, down=down)
+
+        if self.is_exported:
+            if saveas is None:
+                saveas = f'landmark_{distance_id}_{dim}d'
+            exports.export_embedding_to_file(self, 'landmark', saveas, dim, coordinates)
+        return [instance_ids[i] for i in landmarks]
+
+    def _distances_to_landmarks(self, distance_id: str, landmarks: list) -> np.ndarray:
+        """
+        Return: array of the distances between all elections (rows) and the
+        landmarks (columns), given by their indices
+        """
+        instance_ids = list(self.instances)
+        elections = [self.instances[instance_id] for instance_id in instance_ids]
+        landmark_elections = [elections[i] for i in landmarks]
+        columns = np.zeros([len(elections), len(landmarks)])
+
+        if has_batched_distance(distance_id, self.instance_type):
+            # The engine gets the landmarks together with a chunk of elections, so
+            # that no matrix of all pairs of elections is ever allocated.
+            step = LANDMARK_CHUNK_SIZE
+            try:
+                for start in range(0, len(elections), step):
+                    chunk = elections[start:start + step]
+                    pairs = [(a, len(landmarks) + b) for a in range(len(landmarks))
+                             for b in range(len(chunk))]
+                    matrix, _ = get_batched_distances(landmark_elections + chunk,
+                                                      distance_id=distance_id,
+                                                      pairs=pairs,
+                                                      with_matchings=False,
+                                                      instance_type=self.instance_type)
+                    columns[start:start + len(chunk)] = \
+                        np.asarray(matrix)[len(landmarks):, :len(landmarks)]
+                return columns
+            except NotImplementedError:
+                pass
+
+        for i, election in enumerate(elections):
+            for a, landmark in enumerate(landmarks):
+                if i != landmark:
+                    distance = self.get_distance(election, landmark_elections[a], distance_id)
+                    columns[i][a] = distance[0] if type(distance) is tuple else distance
+        return columns
+
+    def compute_feature_distances(
+            self,
+            feature_ids: list,
+            distance_id: str = 'feature_l2',
+            is_standardized: bool = False,
+            self_distances: bool = False,
+            recompute: bool = True
+    ) -> None:
+        """
+        Computes the distances between elections in the space of the given features,
+        i.e., the ell_1 or ell_2 distances between their vectors of feature values.
+
+        The features have to be computed beforehand (e.g., with `compute_feature`).
+        The whole distance matrix is obtained from a single (elections x features)
+        matrix, so it is cheap enough to serve as a prefilter for expensive distances.
+
+        Parameters
+        ----------
+            feature_ids : list
+                Ids of the features (as stored in `features`).
+            distance_id : str
+                Either 'feature_l1' or 'feature_l2'.
+            is_standardized : bool
+                If True, every feature is scaled to zero mean and unit standard deviation.
+            self_distances : bool
+                If true, the distance between each election and itself is stored.
+            recompute : bool
+                If false, the distances computed earlier are kept, and only the
+                missing pairs are computed.
+
+        Returns
+        -------
+            None
+        """
+        if distance_id not in FEATURE_DISTANCE_NORMS:
+            raise ValueError(f'Unknown feature distance: {distance_id}')
+        if not recompute:
+            self._load_stored_distances(distance_id)
+
+        ids, all_ids, distances, times, matchings = \
+            self._prepare_distance_computation(self_distances, recompute)
+        instance_ids, pairs = self._ids_to_pairs(ids)
+
+        start = time.time()
+        vectors = feature_matrix(self.features, instance_ids, feature_ids, is_standardized)
+        matrix = feature_distance_matrix(vectors, FEATURE_DISTANCE_NORMS[distance_id],
+                                         pairs=None if len(ids) == len(all_ids) else pairs)
+        times_matrix = np.full(matrix.shape, (time.time() - start) / max(1, len(pairs)))
+
+        self._store_computed_distances(distance_id, ids, all_ids, pairs,
+                                       distances, times, matchings,
+                                       matrix, times_matrix, {})
+
+    def _load_stored_distances(self, distance_id: str) -> None:
+        """ Makes sure that `self.distances` holds the stored values of the given distance. """
+        if self.distance_id == distance_id and self.distances:
+            return
+
+        self.distance_id = distance_id
+        self.distances, self.times, self.matchings = {}, {}, {}
+        self.distance_bounds = None
+
+        if self.experiment_id is None:
+            return
+        if self.distance_format == 'binary' and store_exists(self._distance_store_path(
+                distance_id)):
+            store = DistanceStore(self._distance_store_path(distance_id), list(self.instances),
+                                  distance_id=distance_id)
+            self.distances, self.times = store.to_dicts()
+            store.close()
+            return
+        path = os.path.join(os.getcwd(), 'experiments', self.experiment_id,
+                            'distances', f'{distance_id}.csv')
+        if os.path.isfile(path):
+            import mapof.core.persistence.experiment_imports as imports
+            self.distances, self.times, _, _ = imports.add_distances_to_experiment(
+                self.experiment_id, distance_id, list(self.instances))
+
+    def set_distance_format(self, distance_format: str = 'binary') -> None:
+        """
+        Selects the format in which the distances between elections are exported.
+
+        In the 'binary' format, distances are kept in a memory-mapped `DistanceStore`
+        (`distances/<distance_id>.dist` with sidecar files) instead of a .csv file.
+        Distances computed pair by pair are streamed into the store while they are
+        computed, and the pairs that are done are recorded in a bitmap; after an
+        interruption, `compute_distances(..., recompute=False)` (or
+        `update_distances`) computes only the missing pairs.
+
+        Parameters
+        ----------
+            distance_format : str
+                Either 'csv' or 'binary'.
+
+        Returns
+        -------
+            None
+        """
+        if distance_format not in {'csv', 'binary'}:
+            raise ValueError(f'Unknown distance format: {distance_format}')
+        self.distance_format = distance_format
+
+    def _distance_store_path(self, distance_id: str) -> str:
+        return os.path.join(os.getcwd(), 'experiments', self.experiment_id,
+                            'distances', distance_id)
+
+    def remove_family(self, family_id: str) -> list:
+        """
+        Removes a family of elections from the experiment.
+
+        The distances (and coordinates) of the removed elections are dropped;
+        nothing is recomputed. If the experiment is exported, the map and the
+        distance file are rewritten accordingly.
+
+        Parameters
+        ----------
+            family_id : str
+                Family id.
+
+        Returns
+        -------
+            list
+                List of IDs of removed instances.
+        """
+        if family_id not in self.families:
+            logging.warning(f'No such family: {family_id}')
+            return []
+
+        family = self.families.pop(family_id)
+        removed = [instance_id for instance_id in family.instance_ids
+                   if instance_id in self.instances]
+
+        for instance_id in removed:
+            del self.instances[instance_id]
+            if self.metric_index is not None:
+                self.metric_index.remove(instance_id)
+
+        for values in [self.distances, self.times, self.matchings, self.coordinates,
+                       self.distance_bounds]:
+            if not isinstance(values, dict):
+                continue
+            for instance_id in removed:
+                values.pop(instance_id, None)
+            for row in values.values():
+                if isinstance(row, dict):
+                    for instance_id in removed:
+                        row.pop(instance_id, None)
+
+        self.num_families = len(self.families)
+        self.num_elections = sum([self.families[fid].size for fid in self.families])
+        self.main_order = [i for i in range(self.num_elections)]
+
+        if self.is_exported:
+            if not family.is_temporary:
+                self._update_map_csv()
+            if self.metric_index is not None:
+                self._save_metric_index()
+            if self.distance_id is not None and self.distances:
+                self._export_distances(self.distance_id, self._stored_pairs())
+
+        return removed
+
+    def _stored_pairs(self) -> list:
+        """ Return: pairs of instance ids (in the instance order) with a stored distance """
+        instance_ids = list(self.instances)
+        return [(instance_1, instance_2)
+                for i, instance_1 in enumerate(instance_ids)
+                for instance_2 in instance_ids[i:]
+                if instance_2 in self.distances.get(instance_1, {})
+                and instance_2 in self.times.get(instance_1, {})]
+
+    def _prepare_distance_computation(self, self_distances: bool, recompute: bool):
+        """
+        Return: pairs to compute, all pairs, and the (distances, times, matchings)
+        dictionaries, preloaded with the stored values if `recompute` is false.
+        """
+        if not recompute and isinstance(self.distances, dict):
+            distances = {instance_id: dict(self.distances.get(instance_id, {}))
+                         for instance_id in self.instances}
+            times = {instance_id: dict(self.times.get(instance_id, {}))
+                     for instance_id in self.instances}
+            matchings = {instance_id: dict(self.matchings.get(instance_id, {}))
+                         for instance_id in self.instances}
+        else:
+            distances = {instance_id: {} for instance_id in self.instances}
+            times = {instance_id: {} for instance_id in self.instances}
+            matchings = {instance_id: {} for instance_id in self.instances}
+
+        ids = []
+        all_ids = []
+        for i, instance_1 in enumerate(self.instances):
+            for j, instance_2 in enumerate(self.instances):
+                if i > j or (i == j and not self_distances):
+                    continue
+                all_ids.append((instance_1, instance_2))
+                if not recompute and (instance_2 in distances[instance_1]
+                                      or instance_1 in distances[instance_2]):
+                    continue
+                ids.append((instance_1, instance_2))
+
+        return ids, all_ids, distances, times, matchings
+
+    def _compute_batched_distances(
+            self,
+            distance_id: str = None,
+            self_distances: bool = False,
+            recompute: bool = True
+    ) -> None:
+        """ Computes distances between elections using the experiment-level engine. """
+        ids, all_ids, distances, times, matchings = \
+            self._prepare_distance_computation(self_distances, recompute)
+        instance_ids, pairs = self._ids_to_pairs(ids)
+
+        elections = [self.instances[instance_id] for instance_id in instance_ids]
+        keys, cached = self._lookup_cached_distances(elections, pairs, distance_id)
+        missing_pairs = [pair for pair in pairs if pair not in cached]
+
+        start = time.time()
+        matrix, new_matchings = get_batched_distances(
+            elections,
+            distance_id=distance_id,
+            pairs=missing_pairs,
+            with_matchings=True,
+            instance_type=self.instance_type)
+        times_matrix = np.full(matrix.shape,
+                               (time.time() - start) / max(1, len(missing_pairs)))
+
+        self._merge_cached_distances(keys, pairs, cached, matrix, new_matchings, distance_id)
+
+        self._store_computed_distances(distance_id, ids, all_ids, pairs,
+                                       distances, times, matchings,
+                                       matrix, times_matrix, new_matchings)
+
+    def _compute_parallel_distances(
+            self,
+            distance_id: str = None,
+            self_distances: bool = False,
+            recompute: bool = True,
+            num_workers: int = 2
+    ) -> None:
+        """ Computes distances between elections using a pool of worker processes. """
+        ids, all_ids, distances, times, matchings = \
+            self._prepare_distance_computation(self_distances, recompute)
+        instance_ids, pairs = self._ids_to_pairs(ids)
+
+        elections = [self.instances[instance_id] for instance_id in instance_ids]
+
+        keys, cached = self._lookup_cached_distances(elections, pairs, distance_id)
+
+        store = None
+        if self.distance_format == 'binary' and self.is_exported:
+            # The results are streamed into the store, so that the computation can
+            # be resumed (with recompute=False) if it is interrupted.
+            store = DistanceStore(self._distance_store_path(distance_id), instance_ids,
+                                  distance_id=distance_id)
+            if recompute:
+                store.clear()
+
+        try:
+            matrix, times_matrix, new_matchings = compute_distances_in_parallel(
+                elections,
+                distance_id=distance_id,
+                pairs=[pair for pair in pairs if pair not in cached],
+                num_workers=num_workers,
+                store=store)
+        finally:
+            if store is not None:
+                store.close()
+
+        self._merge_cached_distances(keys, pairs, cached, matrix, new_matchings, distance_id)
+
+        self._store_computed_distances(distance_id, ids, all_ids, pairs,
+                                       distances, times, matchings,
+                                       matrix, times_matrix, new_matchings)
+
+    def _compute_bounded_distances(
+            self,
+            distance_id: str = None,
+            self_distances: bool = False,
+            recompute: bool = True,
+            time_budget: float = None
+    ) -> None:
+        """ Computes lower and upper bounds on the distances between elections. """
+        ids, all_ids, distances, times, matchings = \
+            self._prepare_distance_computation(self_distances, recompute)
+
+        bounds = {instance_id: {} for instance_id in self.instances}
+        if not recompute and isinstance(self.distance_bounds, dict):
+            for instance_id in self.instances:
+                bounds[instance_id].update(self.distance_bounds.get(instance_id, {}))
+
+        kwargs = {} if time_budget is None else {'time_budget': time_budget}
+        for instance_1, instance_2 in tqdm(ids, desc="Computing distances"):
+            start = time.time()
+            lower, upper, matching = get_distance_bounds(self.instances[instance_1],
+                                                         self.instances[instance_2],
+                                                         distance_id=distance_id,
+                                                         **kwargs)
+            times[instance_1][instance_2] = times[instance_2][instance_1] = \
+                time.time() - start
+            distances[instance_1][instance_2] = distances[instance_2][instance_1] = upper
+            bounds[instance_1][instance_2] = bounds[instance_2][instance_1] = (lower, upper)
+            if matching is not None:
+                matching = np.array(matching)
+                matchings[instance_1][instance_2] = matching
+                matchings[instance_2][instance_1] = np.argsort(matching)
+
+        self.distance_id = distance_id
+        self.distances = distances
+        self.times = times
+        self.matchings = matchings
+        self.distance_bounds = bounds
+
+        if self.is_exported:
+            self._export_distances(distance_id, all_ids)
+            self._export_distance_bounds(distance_id, all_ids)
+
+    def _export_distance_bounds(self, distance_id: str, ids: list) -> None:
+        """ Exports the lower and upper bounds on the distances to a .csv file. """
+        path_to_folder = os.path.join(os.getcwd(), 'experiments', self.experiment_id,
+                                      'distances')
+        os.makedirs(path_to_folder, exist_ok=True)
+        path = os.path.join(path_to_folder, f'{distance_id}_bounds.csv')
+        with open(path, 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file, delimiter=';')
+            writer.writerow(['instance_id_1', 'instance_id_2', 'lower', 'upper'])
+            for instance_1, instance_2 in ids:
+                lower, upper = self.distance_bounds[instance_1][instance_2]
+                writer.writerow([instance_1, instance_2, lower, upper])
+
+    def get_pairs_to_refine(self, max_gap: float = 0.) -> list:
+        """
+        Lists the pairs of elections whose distance is not known precisely enough.
+
+        Parameters
+        ----------
+            max_gap : float
+                Maximal accepted difference between the upper and the lower bound.
+
+        Returns
+        -------
+            list[tuple[str, str]]
+                Pairs of instance ids, sorted by decreasing gap between the bounds.
+        """
+        if not self.distance_bounds:
+            return []
+        instance_ids = list(self.distance_bounds)
+        gaps = []
+        for i, instance_1 in enumerate(instance_ids):
+            for instance_2 in instance_ids[i:]:
+                if instance_2 not in self.distance_bounds[instance_1]:
+                    continue
+                lower, upper = self.distance_bounds[instance_1][instance_2]
+                if upper - lower > max_gap:
+                    gaps.append((upper - lower, instance_1, instance_2))
+        gaps.sort(key=lambda gap: -gap[0])
+        return [(instance_1, instance_2) for _, instance_1, instance_2 in gaps]
+
+    def _lookup_cached_distances(self, elections, pairs, distance_id) -> (list, dict):
+        """ Return: fingerprints of the elections and the cached results for the given pairs """
+        keys, cached = [], {}
+        if self.distance_cache is not None:
+            keys = [election_fingerprint(election) for election in elections]
+            for i, j in pairs:
+                result = self.distance_cache.get(keys[i], keys[j], distance_id)
+                if result is not None:
+                    cached[(i, j)] = result
+        return keys, cached
+
+    def _merge_cached_distances(self, keys, pairs, cached, matrix, matchings,
+                                distance_id) -> None:
+        """ Fills the cached results in, and stores the computed ones in the cache. """
+        if self.distance_cache is None:
+            return
+        for i, j in pairs:
+            if (i, j) in cached:
+                result = cached[(i, j)]
+                if type(result) is tuple:
+                    result, matching = result
+                    if matching is not None:
+                        matchings[(i, j)] = matching
+                matrix[i][j] = matrix[j][i] = result
+            else:
+                self.distance_cache.put(keys[i], keys[j], distance_id,
+                                        (matrix[i][j], matchings.get((i, j))))
+        self.distance_cache.flush()
+
+    def _ids_to_pairs(self, ids: list) -> (list, list):
+        """ Return: list of instance ids and the given pairs of ids as pairs of indices """
+        instance_ids = list(self.instances)
+        position = {instance_id: idx for idx, instance_id in enumerate(instance_ids)}
+        pairs = [(position[instance_1], position[instance_2]) for instance_1, instance_2 in ids]
+        return instance_ids, pairs
+
+    def _store_computed_distances(
+            self,
+            distance_id,
+            ids,
+            all_ids,
+            pairs,
+            distances,
+            times,
+            matchings,
+            matrix,
+            times_matrix,
+            new_matchings
+    ) -> None:
+        """ Stores (and exports) distances computed for the given pairs. """
+        for (instance_1, instance_2), (i, j) in zip(ids, pairs):
+            distances[instance_1][instance_2] = distances[instance_2][instance_1] = \
+                float(matrix[i][j])
+            times[instance_1][instance_2] = times[instance_2][instance_1] = \
+                float(times_matrix[i][j])
+            if (i, j) in new_matchings:
+                matching = np.array(new_matchings[(i, j)])
+                matchings[instance_1][instance_2] = matching
+                matchings[instance_2][instance_1] = np.argsort(matching)
+
+        self.distance_id = distance_id
+        self.distances = distances
+        self.times = times
+        self.matchings = matchings
+
+        if self.is_exported:
+            self._export_distances(distance_id, all_ids)
+
+    def _export_distances(self, distance_id: str, ids: list) -> None:
+        """ Exports the distances of the given pairs (in the chosen distance format). """
+        if self.distance_format != 'binary':
+            exports.export_distances_to_file(self, distance_id, self.distances,
+                                             self.times, ids)
+            return
+
+        instance_ids, pairs = self._ids_to_pairs(ids)
+        store = DistanceStore(self._distance_store_path(distance_id), instance_ids,
+                              distance_id=distance_id)
+        store.write(pairs,
+                    [self.distances[instance_1][instance_2] for instance_1, instance_2 in ids],
+                    [self.times[instance_1][instance_2] for instance_1, instance_2 in ids],
+                    is_exclusive=True)
+        store.close()
 
     def print_matrix(self, **kwargs):
         pr.print_matrix(experiment=self, **kwargs)
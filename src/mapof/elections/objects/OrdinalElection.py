@@ -4,8 +4,6 @@ import os
 from collections import Counter
 
 import numpy as np
-from mapof.core.distances import swap_distance_between_potes, \
-    spearman_distance_between_potes
 from matplotlib import pyplot as plt
 
 import mapof.elections.persistence.election_exports as exports
@@ -22,13 +20,29 @@ from mapof.elections.cultures.pseudo_cultures import (
 from mapof.elections.features.simple_ordinal import is_condorcet
 from mapof.elections.objects.Election import Election
 from mapof.elections.objects.Microscope import Microscope
+from mapof.elections.other.compact_votes import (
+    compact_quantities,
+    compact_votes,
+    distinct_votes_with_counts
+)
 from mapof.elections.other.glossary import PATHS
 from mapof.elections.other.ordinal_rules import voting_rule
-
+from mapof.elections.other.vote_distances import vote_distance_matrix, \
+    aggregated_vote_distances, candidate_distance_matrix
+from mapof.elections.other.vote_kernels import votes_to_potes
+from mapof.elections.other.weighted_profile import WeightedProfile
 
 
 class OrdinalElection(Election):
-    """ Ordinal Election class. """
+    """
+    Ordinal Election class.
+
+    Votes are stored as a compact integer array (int8 for up to 127 candidates,
+    int16 for up to 32767 candidates), and the distinct votes with their uint32
+    multiplicities, as well as the potes, are derived from them when needed.
+    The potes are int64; arithmetic on the (compact) votes themselves should
+    convert them first, e.g., with `votes.astype(np.int64)`.
+    """
 
     def __init__(self,
                  experiment_id=None,
@@ -100,6 +114,61 @@ class OrdinalElection(Election):
 
         self.try_updating_params()
 
+    @property
+    def votes(self):
+        return self._votes
+
+    @votes.setter
+    def votes(self, votes):
+        # Reassigning the votes invalidates the statistics cached from them.
+        self._votes = compact_votes(votes)
+        self._pairwise_matrix = None
+        self._distinct_votes = None
+        self._quantities = None
+        self._weighted_profile = None
+        self.bordawise_vector = []
+        self.potes = None
+
+    @property
+    def distinct_votes(self):
+        """ Distinct votes, by decreasing multiplicity (see `quantities`). """
+        if self._distinct_votes is None and self._can_group_votes():
+            self._distinct_votes, self._quantities = distinct_votes_with_counts(self.votes)
+        return self._distinct_votes
+
+    @distinct_votes.setter
+    def distinct_votes(self, distinct_votes):
+        self._distinct_votes = compact_votes(distinct_votes)
+        self._weighted_profile = None
+
+    @property
+    def quantities(self):
+        """ Multiplicities of the distinct votes (uint32). """
+        if self._quantities is None and self._can_group_votes():
+            self._distinct_votes, self._quantities = distinct_votes_with_counts(self.votes)
+        return self._quantities
+
+    @quantities.setter
+    def quantities(self, quantities):
+        self._quantities = compact_quantities(quantities)
+        self._weighted_profile = None
+
+    def _can_group_votes(self) -> bool:
+        return not self.is_pseudo and isinstance(self.votes, np.ndarray) \
+            and self.votes.ndim == 2 and len(self.votes) > 0
+
+    def get_weighted_profile(self) -> WeightedProfile:
+        """ Get the distinct votes with their multiplicities. """
+        if self._weighted_profile is None:
+            if self._can_group_votes() and self.quantities is not None \
+                    and int(np.sum(self.quantities)) == len(self.votes):
+                self._weighted_profile = WeightedProfile(self.distinct_votes, self.quantities,
+                                                         self.num_candidates)
+            else:
+                self._weighted_profile = WeightedProfile.from_votes(self.votes,
+                                                                    self.num_candidates)
+        return self._weighted_profile
+
     def import_ordinal_election(self):
         """ Import ordinal election. """
 
@@ -173,7 +242,23 @@ class OrdinalElection(Election):
                 and len(self.bordawise_vector) > 0 \
                 and not is_recomputed:
             return self.bordawise_vector
-        return self._votes_to_bordawise_vector()
+        self.bordawise_vector = self._votes_to_bordawise_vector()
+        return self.bordawise_vector
+
+    def get_pairwise_matrix(self, is_recomputed=False) -> np.ndarray:
+        """Return the pairwise (majority) matrix, computing it if needed.
+
+        The matrix is cached until the votes are reassigned; use `is_recomputed`
+        after modifying the votes in place.
+
+        Parameters
+        ----------
+        is_recomputed : bool
+            If True, force recomputation even if a cached value exists.
+        """
+        if self._pairwise_matrix is None or is_recomputed:
+            self._pairwise_matrix = self.votes_to_pairwise_matrix()
+        return self._pairwise_matrix
 
     def get_potes(self, is_recomputed=False):
         """ Get potes. """
@@ -202,17 +287,7 @@ class OrdinalElection(Election):
                 params=self.params,
             )
         else:
-            for i in range(self.num_voters):
-                pos = 0
-                for j in range(self.num_candidates):
-                    vote = self.votes[i][j]
-                    if vote == -1:
-                        continue
-                    frequency_matrix[vote][pos] += 1
-                    pos += 1
-            for i in range(self.num_candidates):
-                for j in range(self.num_candidates):
-                    frequency_matrix[i][j] /= float(self.num_voters)
+            frequency_matrix = self.get_weighted_profile().frequency_matrix(self.num_voters)
 
         self.frequency_matrix = frequency_matrix
         return frequency_matrix
@@ -234,16 +309,9 @@ class OrdinalElection(Election):
                                            self.params,
                                            get_pairwise_matrix_for_guardian)
 
-        else:
-            for v in range(self.num_voters):
-                for c1 in range(self.num_candidates):
-                    for c2 in range(c1 + 1, self.num_candidates):
-                        matrix[int(self.votes[v][c1])][
-                            int(self.votes[v][c2])] += 1
-            for i in range(self.num_candidates):
-                for j in range(i + 1, self.num_candidates):
-                    matrix[i][j] /= float(self.num_voters)
-                    matrix[j][i] = 1. - matrix[i][j]
+        elif self.votes is not None and len(self.votes) > 0:
+            # Each distinct vote is counted once, weighted by its multiplicity.
+            matrix = self.get_weighted_profile().pairwise_counts() / float(self.num_voters)
         return matrix
 
     def _votes_to_bordawise_vector(self) -> np.ndarray:
@@ -265,51 +333,19 @@ class OrdinalElection(Election):
                                                  self.params,
                                                  get_pseudo_borda_vector)
         else:
-            c = self.num_candidates
-            v = self.num_voters
-            matrix = self._votes_to_frequency_matrix()
-            borda_vector = [sum([matrix[i][j] * (c - j - 1) for j in range(c)]) * v for i in
-                            range(self.num_candidates)]
-            borda_vector = sorted(borda_vector, reverse=True)
+            matrix = np.asarray(self._votes_to_frequency_matrix(), dtype=float)
+            scores = np.arange(self.num_candidates - 1, -1, -1)
+            borda_vector = -np.sort(-(matrix @ scores) * self.num_voters)
 
         return np.array(borda_vector)
 
     def votes_to_voterlikeness_matrix(self, vote_distance='swap') -> np.ndarray:
         """ convert VOTES to voter-likeness MATRIX """
-        matrix = np.zeros([self.num_voters, self.num_voters])
-        self.compute_potes()
-
-        for v1 in range(self.num_voters):
-            for v2 in range(self.num_voters):
-                if vote_distance == 'swap':
-                    matrix[v1][v2] = swap_distance_between_potes(self.potes[v1], self.potes[v2])
-                elif vote_distance == 'spearman':
-                    matrix[v1][v2] = spearman_distance_between_potes(self.potes[v1], self.potes[v2])
-
-        for i in range(self.num_voters):
-            for j in range(i + 1, self.num_voters):
-                matrix[j][i] = matrix[i][j]
-
-        return matrix
-
-    def votes_to_agg_voterlikeness_vector(self):
-        """ Converts ordinal votes to Borda vector. """
-
-        vector = np.zeros([self.num_voters])
-
-        for v1 in range(self.num_voters):
-            for v2 in range(self.num_voters):
-
-                swap_distance = 0
-                for i in range(self.num_candidates):
-                    for j in range(i + 1, self.num_candidates):
-                        if (self.potes[v1][i] > self.potes[v1][j] and
-                            self.potes[v2][i] < self.potes[v2][j]) or \
-                                (self.potes[v1][i] < self.potes[v1][j] and
-                                 self.potes[v2][i] > self.potes[v2][j]):
-                            swap_distance += 1
-                vector[v1] += swap_distance
+        return vote_distance_matrix(self.get_potes(), vote_distance)
 
+    def votes_to_agg_voterlikeness_vector(self, vote_distance='swap'):
+        """ Converts ordinal votes to the vector of total distances of each voter to all voters. """
+        vector = aggregated_vote_distances(self.get_potes(), vote_distance)
         return vector, len(vector)
 
     def compute_voting_rule(self, method=None, committee_size=None):
@@ -345,7 +381,9 @@ class OrdinalElection(Election):
                                                 num_candidates=self.num_candidates,
                                                 num_voters=self.num_voters,
                                                 params=self.params)
-        if not self.is_pseudo:
+        if self._can_group_votes():
+            self.num_distinct_votes = len(self.distinct_votes)
+        elif not self.is_pseudo:
             c = Counter(map(tuple, self.votes))
             counted_votes = [[count, list(row)] for row, count in c.items()]
             counted_votes = sorted(counted_votes, reverse=True)
@@ -359,8 +397,8 @@ class OrdinalElection(Election):
         if is_exported:
             exports.export_election_within_experiment(self, is_aggregated=is_aggregated)
 
-    def compute_distances(self, distance_id='swap', object_type=None):
-         """ Return: distances between votes """
+    def compute_distances(self, distance_id='swap', object_type=None, is_binary=False):
+         """ Return: distances between votes (exported to a binary store if is_binary) """
          if object_type is None:
              object_type = self.object_type
 
@@ -372,29 +410,18 @@ class OrdinalElection(Election):
          self.num_distinct_votes = self.num_dist_votes
 
          if object_type == 'vote':
-             distances = np.zeros([self.num_dist_votes, self.num_dist_votes])
-             for v1 in range(self.num_dist_votes):
-                 for v2 in range(self.num_dist_votes):
-                     if distance_id == 'swap':
-                         distances[v1][v2] = swap_distance_between_potes(
-                             self.distinct_potes[v1], self.distinct_potes[v2])
-                     elif distance_id == 'spearman':
-                         distances[v1][v2] = spearman_distance_between_potes(
-                             self.distinct_potes[v1], self.distinct_potes[v2])
+             if distance_id in {'swap', 'spearman'}:
+                 distances = vote_distance_matrix(self.distinct_potes, distance_id)
+             else:
+                 distances = np.zeros([self.num_dist_votes, self.num_dist_votes])
          elif object_type == 'candidate':
              self.compute_potes()
              if distance_id == 'domination':
-                 distances = self.votes_to_pairwise_matrix()
+                 distances = self.get_pairwise_matrix()
                  distances = np.abs(distances - 0.5) * self.num_voters
                  np.fill_diagonal(distances, 0)
              elif distance_id == 'position':
-                 distances = np.zeros([self.num_candidates, self.num_candidates])
-                 for c1 in range(self.num_candidates):
-                     for c2 in range(self.num_candidates):
-                         dist = 0
-                         for pote in self.potes:
-                             dist += abs(pote[c1] - pote[c2])
-                         distances[c1][c2] = dist
+                 distances = candidate_distance_matrix(self.potes)
          else:
              logging.warning('incorrect object_type')
              distances = []
@@ -402,7 +429,7 @@ class OrdinalElection(Election):
          self.distances[object_type] = distances
 
          if self.is_exported:
-             exports.export_distances(self, object_type=object_type)
+             exports.export_distances(self, object_type=object_type, is_binary=is_binary)
 
     def is_condorcet(self):
         """ Check if election witness Condorcet winner"""
@@ -580,5 +607,4 @@ def convert_votes_to_potes(votes) -> np.ndarray:
     np.ndarray
         Array of potes with shape (len(votes), num_candidates).
     """
-    return np.array([[list(vote).index(i) for i, _ in enumerate(vote)]
-                     for vote in votes])
+    return votes_to_potes(votes)
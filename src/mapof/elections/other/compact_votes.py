@@ -0,0 +1,102 @@
+"""
+Compact storage of ordinal votes.
+
+Votes are kept as integer arrays of the smallest signed type that holds all
+candidate ids (and -1, which marks an empty position of a truncated vote): int8
+for up to 127 candidates, int16 for up to 32767 candidates. Multiplicities of
+distinct votes are kept as uint32.
+"""
+import numpy as np
+
+QUANTITY_DTYPE = np.uint32
+NATIVE_DTYPES = (np.dtype(np.int8), np.dtype(np.int16), np.dtype(np.int32))
+
+
+def compact_dtype(num_candidates: int) -> np.dtype:
+    """
+    Return: smallest signed integer type holding the ids of `num_candidates`
+    candidates (and -1)
+    """
+    for dtype in [np.int8, np.int16, np.int32]:
+        if num_candidates - 1 <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def compact_votes(votes):
+    """
+    Converts votes to a compact integer array.
+
+    Parameters
+    ----------
+        votes : array-like
+            Votes of shape (num_voters, num_candidates).
+
+    Returns
+    -------
+        np.ndarray or list
+            The votes as an array of the smallest sufficient type, or the given
+            votes unchanged if they are not a matrix of integers (e.g., ragged lists)
+            or a read-only array (e.g., a view of shared memory, kept without copying).
+    """
+    if votes is None or (isinstance(votes, np.ndarray)
+                         and (votes.dtype.kind not in 'iu' or not votes.flags.writeable)):
+        return votes
+    try:
+        array = np.asarray(votes)
+    except ValueError:
+        return votes
+    if array.ndim != 2 or array.dtype.kind not in 'iu':
+        return votes
+    if array.size == 0:
+        return array.astype(np.int8)
+    if array.min() < -1:
+        return array
+    return array.astype(compact_dtype(int(array.max()) + 1), copy=False)
+
+
+def native_votes(votes) -> np.ndarray:
+    """
+    Return: votes as a C-contiguous int8, int16 or int32 array (the types read by
+    the C++ extension); compact votes are returned without copying
+    """
+    if isinstance(votes, np.ndarray) and votes.dtype in NATIVE_DTYPES \
+            and votes.flags.c_contiguous:
+        return votes
+    return np.ascontiguousarray(votes, dtype=np.int32)
+
+
+def compact_quantities(quantities):
+    """ Return: multiplicities as a uint32 array (None stays None) """
+    if quantities is None:
+        return None
+    return np.asarray(quantities, dtype=QUANTITY_DTYPE)
+
+
+def distinct_votes_with_counts(votes) -> (np.ndarray, np.ndarray):
+    """
+    Groups equal votes.
+
+    The distinct votes are ordered by decreasing multiplicity (and, among votes
+    with the same multiplicity, in decreasing lexicographic order), i.e., as
+    `sorted([[count, vote], ...], reverse=True)`.
+
+    Parameters
+    ----------
+        votes : array-like
+            Votes of shape (num_voters, num_candidates).
+
+    Returns
+    -------
+        (np.ndarray, np.ndarray)
+            Array of the distinct votes (of the type of `votes`) and uint32 array
+            of their multiplicities.
+    """
+    votes = compact_votes(votes)
+    if len(votes) == 0:
+        return np.asarray(votes).reshape(0, 0), np.zeros(0, dtype=QUANTITY_DTYPE)
+    distinct, counts = np.unique(votes, axis=0, return_counts=True)
+    keys = [-distinct[:, j].astype(np.int64) for j in reversed(range(distinct.shape[1]))]
+    order = np.lexsort(keys + [-counts])
+    return distinct[order], counts[order].astype(QUANTITY_DTYPE)
+
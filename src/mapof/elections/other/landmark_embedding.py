@@ -0,0 +1,132 @@
+"""
+Landmark multidimensional scaling (pivot MDS).
+
+Only the distances between all elections and a small set of landmark elections
+are needed: the landmarks are embedded by classical MDS, and every election is
+placed by distance-based triangulation with respect to the landmarks (which
+reproduces the positions of the landmarks themselves).
+"""
+import numpy as np
+
+
+def maxmin_landmarks(num_elections: int, num_landmarks: int, distances_to: callable,
+                     seed: int = 0) -> (list, np.ndarray):
+    """
+    Chooses landmarks greedily, each as far as possible from the previous ones.
+
+    Parameters
+    ----------
+        num_elections : int
+            Number of elections.
+        num_landmarks : int
+            Number of landmarks.
+        distances_to : callable
+            Function returning the array of distances from the election of the given
+            index to all elections.
+        seed : int
+            Seed of the choice of the first landmark.
+
+    Returns
+    -------
+        (list, np.ndarray)
+            Indices of the landmarks and the array of shape (num_elections,
+            num_landmarks) with the distances to them.
+    """
+    num_landmarks = min(num_landmarks, num_elections)
+    landmarks = [int(np.random.default_rng(seed).integers(num_elections))]
+    columns = [np.asarray(distances_to(landmarks[0]), dtype=float)]
+    nearest = columns[0].copy()
+    while len(landmarks) < num_landmarks:
+        nearest[landmarks] = -1
+        landmarks.append(int(np.argmax(nearest)))
+        columns.append(np.asarray(distances_to(landmarks[-1]), dtype=float))
+        nearest = np.minimum(nearest, columns[-1])
+    return landmarks, np.stack(columns, axis=1)
+
+
+def stratified_landmarks(groups: list, num_landmarks: int, seed: int = 0) -> list:
+    """
+    Chooses landmarks at random within groups (e.g., families of elections), in
+    numbers proportional to the sizes of the groups, with at least one landmark
+    per group if there are enough landmarks.
+
+    Parameters
+    ----------
+        groups : list[list[int]]
+            Indices of the elections of each group.
+        num_landmarks : int
+            Number of landmarks.
+        seed : int
+            Seed of the random choice.
+
+    Returns
+    -------
+        list
+            Indices of the landmarks.
+    """
+    rng = np.random.default_rng(seed)
+    groups = [group for group in groups if len(group) > 0]
+    sizes = np.array([len(group) for group in groups])
+    num_landmarks = min(num_landmarks, int(sizes.sum()))
+
+    counts = np.zeros(len(groups), dtype=int)
+    if num_landmarks >= len(groups):
+        counts += 1
+    shares = (num_landmarks - counts.sum()) * sizes / sizes.sum()
+    counts = np.minimum(counts + np.floor(shares).astype(int), sizes)
+    for k in np.argsort(-(shares - np.floor(shares)), kind='stable'):
+        if counts.sum() >= num_landmarks:
+            break
+        if counts[k] < sizes[k]:
+            counts[k] += 1
+    while counts.sum() < num_landmarks:
+        counts[np.argmax(sizes - counts)] += 1
+
+    landmarks = []
+    for group, count in zip(groups, counts):
+        landmarks += [int(i) for i in rng.choice(group, size=count, replace=False)]
+    return landmarks
+
+
+def landmark_mds(distances_to_landmarks: np.ndarray, landmarks: list,
+                 dim: int = 2) -> np.ndarray:
+    """
+    Embeds all elections given their distances to the landmarks.
+
+    Parameters
+    ----------
+        distances_to_landmarks : np.ndarray
+            Array of shape (num_elections, num_landmarks).
+        landmarks : list
+            Indices (rows) of the landmarks, in the order of the columns.
+        dim : int
+            Dimension of the embedding.
+
+    Returns
+    -------
+        np.ndarray
+            Array of shape (num_elections, dim) with the coordinates.
+    """
+    squared = np.asarray(distances_to_landmarks, dtype=float) ** 2
+    landmark_squared = squared[landmarks]
+    landmark_squared = (landmark_squared + landmark_squared.T) / 2
+
+    # Classical MDS of the landmarks (double centering of the squared distances).
+    num_landmarks = len(landmarks)
+    centering = np.eye(num_landmarks) - np.ones([num_landmarks, num_landmarks]) / num_landmarks
+    eigenvalues, eigenvectors = np.linalg.eigh(-centering @ landmark_squared @ centering / 2)
+    order = np.argsort(eigenvalues)[::-1][:dim]
+    eigenvalues, eigenvectors = eigenvalues[order], eigenvectors[:, order]
+    is_positive = eigenvalues > 1e-12 * max(1., abs(eigenvalues).max(initial=0.))
+
+    # Triangulation: the pseudo-inverse of the landmark coordinates applied to
+    # the deviation of the squared distances from their mean over the landmarks.
+    pseudo_inverse = np.zeros_like(eigenvectors)
+    pseudo_inverse[:, is_positive] = eigenvectors[:, is_positive] \
+        / np.sqrt(eigenvalues[is_positive])
+    coordinates = -(squared - landmark_squared.mean(axis=0)) @ pseudo_inverse / 2
+
+    if coordinates.shape[1] < dim:
+        coordinates = np.hstack([coordinates,
+                                 np.zeros([len(coordinates), dim - coordinates.shape[1]])])
+    return coordinates
@@ -0,0 +1,181 @@
+"""
+Vectorized distances between all pairs of votes given as potes (positional votes).
+
+The swap distance counts, for every pair of candidates, a disagreement of the
+two votes as 1 and a tie in exactly one of the votes as 1/2 (potes of
+truncated votes may contain ties). With the signs s = sign(pote[a] - pote[b])
+of all pairs of candidates a < b, the contribution of a pair is
+|s_1 - s_2| / 2 = (s_1^2 + s_2^2 - s_1 s_2 - s_1^2 s_2^2) / 2,
+so the distances between all votes reduce to two matrix products. For truncated
+votes (where a tie in the first vote means that neither candidate is compared),
+the contribution is s_1^2 (1 - s_1 s_2) / 2 = (s_1^2 - s_1 s_2) / 2.
+"""
+import numpy as np
+from scipy.spatial.distance import cdist
+
+# Upper bound on the number of entries of a single temporary array
+MAX_CHUNK_ENTRIES = 2 ** 22
+
+
+def pairwise_order_signs(potes: np.ndarray, pairs=slice(None)) -> np.ndarray:
+    """
+    Computes the signs of pote[a] - pote[b] for the pairs of candidates a < b
+    (in the order of np.triu_indices).
+
+    Parameters
+    ----------
+        potes : np.ndarray
+            Potes of shape (num_voters, num_candidates).
+        pairs : slice
+            Range of the pairs of candidates to consider.
+
+    Returns
+    -------
+        np.ndarray
+            Array of shape (num_voters, num_pairs) with entries -1, 0 or 1.
+    """
+    first, second = np.triu_indices(potes.shape[1], 1)
+    return np.sign(potes[:, first[pairs]] - potes[:, second[pairs]])
+
+
+def swap_cost_table(potes_1, potes_2, is_truncated: bool = False) -> np.ndarray:
+    """
+    Computes the swap distances between all votes of the first and of the second
+    profile.
+
+    Parameters
+    ----------
+        potes_1 : array-like
+            Potes of shape (n_1, num_candidates).
+        potes_2 : array-like
+            Potes of shape (n_2, num_candidates).
+        is_truncated : bool
+            If True, pairs of candidates tied in a vote of the first profile
+            (i.e., not ranked by a truncated vote) are not counted; otherwise,
+            a tie in exactly one of the votes counts as half a swap.
+
+    Returns
+    -------
+        np.ndarray
+            Array of shape (n_1, n_2).
+    """
+    potes_1 = np.asarray(potes_1, dtype=float)
+    potes_2 = np.asarray(potes_2, dtype=float)
+    num_pairs = potes_1.shape[1] * (potes_1.shape[1] - 1) // 2
+    table = np.zeros([len(potes_1), len(potes_2)])
+    step = max(1, MAX_CHUNK_ENTRIES // max(1, len(potes_1), len(potes_2)))
+    for start in range(0, num_pairs, step):
+        pairs = slice(start, start + step)
+        signs_1 = pairwise_order_signs(potes_1, pairs)
+        signs_2 = pairwise_order_signs(potes_2, pairs)
+        table -= signs_1 @ signs_2.T
+        strict_1 = signs_1 * signs_1
+        if is_truncated:
+            table += strict_1.sum(axis=1)[:, np.newaxis]
+        elif np.all(signs_1) and np.all(signs_2):
+            table += signs_1.shape[1]
+        else:
+            strict_2 = signs_2 * signs_2
+            table += strict_1.sum(axis=1)[:, np.newaxis] + strict_2.sum(axis=1)[np.newaxis, :]
+            table -= strict_1 @ strict_2.T
+    return table / 2
+
+
+def vote_distance_blocks(potes, vote_distance: str = 'swap'):
+    """
+    Computes the distances between all pairs of votes, a block of rows at a time.
+
+    Parameters
+    ----------
+        potes : array-like
+            Potes of shape (num_voters, num_candidates).
+        vote_distance : str
+            Either 'swap' or 'spearman'.
+
+    Yields
+    ------
+        (int, np.ndarray)
+            Index of the first vote of the block and the distances between the
+            votes of the block and all votes.
+    """
+    potes = np.asarray(potes, dtype=float)
+    if vote_distance not in {'swap', 'spearman'}:
+        raise ValueError(f'Unknown vote distance: {vote_distance}')
+    if len(potes) == 0:
+        return
+
+    step = max(1, MAX_CHUNK_ENTRIES // max(1, potes.size))
+    for start in range(0, len(potes), step):
+        potes_block = potes[start:start + step]
+        if vote_distance == 'swap':
+            yield start, swap_cost_table(potes_block, potes)
+        else:
+            yield start, cdist(potes_block, potes, 'cityblock')
+
+
+def vote_distance_matrix(potes, vote_distance: str = 'swap') -> np.ndarray:
+    """
+    Computes the matrix of distances between all pairs of votes.
+
+    Parameters
+    ----------
+        potes : array-like
+            Potes of shape (num_voters, num_candidates).
+        vote_distance : str
+            Either 'swap' or 'spearman'.
+
+    Returns
+    -------
+        np.ndarray
+            Symmetric array of shape (num_voters, num_voters).
+    """
+    matrix = np.zeros([len(potes), len(potes)])
+    for start, block in vote_distance_blocks(potes, vote_distance):
+        matrix[start:start + len(block)] = block
+    return matrix
+
+
+def aggregated_vote_distances(potes, vote_distance: str = 'swap') -> np.ndarray:
+    """
+    Computes, for every vote, the sum of its distances to all votes, without
+    storing the whole matrix of distances.
+
+    Parameters
+    ----------
+        potes : array-like
+            Potes of shape (num_voters, num_candidates).
+        vote_distance : str
+            Either 'swap' or 'spearman'.
+
+    Returns
+    -------
+        np.ndarray
+            Array of shape (num_voters,).
+    """
+    vector = np.zeros([len(potes)])
+    for start, block in vote_distance_blocks(potes, vote_distance):
+        vector[start:start + len(block)] = block.sum(axis=1)
+    return vector
+
+
+def candidate_distance_matrix(potes, weights=None) -> np.ndarray:
+    """
+    Computes the total difference of positions of every pair of candidates,
+    summed over the votes.
+
+    Parameters
+    ----------
+        potes : array-like
+            Potes of shape (num_voters, num_candidates).
+        weights : array-like
+            Multiplicities of the votes (by default, ones).
+
+    Returns
+    -------
+        np.ndarray
+            Symmetric array of shape (num_candidates, num_candidates).
+    """
+    potes = np.asarray(potes, dtype=float)
+    if weights is not None:
+        potes = potes * np.asarray(weights, dtype=float)[:, np.newaxis]
+    return vote_distance_matrix(potes.T, 'spearman')
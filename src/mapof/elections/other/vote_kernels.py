@@ -0,0 +1,219 @@
+"""
+Vectorized kernels building the basic statistics of ordinal votes: potes
+(positions of the candidates), frequency matrices, Borda scores and pairwise
+preference counts.
+
+Votes are matrices of candidate ids, in which -1 marks an empty position of a
+truncated vote (ragged lists of votes are padded with -1). Positions count only
+the ranked candidates of a vote. Optional weights give the multiplicity of each
+vote (e.g., of the distinct votes of an election).
+"""
+import numpy as np
+
+# Upper bound on the number of entries of a single temporary array
+MAX_CHUNK_ENTRIES = 2 ** 22
+
+
+def as_vote_matrix(votes, num_candidates: int = None) -> np.ndarray:
+    """
+    Converts votes to a matrix, padding shorter (truncated) votes with -1.
+
+    Parameters
+    ----------
+        votes : array-like
+            Votes (rows of candidate ids).
+        num_candidates : int
+            Number of candidates (by default, the length of the longest vote).
+
+    Returns
+    -------
+        np.ndarray
+            Integer array of shape (num_voters, num_candidates).
+    """
+    if isinstance(votes, np.ndarray) and votes.ndim == 2 and votes.dtype.kind in 'iu' \
+            and (num_candidates is None or votes.shape[1] == num_candidates):
+        return votes
+    votes = [list(vote) for vote in votes]
+    if num_candidates is None:
+        num_candidates = max([len(vote) for vote in votes], default=0)
+    matrix = np.full([len(votes), num_candidates], -1, dtype=np.int64)
+    for i, vote in enumerate(votes):
+        matrix[i, :len(vote)] = vote
+    return matrix
+
+
+def _ranked_entries(votes: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+    """ Return: voters, candidates and positions (among the ranked ones) of all entries """
+    is_ranked = votes >= 0
+    if is_ranked.all():
+        voters, positions = np.indices(votes.shape).reshape(2, -1)
+        return voters, votes.reshape(-1), positions
+    voters, columns = np.nonzero(is_ranked)
+    positions = np.cumsum(is_ranked, axis=1)[voters, columns] - 1
+    return voters, votes[voters, columns], positions
+
+
+def votes_to_potes(votes, num_candidates: int = None, mapping=None) -> np.ndarray:
+    """
+    Converts votes to potes: pote[c] is the position of candidate c in the vote.
+
+    Complete votes give int64 potes, also for compact (e.g., int8) votes, so that
+    arithmetic on the positions does not overflow. In a truncated vote, all
+    unranked candidates get the average of the remaining positions (so the potes
+    are floats).
+
+    Parameters
+    ----------
+        votes : array-like
+            Votes of shape (num_voters, num_candidates).
+        num_candidates : int
+            Number of candidates.
+        mapping : list
+            If given, the i-th entry of a pote is the position of candidate mapping[i].
+
+    Returns
+    -------
+        np.ndarray
+            Potes of shape (num_voters, num_candidates).
+    """
+    votes = as_vote_matrix(votes, num_candidates)
+    num_voters, num_candidates = votes.shape
+
+    if np.all(votes >= 0):
+        potes = np.empty(votes.shape, dtype=np.int64)
+        potes[np.arange(num_voters)[:, np.newaxis], votes] = np.arange(num_candidates)
+    else:
+        num_ranked = (votes >= 0).sum(axis=1)
+        unranked_position = num_ranked + (num_candidates - 1 - num_ranked) / 2
+        potes = np.repeat(unranked_position[:, np.newaxis], num_candidates, axis=1)
+        voters, candidates, positions = _ranked_entries(votes)
+        potes[voters, candidates] = positions
+
+    if mapping is not None:
+        potes = potes[:, list(mapping)]
+    return potes
+
+
+def votes_to_position_counts(votes, num_candidates: int = None, weights=None) -> np.ndarray:
+    """
+    Counts how many times each candidate is ranked at each position.
+
+    Parameters
+    ----------
+        votes : array-like
+            Votes of shape (num_voters, num_candidates).
+        num_candidates : int
+            Number of candidates.
+        weights : array-like
+            Multiplicities of the votes (by default, ones).
+
+    Returns
+    -------
+        np.ndarray
+            Array of shape (num_candidates, num_candidates); entry [c][p] is the
+            (weighted) number of votes ranking candidate c at position p.
+    """
+    votes = as_vote_matrix(votes, num_candidates)
+    num_candidates = votes.shape[1]
+    voters, candidates, positions = _ranked_entries(votes)
+    entry_weights = None if weights is None else np.asarray(weights, dtype=float)[voters]
+    counts = np.bincount(candidates.astype(np.int64) * num_candidates + positions,
+                         weights=entry_weights, minlength=num_candidates ** 2)
+    return counts.reshape(num_candidates, num_candidates).astype(float)
+
+
+def votes_to_frequency_matrix(votes, num_candidates: int = None, weights=None,
+                              num_voters: float = None) -> np.ndarray:
+    """
+    Computes the frequency matrix: entry [c][p] is the fraction of votes ranking
+    candidate c at position p.
+
+    Parameters
+    ----------
+        votes : array-like
+            Votes of shape (num_voters, num_candidates).
+        num_candidates : int
+            Number of candidates.
+        weights : array-like
+            Multiplicities of the votes (by default, ones).
+        num_voters : float
+            Normalizing constant (by default, the total weight of the votes).
+
+    Returns
+    -------
+        np.ndarray
+            Array of shape (num_candidates, num_candidates).
+    """
+    counts = votes_to_position_counts(votes, num_candidates, weights)
+    if num_voters is None:
+        num_voters = len(as_vote_matrix(votes, num_candidates)) if weights is None \
+            else float(np.sum(weights))
+    return counts / float(num_voters) if num_voters else counts
+
+
+def borda_scores(votes, num_candidates: int = None, weights=None) -> np.ndarray:
+    """
+    Computes the Borda scores (m - 1 - position, summed over the votes).
+
+    Parameters
+    ----------
+        votes : array-like
+            Votes of shape (num_voters, num_candidates).
+        num_candidates : int
+            Number of candidates.
+        weights : array-like
+            Multiplicities of the votes (by default, ones).
+
+    Returns
+    -------
+        np.ndarray
+            Array of shape (num_candidates,).
+    """
+    counts = votes_to_position_counts(votes, num_candidates, weights)
+    return counts @ np.arange(len(counts) - 1, -1, -1)
+
+
+def pairwise_preference_counts(potes, weights=None) -> np.ndarray:
+    """
+    Counts, for every pair of candidates, the votes preferring one to the other.
+
+    Parameters
+    ----------
+        potes : array-like
+            Potes of shape (num_voters, num_candidates).
+        weights : array-like
+            Multiplicities of the votes (by default, ones).
+
+    Returns
+    -------
+        np.ndarray
+            Array of shape (num_candidates, num_candidates); entry [a][b] is the
+            (weighted) number of votes ranking a strictly above b.
+    """
+    potes = np.asarray(potes)
+    num_voters, num_candidates = potes.shape
+    weights = np.ones(num_voters) if weights is None else np.asarray(weights, dtype=float)
+    counts = np.zeros([num_candidates, num_candidates])
+    step = max(1, MAX_CHUNK_ENTRIES // max(1, num_candidates ** 2))
+    for start in range(0, num_voters, step):
+        chunk = potes[start:start + step]
+        preferred = chunk[:, :, np.newaxis] < chunk[:, np.newaxis, :]
+        counts += np.tensordot(weights[start:start + step], preferred, axes=1)
+    return counts
+
+
+def unique_potes(potes) -> (np.ndarray, np.ndarray):
+    """
+    Groups equal potes.
+
+    Parameters
+    ----------
+        potes : array-like
+            Potes of shape (num_voters, num_candidates).
+
+    Returns
+    -------
+        (np.ndarray, np.ndarray)
+            Array of the distinct potes and array of their multiplicities.
+    """
+    return np.unique(np.asarray(potes), axis=0, return_counts=True)
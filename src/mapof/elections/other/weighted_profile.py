@@ -0,0 +1,97 @@
+"""
+Weighted profiles: the distinct votes of an election together with their
+multiplicities. Features evaluated on a weighted profile cost time proportional
+to the number of distinct votes rather than to the number of voters.
+"""
+import numpy as np
+
+from mapof.elections.other.compact_votes import distinct_votes_with_counts
+from mapof.elections.other.vote_distances import vote_distance_matrix
+from mapof.elections.other.vote_kernels import (
+    as_vote_matrix,
+    borda_scores,
+    pairwise_preference_counts,
+    votes_to_frequency_matrix,
+    votes_to_position_counts,
+    votes_to_potes
+)
+
+
+class WeightedProfile:
+    """
+    Distinct votes with their multiplicities.
+
+    Parameters
+    ----------
+        votes : array-like
+            Distinct votes of shape (num_distinct_votes, num_candidates); -1 marks
+            an empty position of a truncated vote.
+        weights : array-like
+            Multiplicity of each of the votes.
+        num_candidates : int
+            Number of candidates.
+    """
+
+    def __init__(self, votes, weights, num_candidates: int = None):
+        self.votes = as_vote_matrix(votes, num_candidates)
+        self.weights = np.asarray(weights, dtype=np.int64)
+        self.num_candidates = self.votes.shape[1]
+        self.num_distinct_votes = len(self.votes)
+        self.num_voters = int(self.weights.sum())
+        self._potes = None
+        self._vote_distances = {}
+
+    @classmethod
+    def from_votes(cls, votes, num_candidates: int = None) -> 'WeightedProfile':
+        """ Groups equal votes (shorter votes are padded with -1). """
+        votes = as_vote_matrix(votes, num_candidates)
+        if len(votes) == 0:
+            return cls(votes, np.zeros(0, dtype=np.int64), num_candidates)
+        return cls(*distinct_votes_with_counts(votes), num_candidates)
+
+    def __iter__(self):
+        """ Iterates over pairs (vote, multiplicity), as lists and ints. """
+        return zip(self.votes.tolist(), self.weights.tolist())
+
+    def __len__(self):
+        return self.num_distinct_votes
+
+    @property
+    def potes(self) -> np.ndarray:
+        """ Potes of the distinct votes. """
+        if self._potes is None:
+            self._potes = votes_to_potes(self.votes)
+        return self._potes
+
+    def position_counts(self) -> np.ndarray:
+        """ Return: number of voters ranking candidate c at position p, as [c][p] """
+        return votes_to_position_counts(self.votes, weights=self.weights)
+
+    def frequency_matrix(self, num_voters: float = None) -> np.ndarray:
+        """ Return: fraction of voters ranking candidate c at position p, as [c][p] """
+        return votes_to_frequency_matrix(self.votes, weights=self.weights,
+                                         num_voters=num_voters)
+
+    def borda_scores(self) -> np.ndarray:
+        """ Return: Borda score of every candidate """
+        return borda_scores(self.votes, weights=self.weights)
+
+    def pairwise_counts(self) -> np.ndarray:
+        """ Return: number of voters ranking a above b, as [a][b] """
+        return pairwise_preference_counts(self.potes, weights=self.weights)
+
+    def vote_distances(self, vote_distance: str = 'swap') -> np.ndarray:
+        """ Return: matrix of the distances between the distinct votes """
+        if vote_distance not in self._vote_distances:
+            self._vote_distances[vote_distance] = vote_distance_matrix(self.potes, vote_distance)
+        return self._vote_distances[vote_distance]
+
+    def pair_weights(self) -> np.ndarray:
+        """
+        Return: number of ordered pairs of distinct voters casting the i-th and
+        the j-th vote, as [i][j]
+        """
+        weights = self.weights.astype(float)
+        pair_weights = np.outer(weights, weights)
+        pair_weights[np.diag_indices_from(pair_weights)] -= weights
+        return pair_weights
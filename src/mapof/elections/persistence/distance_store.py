@@ -0,0 +1,231 @@
+"""
+Binary, memory-mapped store of the distances between all pairs of objects
+(elections of an experiment, or votes/candidates of an election).
+
+The store `<path>` consists of the following files:
+    <path>.dist  -- float64 distances of the pairs i <= j (packed upper triangle),
+    <path>.time  -- float64 computation times, in the same layout,
+    <path>.done  -- bitmap of the pairs whose distance has been written,
+    <path>.json  -- ids of the objects and the distance id.
+A pair is marked as done only after its distance is flushed to disk, so after a
+crash the bitmap lists exactly the pairs that do not have to be recomputed.
+Several processes may write distinct pairs at the same time; only the owner of
+the store should mark them as done.
+"""
+import json
+import os
+
+import numpy as np
+
+EXTENSIONS = ('dist', 'time', 'done', 'json')
+
+
+def store_exists(path: str) -> bool:
+    """ Checks if all files of the store exist. """
+    return all(os.path.isfile(f'{path}.{extension}') for extension in EXTENSIONS)
+
+
+def remove_store(path: str) -> None:
+    """ Removes all files of the store. """
+    for extension in EXTENSIONS:
+        if os.path.isfile(f'{path}.{extension}'):
+            os.remove(f'{path}.{extension}')
+
+
+class DistanceStore:
+    """
+    Memory-mapped distances between all pairs of objects.
+
+    Opening an existing store with the same ids maps its files; if the ids differ
+    (e.g., elections were added or removed), the completed pairs of the common
+    objects are copied to a new store.
+
+    Parameters
+    ----------
+        path : str
+            Path to the store (without an extension).
+        instance_ids : list
+            Ids of the objects; pairs are given by indices into this list. If None,
+            the ids are read from an existing store.
+        distance_id : str
+            Name of the distance.
+        mode : str
+            'r' (read-only) or 'r+' (read and write).
+    """
+
+    def __init__(self, path: str, instance_ids: list = None, distance_id: str = None,
+                 mode: str = 'r+'):
+        self.path = path
+        self.mode = mode
+
+        stored_ids, stored_distance_id = None, None
+        if store_exists(path):
+            with open(f'{path}.json', 'r') as file_:
+                metadata = json.load(file_)
+            stored_ids, stored_distance_id = metadata['instance_ids'], metadata['distance_id']
+        elif instance_ids is None or mode == 'r':
+            raise FileNotFoundError(f'No distance store at {path}')
+
+        if instance_ids is None:
+            instance_ids = stored_ids
+        self.instance_ids = list(instance_ids)
+        self.distance_id = distance_id if distance_id is not None else stored_distance_id
+        self.num_instances = len(self.instance_ids)
+        self.num_pairs = self.num_instances * (self.num_instances + 1) // 2
+
+        if stored_ids == self.instance_ids and stored_distance_id == self.distance_id:
+            self._map(mode)
+        elif mode == 'r':
+            raise ValueError(f'The distance store at {path} has different ids')
+        elif stored_ids is not None and stored_distance_id == self.distance_id:
+            self._remap(DistanceStore(path, mode='r'))
+        else:
+            self._create()
+
+    def _map(self, mode: str) -> None:
+        self.distances = np.memmap(f'{self.path}.dist', dtype=np.float64, mode=mode,
+                                   shape=(max(1, self.num_pairs),))
+        self.times = np.memmap(f'{self.path}.time', dtype=np.float64, mode=mode,
+                               shape=(max(1, self.num_pairs),))
+        self.done = np.memmap(f'{self.path}.done', dtype=np.uint8, mode=mode,
+                              shape=(max(1, -(-self.num_pairs // 8)),))
+
+    def _create(self) -> None:
+        """ Creates empty files (the metadata is written last). """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        remove_store(self.path)
+        self._map('w+')
+        self.flush()
+        with open(f'{self.path}.json', 'w') as file_:
+            json.dump({'instance_ids': self.instance_ids,
+                       'distance_id': self.distance_id}, file_)
+
+    def _remap(self, old: 'DistanceStore') -> None:
+        """ Creates the store with the completed pairs of the common objects of `old`. """
+        old_position = {instance_id: idx for idx, instance_id in enumerate(old.instance_ids)}
+        common = [(idx, old_position[instance_id])
+                  for idx, instance_id in enumerate(self.instance_ids)
+                  if instance_id in old_position]
+        pairs, old_pairs = [], []
+        for a, (i, old_i) in enumerate(common):
+            for j, old_j in common[a:]:
+                pairs.append((i, j))
+                old_pairs.append((old_i, old_j))
+        is_done = old.is_done(old_pairs)
+        old_pairs = np.array(old_pairs, dtype=np.int64).reshape(-1, 2)[is_done]
+        old_index = old.pair_index(old_pairs)
+        values = (np.array(old.distances[old_index]), np.array(old.times[old_index]))
+        old.close()
+
+        # The new store is written next to the old one, which is replaced only
+        # once the copy is complete (the metadata last).
+        path, self.path = self.path, f'{self.path}.tmp'
+        self._create()
+        self.write(np.array(pairs, dtype=np.int64).reshape(-1, 2)[is_done], *values)
+        self.close()
+        for extension in EXTENSIONS:
+            os.replace(f'{self.path}.{extension}', f'{path}.{extension}')
+        self.path = path
+        self._map(self.mode)
+
+    def pair_index(self, pairs) -> np.ndarray:
+        """ Return: positions of the given pairs (of indices) in the packed arrays """
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        first, second = pairs.min(axis=1), pairs.max(axis=1)
+        return first * self.num_instances - first * (first - 1) // 2 + (second - first)
+
+    def write_values(self, pairs, distances, times=None) -> None:
+        """
+        Writes distances without marking the pairs as done (e.g., in a worker
+        process).
+
+        Parameters
+        ----------
+            pairs : array-like
+                Pairs (i, j) of indices.
+            distances : array-like
+                Distances of the pairs.
+            times : array-like
+                Computation times of the pairs.
+        """
+        index = self.pair_index(pairs)
+        self.distances[index] = distances
+        if times is not None:
+            self.times[index] = times
+
+    def mark_done(self, pairs, is_exclusive: bool = False) -> None:
+        """
+        Marks the given pairs as done, after their distances are flushed to disk.
+
+        Parameters
+        ----------
+            pairs : array-like
+                Pairs (i, j) of indices.
+            is_exclusive : bool
+                If True, all other pairs are marked as not done.
+        """
+        index = self.pair_index(pairs)
+        self.distances.flush()
+        self.times.flush()
+        bits = np.left_shift(1, index % 8).astype(np.uint8)
+        if is_exclusive:
+            done = np.zeros_like(self.done)
+            np.bitwise_or.at(done, index // 8, bits)
+            self.done[:] = done
+        else:
+            np.bitwise_or.at(self.done, index // 8, bits)
+        self.done.flush()
+
+    def write(self, pairs, distances, times=None, is_exclusive: bool = False) -> None:
+        """ Writes the distances of the given pairs and marks them as done. """
+        self.write_values(pairs, distances, times)
+        self.mark_done(pairs, is_exclusive=is_exclusive)
+
+    def is_done(self, pairs) -> np.ndarray:
+        """ Return: boolean array telling which of the given pairs are done """
+        index = self.pair_index(pairs)
+        return (self.done[index // 8] >> (index % 8)) & 1 == 1
+
+    def done_pairs(self) -> np.ndarray:
+        """ Return: array of shape (num_done, 2) with the pairs i <= j that are done """
+        bits = np.unpackbits(np.asarray(self.done), bitorder='little')[:self.num_pairs]
+        first, second = np.triu_indices(self.num_instances)
+        is_done = bits.astype(bool)
+        return np.stack([first[is_done], second[is_done]], axis=1)
+
+    def matrix(self, missing: float = np.nan) -> np.ndarray:
+        """ Return: symmetric matrix of the distances (missing ones set to `missing`) """
+        matrix = np.full([self.num_instances, self.num_instances], missing, dtype=float)
+        pairs = self.done_pairs()
+        values = self.distances[self.pair_index(pairs)]
+        matrix[pairs[:, 0], pairs[:, 1]] = values
+        matrix[pairs[:, 1], pairs[:, 0]] = values
+        return matrix
+
+    def to_dicts(self) -> (dict, dict):
+        """ Return: distances and times of the pairs that are done, as nested dictionaries """
+        distances = {instance_id: {} for instance_id in self.instance_ids}
+        times = {instance_id: {} for instance_id in self.instance_ids}
+        pairs = self.done_pairs()
+        index = self.pair_index(pairs)
+        for (i, j), distance, time_ in zip(pairs.tolist(), self.distances[index].tolist(),
+                                           self.times[index].tolist()):
+            instance_1, instance_2 = self.instance_ids[i], self.instance_ids[j]
+            distances[instance_1][instance_2] = distances[instance_2][instance_1] = distance
+            times[instance_1][instance_2] = times[instance_2][instance_1] = time_
+        return distances, times
+
+    def clear(self) -> None:
+        """ Marks all pairs as not done. """
+        self.done[:] = 0
+        self.done.flush()
+
+    def flush(self) -> None:
+        if self.mode != 'r':
+            self.distances.flush()
+            self.times.flush()
+            self.done.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self.distances = self.times = self.done = None
@@ -2,8 +2,11 @@ import csv
 import os
 from collections import Counter
 
+import numpy as np
 from mapof.core.utils import make_folder_if_do_not_exist
 
+from mapof.elections.persistence.distance_store import DistanceStore
+
 
 def export_votes_to_file(
         election,
@@ -247,7 +250,8 @@ def export_pseudo_ordinal_election(election, path):
 
 def export_distances(
         election,
-        object_type: str = 'vote'
+        object_type: str = 'vote',
+        is_binary: bool = False
 ) -> None:
     """
     Exports distances to a csv file.
@@ -258,12 +262,25 @@ def export_distances(
             Election.
         object_type : str
             Object type.
+        is_binary : bool
+            If True then distances are stored in a binary, memory-mapped
+            `DistanceStore` instead of a csv file.
 
     Returns
     -------
         None
     """
 
+    if is_binary:
+        matrix = np.asarray(election.distances[object_type], dtype=float)
+        path = os.path.join(os.getcwd(), "experiments", election.experiment_id, "distances",
+                            f'{election.election_id}_{object_type}')
+        store = DistanceStore(path, list(range(len(matrix))), distance_id=object_type)
+        first, second = np.triu_indices(len(matrix))
+        store.write(np.stack([first, second], axis=1), matrix[first, second])
+        store.close()
+        return
+
     file_name = f'{election.election_id}_{object_type}.csv'
     path = os.path.join(os.getcwd(), "experiments", election.experiment_id, "distances",
                         file_name)
@@ -1,7 +1,10 @@
+import itertools
+
 import pytest
 import numpy as np
 
 import mapof.elections as mapel
+from mapof.elections.distances import main_approval_distances as mad
 
 registered_approval_distances_to_test = {
     'l1-approvalwise',
@@ -28,3 +31,41 @@ class TestOrdinalDistances:
         distance, mapping = mapel.compute_distance(ele_1, ele_2, distance_id=distance_id)
 
         assert type(float(distance)) is float
+
+
+def _hamming_distance_bf(election_1, election_2):
+    matrix_1 = mad.approval_matrix(election_1)
+    matrix_2 = mad.approval_matrix(election_2)
+    num_voters, num_candidates = matrix_1.shape
+    return min((matrix_1 != matrix_2[list(voters)][:, list(candidates)]).sum()
+               for candidates in itertools.permutations(range(num_candidates))
+               for voters in itertools.permutations(range(num_voters)))
+
+
+class TestHammingDistance:
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_hamming_matches_brute_force(self, seed):
+        np.random.seed(seed)
+        ele_1, ele_2 = [mapel.generate_approval_election(culture_id='impartial', p=0.4,
+                                                         num_voters=5, num_candidates=4)
+                        for _ in range(2)]
+
+        distance, mapping = mapel.compute_distance(ele_1, ele_2, distance_id='hamming')
+        approx, _ = mad.hamming_distance(ele_1, ele_2, is_exact=False)
+
+        assert distance == _hamming_distance_bf(ele_1, ele_2)
+        assert approx >= distance
+        assert sorted(mapping) == list(range(4))
+
+    def test_hamming_of_relabelled_election_is_zero(self):
+        np.random.seed(0)
+        ele_1 = mapel.generate_approval_election(culture_id='impartial', p=0.3,
+                                                 num_voters=30, num_candidates=12)
+        relabel = np.random.permutation(12)
+        votes = [{int(relabel[c]) for c in vote} for vote in ele_1.votes[::-1]]
+        ele_2 = mapel.generate_approval_election_from_votes(votes, num_candidates=12)
+
+        distance, _ = mad.hamming_distance(ele_1, ele_2)
+
+        assert distance == 0
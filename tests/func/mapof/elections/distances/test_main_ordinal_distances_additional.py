@@ -1,4 +1,5 @@
 import builtins
+import itertools
 import sys
 import types
 
@@ -77,14 +78,13 @@ def test_positionwise_and_pos_swap_distances_cover_cost_tables(reference_electio
 def test_agg_voterlikeness_and_bordawise_distances(reference_elections):
     election_a, election_b = reference_elections
 
-    def agg_inner(vec_a, vec_b, width):
-        assert width == len(vec_a) == len(vec_b)
-        diff = float(np.sum(np.abs(vec_a - vec_b)))
-        return diff, list(range(width))
+    def agg_inner(vec_a, vec_b):
+        assert len(vec_a) == len(vec_b) == election_a.num_voters
+        return float(np.sum(np.abs(vec_a - vec_b)))
 
     agg_value, agg_mapping = mod.agg_voterlikeness_distance(election_a, election_b, agg_inner)
     assert isinstance(agg_value, float)
-    assert agg_mapping == list(range(election_a.num_voters))
+    assert agg_mapping is None
 
     def borda_inner(vec_a, vec_b):
         return float(np.sum(np.abs(vec_a - vec_b)))
@@ -94,6 +94,18 @@ def test_agg_voterlikeness_and_bordawise_distances(reference_elections):
     assert borda_mapping is None
 
 
+def test_agg_voterlikeness_distance_by_id():
+    election_a = make_election([[0, 1, 2], [0, 1, 2], [2, 1, 0]])
+    election_b = make_election([[0, 1, 2], [1, 0, 2], [2, 0, 1]])
+
+    distance, mapping = mapof.compute_distance(election_a, election_b,
+                                               distance_id='l1-agg_voterlikeness')
+
+    # total swap distances of each voter to all voters: [3, 3, 6] and [3, 4, 5]
+    assert distance == pytest.approx(2)
+    assert mapping is None
+
+
 def test_pairwise_and_voterlikeness_distance_use_solver(reference_elections, monkeypatch):
     election_a, election_b = reference_elections
     calls = []
@@ -258,3 +270,71 @@ def test_discrete_and_blank_distances(reference_elections, monkeypatch):
     blank_value, blank_mapping = mod.blank_distance(election_a, election_b)
     assert blank_mapping is None
     assert blank_value == 1
+
+
+def test_pos_swap_cost_table_matches_swap_distance_between_votes(reference_elections):
+    from mapof.core.distances import swap_distance as vote_swap_distance
+    election_a, election_b = reference_elections
+    matching = [2, 0, 1]
+
+    table = mod.get_matching_cost_pos_swap(election_a, election_b, matching)
+
+    expected = [[vote_swap_distance(list(election_a.votes[i]), list(election_b.votes[j]),
+                                    matching=matching)
+                 for i in range(election_a.num_voters)]
+                for j in range(election_b.num_voters)]
+    np.testing.assert_array_equal(table, expected)
+
+
+def test_truncated_swap_distance_matches_bruteforce():
+    truncated = make_election([[0, 1], [1, 0], [1, 0]])
+    full = make_election([[0, 1, 2], [2, 0, 1], [1, 2, 0]])
+
+    def cost(vote, other_vote, mapping):
+        # candidate c of the truncated vote is candidate mapping[c] of the full one
+        rank = {mapping[c]: position for position, c in enumerate(vote)}
+        position = {c: p for p, c in enumerate(other_vote)}
+        total = 0
+        for a, b in itertools.combinations(range(len(other_vote)), 2):
+            if a in rank or b in rank:
+                rank_a, rank_b = rank.get(a, len(vote)), rank.get(b, len(vote))
+                total += (rank_a - rank_b) * (position[a] - position[b]) < 0
+        return total
+
+    expected = min(
+        min(sum(cost(truncated.votes[i], full.votes[j], mapping)
+                for i, j in enumerate(voters))
+            for voters in itertools.permutations(range(3)))
+        for mapping in itertools.permutations(range(3)))
+
+    assert mod.truncated_swap_distance(truncated, full) == (expected, None)
+    assert mod.truncated_swap_distance(full, truncated) == (expected, None)
+
+
+@pytest.mark.parametrize("num_candidates", [(3, 3), (2, 4), (4, 5), (3, 6)])
+def test_truncated_swap_distance_native_matches_enumeration(num_candidates, monkeypatch):
+    pytest.importorskip("mapof.elections.distances.cppdistances")
+    rng = np.random.default_rng(sum(num_candidates))
+    for _ in range(3):
+        truncated, full = [make_election([list(rng.permutation(m)) for _ in range(4)])
+                           for m in num_candidates]
+        native, _ = mod.truncated_swap_distance(truncated, full)
+
+        with monkeypatch.context() as patch:
+            patch.setattr(mod.utils, "is_module_loaded", lambda name: False)
+            enumerated, _ = mod.truncated_swap_distance(truncated, full)
+
+        assert native == enumerated
+
+
+def test_truncated_swap_distance_beyond_enumeration():
+    pytest.importorskip("mapof.elections.distances.cppdistances")
+    rng = np.random.default_rng(0)
+    votes = np.array([rng.permutation(12) for _ in range(20)])
+    # the same votes, relabeled and extended with three candidates ranked last
+    relabeling = rng.permutation(15)
+    extended = relabeling[np.hstack([votes, np.tile([12, 13, 14], (20, 1))])]
+
+    distance, _ = mod.truncated_swap_distance(make_election(votes), make_election(extended))
+
+    assert distance == 0
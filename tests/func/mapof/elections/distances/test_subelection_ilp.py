@@ -1,6 +1,23 @@
+import itertools
+from collections import Counter
+
+import numpy as np
 import pytest
 import mapof.elections as mapof
 from mapof.elections.distances.ilp_subelections import maximum_common_voter_subelection
+from mapof.elections.distances.combinatorial_subelections import \
+    maximum_common_voter_subelection_search
+
+
+def _maximum_common_voter_subelection_bf(election_1, election_2):
+    counter_1 = Counter(map(tuple, election_1.votes))
+    counter_2 = Counter(map(tuple, election_2.votes))
+    best = 0
+    for mapping in itertools.permutations(range(election_1.num_candidates)):
+        common = sum(min(quantity, counter_2[tuple(mapping[c] for c in vote)])
+                     for vote, quantity in counter_1.items())
+        best = max(best, common)
+    return best
 
 
 class TestOrdinalDistances:
@@ -19,4 +36,53 @@ class TestOrdinalDistances:
         )
 
     def test_solve_ilp_voter_subelection(self):
-        maximum_common_voter_subelection(self.election_1, self.election_2)
+        maximum_common_voter_subelection(self.election_1, self.election_2, solver='ilp')
+
+    def test_search_agrees_with_ilp(self):
+        assert maximum_common_voter_subelection(self.election_1, self.election_2) == \
+            maximum_common_voter_subelection(self.election_1, self.election_2, solver='ilp')
+
+    @pytest.mark.parametrize("culture_id, params", [
+        ('impartial', {}),
+        ('mallows', {'phi': 0.3}),
+        ('urn', {'alpha': 0.5}),
+    ])
+    def test_search_matches_brute_force(self, culture_id, params):
+        np.random.seed(0)
+        for _ in range(3):
+            election_1, election_2 = [mapof.generate_ordinal_election(culture_id=culture_id,
+                                                                      num_voters=8,
+                                                                      num_candidates=5,
+                                                                      **params)
+                                      for _ in range(2)]
+
+            common, mapping = maximum_common_voter_subelection_search(election_1, election_2)
+
+            assert common == _maximum_common_voter_subelection_bf(election_1, election_2)
+            if mapping is not None:
+                relabelled = Counter(tuple(mapping[c] for c in vote) for vote in election_1.votes)
+                assert sum((relabelled & Counter(map(tuple, election_2.votes))).values()) == common
+
+
+def test_discrete_distance_without_gurobi(monkeypatch):
+    import importlib
+    import sys
+    from mapof.elections.distances import register
+
+    monkeypatch.setitem(sys.modules, 'gurobipy', None)
+    monkeypatch.delitem(sys.modules, 'mapof.elections.distances.ilp_subelections')
+    monkeypatch.setitem(register.registered_ordinal_election_distances,
+                        'maximum_common_voter_subelection',
+                        maximum_common_voter_subelection)
+    module = importlib.import_module('mapof.elections.distances.ilp_subelections')
+
+    election_1 = mapof.generate_ordinal_election(culture_id='impartial', num_voters=8,
+                                                 num_candidates=4)
+    election_2 = mapof.generate_ordinal_election(culture_id='impartial', num_voters=8,
+                                                 num_candidates=4)
+
+    distance, _ = mapof.compute_distance(election_1, election_2, distance_id='discrete')
+    assert distance == 8 - _maximum_common_voter_subelection_bf(election_1, election_2)
+    assert module.maximum_common_voter_subelection(election_1, election_2) == 8 - distance
+    with pytest.raises(ImportError):
+        module.maximum_common_voter_subelection(election_1, election_2, solver='ilp')
@@ -1,4 +1,11 @@
+import time
+from itertools import permutations
+
+import numpy as np
+import pytest
+
 import mapof.elections as mapof
+from mapof.core.matchings import solve_matching_vectors
 from mapof.elections.distances import main_ordinal_distances as mod
 
 
@@ -18,3 +25,131 @@ class TestSwapDistance:
 
             assert int(distance_1) == int(distance_2), "C++ BF swap distance differs from \
            Python BF swap distance"
+
+    def test_cpp_vs_bf_swap_distance_for_various_sizes(self):
+        for num_candidates in [2, 4, 5]:
+            election_1 = mapof.generate_ordinal_election(culture_id='impartial',
+                                                         num_voters=4,
+                                                         num_candidates=num_candidates)
+            election_2 = mapof.generate_ordinal_election(culture_id='impartial',
+                                                         num_voters=4,
+                                                         num_candidates=num_candidates)
+
+            distance_1, _ = mapof.compute_distance(election_1, election_2,
+                                                   distance_id='swap')
+            distance_2, _ = mod.swap_distance_bf(election_1, election_2)
+
+            assert int(distance_1) == int(distance_2)
+
+
+def _spearman_distance_bf(election_1, election_2):
+    potes_1 = np.array(election_1.get_potes())
+    potes_2 = np.array(election_2.get_potes())
+    values = []
+    for mapping in permutations(range(election_1.num_candidates)):
+        cost_table = np.abs(potes_1[:, np.newaxis, :]
+                            - potes_2[np.newaxis, :, list(mapping)]).sum(axis=2)
+        values.append(solve_matching_vectors(cost_table)[0])
+    return min(values)
+
+
+@pytest.mark.parametrize("culture_id, params", [
+    ('impartial', {}),
+    ('mallows', {'phi': 0.3}),
+    ('urn', {'alpha': 0.5}),
+])
+def test_branch_and_bound_matches_brute_force(culture_id, params):
+    for _ in range(3):
+        election_1, election_2 = [
+            mapof.generate_ordinal_election(culture_id=culture_id, params=params,
+                                            num_voters=6, num_candidates=5)
+            for _ in range(2)]
+
+        swap, _ = mapof.compute_distance(election_1, election_2, distance_id='swap')
+        spearman, _ = mapof.compute_distance(election_1, election_2, distance_id='spearman')
+
+        assert int(swap) == int(mod.swap_distance_bf(election_1, election_2)[0])
+        assert int(spearman) == int(_spearman_distance_bf(election_1, election_2))
+
+
+@pytest.mark.parametrize("time_budget", [0., 10.])
+def test_swap_distance_bounds(time_budget):
+    election_1, election_2 = [
+        mapof.generate_ordinal_election(culture_id='impartial', num_voters=6, num_candidates=5)
+        for _ in range(2)]
+
+    lower, upper, matching = mod.swap_distance_bounds(election_1, election_2,
+                                                      time_budget=time_budget)
+    exact, _ = mapof.compute_distance(election_1, election_2, distance_id='swap')
+
+    assert lower <= exact <= upper
+    assert sorted(matching) == list(range(5))
+    if time_budget > 1:
+        assert lower == upper == exact
+
+
+def test_swap_distance_bounds_respect_the_time_budget():
+    rng = np.random.default_rng(0)
+    election_1, election_2 = [
+        mapof.generate_ordinal_election_from_votes(
+            np.array([rng.permutation(40) for _ in range(1000)]))
+        for _ in range(2)]
+
+    start = time.time()
+    lower, upper, matching = mod.swap_distance_bounds(election_1, election_2,
+                                                      time_budget=0.1)
+
+    assert time.time() - start < 2
+    assert 0 < lower <= upper
+    assert sorted(matching) == list(range(40))
+
+
+def test_swap_distance_bounds_for_large_candidate_costs():
+    # candidates 0..2 are always last in the first election, so that matching them
+    # costs more than n (m - 1) / 2 in the positionwise bound
+    rng = np.random.default_rng(0)
+    num_voters, num_candidates = 2000, 120
+    votes_1 = np.array([np.append(3 + rng.permutation(num_candidates - 3), rng.permutation(3))
+                        for _ in range(num_voters)])
+    votes_2 = np.array([rng.permutation(num_candidates) for _ in range(num_voters)])
+    election_1 = mapof.generate_ordinal_election_from_votes(votes_1)
+    election_2 = mapof.generate_ordinal_election_from_votes(votes_2)
+
+    lower, upper, _ = mod.swap_distance_bounds(election_1, election_2, time_budget=0.)
+
+    positions_1 = np.sort(np.argsort(votes_1, axis=1), axis=0).T
+    positions_2 = np.sort(np.argsort(votes_2, axis=1), axis=0).T
+    costs = np.abs(positions_1[:, np.newaxis, :] - positions_2[np.newaxis, :, :]).sum(axis=2)
+    assert costs.min(axis=1).max() > 100000
+    assert lower == (solve_matching_vectors(costs)[0] + 1) // 2
+    assert lower <= upper
+
+
+def test_experiment_stores_swap_distance_bounds():
+    experiment = mapof.prepare_online_ordinal_experiment()
+    experiment.add_family(culture_id='impartial', num_candidates=5, num_voters=6, size=3)
+
+    experiment.compute_distances(distance_id='swap_approx', time_budget=10.)
+
+    ids = list(experiment.instances)
+    lower, upper = experiment.distance_bounds[ids[0]][ids[1]]
+    assert lower == upper == experiment.distances[ids[1]][ids[0]]
+    assert experiment.get_pairs_to_refine() == []
+
+
+@pytest.mark.parametrize("dtype", [np.int8, np.int16])
+def test_native_distances_accept_compact_votes(dtype):
+    cppd = pytest.importorskip("mapof.elections.distances.cppdistances")
+    rng = np.random.default_rng(0)
+    votes = np.array([[rng.permutation(5) for _ in range(6)] for _ in range(3)])
+    pairs = np.array([[0, 1], [0, 2], [1, 2]])
+
+    for function_name in ['swapd', 'speard', 'tswapd']:
+        function = getattr(cppd, function_name)
+        assert function(votes[0].astype(dtype), votes[1].astype(dtype)) \
+            == function(votes[0].astype(np.int32), votes[1].astype(np.int32)) \
+            == function(votes[0].tolist(), votes[1].tolist())
+    for function_name in ['swapd_many', 'speard_many']:
+        function = getattr(cppd, function_name)
+        np.testing.assert_array_equal(function(votes.astype(dtype), pairs),
+                                      function(votes.astype(np.int32), pairs))
@@ -23,6 +23,68 @@ class TestOfflineOrdinalExperiment:
     def test_compute_distances(self, prepared_elections):
         prepared_elections.compute_distances(distance_id="emd-positionwise")
 
+    @pytest.mark.parametrize("distance_id", ["emd-positionwise", "emd-bordawise"])
+    def test_update_distances(self, prepared_elections, distance_id):
+        old_ids = prepared_elections.add_family(culture_id="impartial", family_id="ic",
+                                                num_candidates=5, num_voters=20, size=3)
+        prepared_elections.compute_distances(distance_id=distance_id)
+        prepared_elections.distances[old_ids[0]][old_ids[1]] = -1.
+
+        new_ids = prepared_elections.add_family(culture_id="identity", family_id="id",
+                                                num_candidates=5, num_voters=20, size=2)
+        prepared_elections.update_distances(distance_id=distance_id)
+
+        assert prepared_elections.distances[old_ids[0]][old_ids[1]] == -1.
+        for instance_id in old_ids + new_ids[1:]:
+            assert new_ids[0] in prepared_elections.distances[instance_id]
+
+        reloaded = mapof.prepare_offline_ordinal_experiment(experiment_id="test_id_soc",
+                                                            distance_id=distance_id)
+        assert reloaded.distances[old_ids[1]][old_ids[0]] == -1.
+        assert new_ids[1] in reloaded.distances[old_ids[2]]
+
+    def test_remove_family(self, prepared_elections):
+        prepared_elections.add_family(culture_id="impartial", family_id="ic",
+                                      num_candidates=5, num_voters=20, size=3)
+        removed = prepared_elections.add_family(culture_id="identity", family_id="id",
+                                                num_candidates=5, num_voters=20, size=2)
+        prepared_elections.compute_distances(distance_id="emd-bordawise")
+
+        assert prepared_elections.remove_family("id") == removed
+        assert "id" not in prepared_elections.families
+        for row in prepared_elections.distances.values():
+            assert not set(removed) & set(row)
+
+        reloaded = mapof.prepare_offline_ordinal_experiment(experiment_id="test_id_soc",
+                                                            distance_id="emd-bordawise")
+        assert set(reloaded.instances) == set(prepared_elections.instances)
+        assert len(reloaded.distances) == 3
+
+    def test_binary_distances_resume(self, prepared_elections):
+        from mapof.elections.persistence.distance_store import DistanceStore
+
+        prepared_elections.set_distance_format('binary')
+        ids = prepared_elections.add_family(culture_id="impartial", family_id="ic",
+                                            num_candidates=5, num_voters=20, size=4)
+        prepared_elections.compute_distances(distance_id="emd-positionwise")
+        expected = prepared_elections.distances
+
+        # Simulate an interrupted computation: one stored pair is kept (with a
+        # marker value) and all others are missing.
+        store = DistanceStore(prepared_elections._distance_store_path("emd-positionwise"))
+        kept = (store.instance_ids.index(ids[0]), store.instance_ids.index(ids[1]))
+        store.write([kept], [-1.], is_exclusive=True)
+        store.close()
+
+        resumed = mapof.prepare_offline_ordinal_experiment(experiment_id="test_id_soc")
+        resumed.set_distance_format('binary')
+        resumed.compute_distances(distance_id="emd-positionwise", recompute=False)
+        assert resumed.distances[ids[1]][ids[0]] == -1.
+        assert resumed.distances[ids[2]][ids[3]] == pytest.approx(expected[ids[2]][ids[3]])
+
+        store = DistanceStore(resumed._distance_store_path("emd-positionwise"), mode='r')
+        assert len(store.done_pairs()) == len(ids) * (len(ids) - 1) // 2
+
     # def test_embed_2d(self, prepared_elections):
     #     prepared_elections.compute_distances(distance_id="emd-positionwise")
     #     prepared_elections.embed_2d(embedding_id="mds")
@@ -88,6 +88,75 @@ class TestOnlineOrdinalExperiment:
             feature_id=feature_id
         )
 
+    def test_compute_feature_distances(self, two_fam_experiment):
+        feature_ids = ['highest_borda_score', 'highest_plurality_score']
+        for feature_id in feature_ids:
+            two_fam_experiment.compute_feature(feature_id=feature_id)
+
+        two_fam_experiment.compute_feature_distances(feature_ids, distance_id='feature_l1')
+
+        election_1, election_2 = list(two_fam_experiment.instances)[:2]
+        expected = sum(abs(two_fam_experiment.features[feature_id]['value'][election_1]
+                           - two_fam_experiment.features[feature_id]['value'][election_2])
+                       for feature_id in feature_ids)
+        assert two_fam_experiment.distances[election_1][election_2] == pytest.approx(expected)
+
+    @pytest.mark.parametrize("distance_id", ["swap", "spearman"])
+    def test_compute_nearest_neighbours(self, two_fam_experiment, distance_id):
+        neighbours, skipped = two_fam_experiment.compute_nearest_neighbours(
+            k=3, distance_id=distance_id)
+        assert 0 <= skipped < 1
+
+        two_fam_experiment.compute_distances(distance_id=distance_id)
+        distances = two_fam_experiment.distances
+        for election_id, nearest in neighbours.items():
+            expected = sorted(distances[election_id][other_id]
+                              for other_id in two_fam_experiment.instances
+                              if other_id != election_id)[:3]
+            assert [distance for _, distance in nearest] == expected
+            for other_id, distance in nearest:
+                assert distances[election_id][other_id] == distance
+
+    def test_metric_index_search(self, two_fam_experiment):
+        index = two_fam_experiment.set_metric_index(distance_id='emd-positionwise')
+        assert len(index) == 20
+
+        new_ids = two_fam_experiment.add_election(culture_id='impartial', num_candidates=5,
+                                                  num_voters=10, instance_id='new')
+        assert len(index) == 21
+
+        election = two_fam_experiment.instances[new_ids[0]]
+        nearest = two_fam_experiment.find_nearest_elections(election, k=2)
+        assert nearest[0] == (new_ids[0], 0.0)
+        within = two_fam_experiment.find_elections_within(election, radius=nearest[1][1])
+        assert [instance_id for instance_id, _ in within][:2] == \
+            [instance_id for instance_id, _ in nearest]
+
+    @pytest.mark.parametrize('landmark_selection', ['maxmin', 'stratified'])
+    def test_embed_landmarks(self, two_fam_experiment, landmark_selection):
+        landmarks = two_fam_experiment.embed_landmarks(distance_id='emd-positionwise',
+                                                       num_landmarks=6,
+                                                       landmark_selection=landmark_selection)
+        assert len(set(landmarks)) == 6
+        assert set(two_fam_experiment.coordinates) == set(two_fam_experiment.instances)
+        for coordinates in two_fam_experiment.coordinates.values():
+            assert len(coordinates) == 2
+
+    def test_embed_landmarks_batches_the_elections(self, two_fam_experiment, monkeypatch):
+        from mapof.elections.objects import ElectionExperiment as module
+        calls = []
+
+        def get_batched_distances(elections, **kwargs):
+            calls.append(len(elections))
+            return original(elections, **kwargs)
+
+        original = module.get_batched_distances
+        monkeypatch.setattr(module, 'get_batched_distances', get_batched_distances)
+        two_fam_experiment.embed_landmarks(distance_id='emd-positionwise', num_landmarks=6)
+
+        # a single call (with the landmark and all 20 elections) per landmark
+        assert calls == [21] * 6
+
     def test_compute_voting_rule(self, two_fam_experiment):
 
         for method in ['sntv', 'borda', 'stv']:
@@ -0,0 +1,73 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import mapof.elections as mapof
+from mapof.elections.objects.OrdinalElection import convert_votes_to_potes
+from mapof.elections.other.compact_votes import compact_dtype, compact_votes, \
+    distinct_votes_with_counts
+
+
+@pytest.mark.parametrize('num_candidates, dtype', [(5, np.int8), (128, np.int8),
+                                                   (129, np.int16), (40000, np.int32)])
+def test_compact_dtype(num_candidates, dtype):
+    assert compact_dtype(num_candidates) == dtype
+
+
+def test_ragged_votes_are_not_converted():
+    votes = [[0, 1, 2], [1, 0]]
+    assert compact_votes(votes) is votes
+
+
+def test_read_only_votes_are_not_copied():
+    votes = np.array([[0, 1, 2], [2, 1, 0]], dtype=np.int32)
+    votes.flags.writeable = False
+
+    assert compact_votes(votes) is votes
+    assert compact_votes(votes.copy()).dtype == np.int8
+
+
+def test_distinct_votes_follow_counter_order():
+    rng = np.random.default_rng(0)
+    votes = np.array([rng.permutation(4) for _ in range(60)])
+
+    distinct, counts = distinct_votes_with_counts(votes)
+
+    counted = sorted([[count, list(row)] for row, count in Counter(map(tuple, votes)).items()],
+                     reverse=True)
+    assert counts.dtype == np.uint32
+    assert counts.tolist() == [count for count, _ in counted]
+    assert distinct.tolist() == [vote for _, vote in counted]
+
+
+def test_ordinal_election_stores_compact_votes():
+    election = mapof.generate_ordinal_election(culture_id='impartial', num_candidates=6,
+                                               num_voters=50)
+    assert election.votes.dtype == np.int8
+    assert election.quantities.dtype == np.uint32
+    assert sum(election.quantities) == 50
+
+    potes = election.get_potes()
+    assert potes.dtype == np.int64
+    np.testing.assert_array_equal(potes, convert_votes_to_potes(election.votes))
+
+    election.votes = np.array([[0, 1, 2, 3, 4, 5]] * 3 + [[5, 4, 3, 2, 1, 0]])
+    election.num_voters = 4
+    assert election.quantities.tolist() == [3, 1]
+    assert election.distinct_votes.tolist() == [[0, 1, 2, 3, 4, 5], [5, 4, 3, 2, 1, 0]]
+    assert election.get_potes()[3].tolist() == [5, 4, 3, 2, 1, 0]
+
+
+def test_arithmetic_on_potes_of_compact_votes_does_not_overflow():
+    from mapof.core.distances import spearman_distance_between_potes
+
+    num_candidates = 20
+    votes = np.array([list(range(num_candidates)), list(reversed(range(num_candidates)))])
+    election = mapof.generate_ordinal_election_from_votes(votes)
+    assert election.votes.dtype == np.int8
+
+    potes = election.get_potes()
+    assert potes[1][0] * potes[1][1] == 19 * 18
+    assert spearman_distance_between_potes(potes[0], potes[1]) == \
+        sum(abs(2 * c - 19) for c in range(num_candidates))
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from scipy.spatial.distance import cdist, pdist
+
+from mapof.elections.other.landmark_embedding import landmark_mds, maxmin_landmarks, \
+    stratified_landmarks
+
+
+@pytest.mark.parametrize('num_landmarks', [4, 10, 30])
+def test_landmark_mds_recovers_euclidean_distances(num_landmarks):
+    points = np.random.default_rng(0).normal(size=[30, 2])
+    distances = cdist(points, points)
+
+    landmarks, columns = maxmin_landmarks(len(points), num_landmarks,
+                                          lambda i: distances[i], seed=1)
+    assert len(set(landmarks)) == num_landmarks
+    np.testing.assert_allclose(columns, distances[:, landmarks])
+
+    coordinates = landmark_mds(columns, landmarks, dim=2)
+    np.testing.assert_allclose(pdist(coordinates), pdist(points), atol=1e-8)
+
+
+def test_stratified_landmarks_cover_all_groups():
+    groups = [list(range(0, 20)), list(range(20, 25)), list(range(25, 26))]
+    landmarks = stratified_landmarks(groups, 8, seed=0)
+    assert len(set(landmarks)) == 8
+    assert all(any(landmark in group for landmark in landmarks) for group in groups)
+    assert sum(landmark < 20 for landmark in landmarks) >= 5
@@ -0,0 +1,62 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import mapof.elections as mapof
+from mapof.elections.other.vote_distances import vote_distance_matrix, \
+    aggregated_vote_distances, candidate_distance_matrix
+
+
+def _swap_distance(pote_1, pote_2):
+    distance = 0
+    for a, b in itertools.combinations(range(len(pote_1)), 2):
+        sign_1 = np.sign(pote_1[a] - pote_1[b])
+        sign_2 = np.sign(pote_2[a] - pote_2[b])
+        distance += abs(sign_1 - sign_2) / 2
+    return distance
+
+
+@pytest.mark.parametrize('vote_distance', ['swap', 'spearman'])
+def test_vote_distance_matrix_matches_pairwise_computation(vote_distance):
+    election = mapof.generate_ordinal_election(culture_id='impartial',
+                                               num_voters=30, num_candidates=7)
+    potes = election.get_potes()
+
+    matrix = vote_distance_matrix(potes, vote_distance)
+
+    for v1, v2 in itertools.product(range(len(potes)), repeat=2):
+        if vote_distance == 'swap':
+            expected = _swap_distance(potes[v1], potes[v2])
+        else:
+            expected = np.abs(potes[v1] - potes[v2]).sum()
+        assert matrix[v1][v2] == expected
+    np.testing.assert_array_equal(aggregated_vote_distances(potes, vote_distance),
+                                  matrix.sum(axis=1))
+
+
+def test_swap_distance_counts_ties_as_halves():
+    potes = np.array([[0, 1, 2, 3], [1.5, 0, 1.5, 1.5], [3, 2, 1, 0]])
+
+    matrix = vote_distance_matrix(potes, 'swap')
+
+    for v1, v2 in itertools.product(range(len(potes)), repeat=2):
+        assert matrix[v1][v2] == _swap_distance(potes[v1], potes[v2])
+
+
+def test_vote_distance_matrix_in_small_blocks(monkeypatch):
+    import mapof.elections.other.vote_distances as vote_distances
+    potes = np.array([np.random.permutation(6) for _ in range(20)])
+    expected = vote_distance_matrix(potes, 'swap')
+
+    monkeypatch.setattr(vote_distances, 'MAX_CHUNK_ENTRIES', 7)
+
+    np.testing.assert_array_equal(vote_distance_matrix(potes, 'swap'), expected)
+
+
+def test_candidate_distance_matrix():
+    potes = np.array([[0, 1, 2], [2, 0, 1]])
+
+    matrix = candidate_distance_matrix(potes)
+
+    np.testing.assert_array_equal(matrix, [[0, 3, 3], [3, 0, 2], [3, 2, 0]])
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from mapof.elections.other.vote_kernels import (
+    borda_scores,
+    pairwise_preference_counts,
+    votes_to_frequency_matrix,
+    votes_to_potes
+)
+
+
+def _random_votes(num_voters, num_candidates, is_truncated=False, seed=0):
+    rng = np.random.default_rng(seed)
+    votes = np.array([rng.permutation(num_candidates) for _ in range(num_voters)])
+    if is_truncated:
+        for vote in votes:
+            vote[rng.integers(1, num_candidates + 1):] = -1
+    return votes
+
+
+def _reference_potes(votes, m):
+    potes = []
+    for vote in votes:
+        reported = [c for c in vote if c != -1]
+        unranked = len(reported) + (m - 1 - len(reported)) / 2
+        potes.append([reported.index(c) if c in reported else unranked for c in range(m)])
+    return np.array(potes)
+
+
+def _reference_frequency_matrix(votes, m):
+    matrix = np.zeros([m, m])
+    for vote in votes:
+        for pos, c in enumerate([c for c in vote if c != -1]):
+            matrix[c][pos] += 1
+    return matrix / len(votes)
+
+
+@pytest.mark.parametrize('is_truncated', [False, True])
+def test_potes_and_frequency_matrix_match_reference(is_truncated):
+    votes = _random_votes(40, 6, is_truncated=is_truncated)
+
+    potes = votes_to_potes(votes)
+    frequency_matrix = votes_to_frequency_matrix(votes)
+
+    np.testing.assert_array_equal(potes, _reference_potes(votes, 6))
+    np.testing.assert_allclose(frequency_matrix, _reference_frequency_matrix(votes, 6))
+    if not is_truncated:
+        assert potes.dtype == np.int64
+
+
+def test_ragged_votes_are_padded():
+    potes = votes_to_potes([[2, 0, 1, 3], [1, 3]], num_candidates=4)
+    np.testing.assert_array_equal(potes, [[1, 2, 0, 3], [2.5, 0, 2.5, 1]])
+
+
+def test_mapping_reorders_candidates():
+    votes = _random_votes(10, 5)
+    mapping = [4, 2, 0, 1, 3]
+    np.testing.assert_array_equal(votes_to_potes(votes, mapping=mapping),
+                                  votes_to_potes(votes)[:, mapping])
+
+
+def test_weighted_statistics_match_repeated_votes():
+    distinct = _random_votes(7, 5, seed=1)
+    weights = np.array([3, 1, 4, 1, 5, 9, 2])
+    repeated = np.repeat(distinct, weights, axis=0)
+
+    np.testing.assert_allclose(votes_to_frequency_matrix(distinct, weights=weights),
+                               votes_to_frequency_matrix(repeated))
+    np.testing.assert_allclose(borda_scores(distinct, weights=weights), borda_scores(repeated))
+    np.testing.assert_allclose(
+        pairwise_preference_counts(votes_to_potes(distinct), weights=weights),
+        pairwise_preference_counts(votes_to_potes(repeated)))
+
+
+def test_pairwise_preference_counts():
+    potes = votes_to_potes(_random_votes(25, 5, seed=2))
+    counts = pairwise_preference_counts(potes)
+
+    for a in range(5):
+        for b in range(5):
+            assert counts[a][b] == sum(1 for p in potes if p[a] < p[b])
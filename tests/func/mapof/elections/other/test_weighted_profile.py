@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import mapof.elections as mapof
+from mapof.elections.features.register import registered_ordinal_election_features
+from mapof.elections.other.weighted_profile import WeightedProfile
+
+
+def _election_with_repeated_votes(seed=0):
+    rng = np.random.default_rng(seed)
+    distinct = np.array([rng.permutation(6) for _ in range(5)])
+    votes = distinct[rng.integers(0, len(distinct), size=40)]
+    return mapof.generate_ordinal_election_from_votes(votes)
+
+
+def test_profile_groups_the_votes_of_an_election():
+    election = _election_with_repeated_votes()
+
+    profile = election.get_weighted_profile()
+
+    assert len(profile) == len(election.distinct_votes) <= 5
+    assert profile.num_voters == election.num_voters == 40
+    np.testing.assert_array_equal(profile.votes, election.distinct_votes)
+    assert election.get_weighted_profile() is profile
+
+    election.votes = election.votes[:10]
+    assert election.get_weighted_profile().num_voters == 10
+
+
+def test_ragged_votes_are_padded():
+    profile = WeightedProfile.from_votes([[0, 1, 2], [1, 0], [0, 1, 2]])
+
+    assert profile.votes.tolist() == [[0, 1, 2], [1, 0, -1]]
+    assert profile.weights.tolist() == [2, 1]
+    assert profile.pair_weights().tolist() == [[2, 2], [2, 0]]
+
+
+@pytest.mark.parametrize('feature_id', ['highest_borda_score', 'highest_copeland_score',
+                                        'is_condorcet', 'agreement', 'borda_std',
+                                        'avg_vote_dist', 'max_vote_dist', 'karpov_index',
+                                        'cand_pos_dist_std', 'entropy', 'support_pairs',
+                                        'greedy_approx_hb_score', 'removal_approx_pav_score',
+                                        'banzhaf_cc_score', 'ranging_cc_score'])
+def test_features_match_the_unweighted_profile(feature_id):
+    feature = registered_ordinal_election_features[feature_id]
+    election = _election_with_repeated_votes()
+    weighted = feature(election)
+
+    election = _election_with_repeated_votes()
+    election._weighted_profile = WeightedProfile(election.votes, np.ones(election.num_voters))
+    unweighted = feature(election)
+
+    assert weighted.keys() == unweighted.keys()
+    for key in weighted:
+        assert weighted[key] == pytest.approx(unweighted[key])
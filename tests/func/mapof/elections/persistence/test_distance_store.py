@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from mapof.elections.persistence.distance_store import DistanceStore, store_exists
+from mapof.elections.persistence.election_exports import export_distances
+
+
+class MockElection:
+    def __init__(self, election_id, experiment_id, distances=None):
+        self.election_id = election_id
+        self.experiment_id = experiment_id
+        self.distances = distances
+
+
+def test_store_write_and_read(tmp_path):
+    path = str(tmp_path / 'swap')
+    store = DistanceStore(path, ['a', 'b', 'c'], distance_id='swap')
+    store.write([(0, 1), (2, 1)], [1.5, 2.5], [0.1, 0.2])
+    store.write_values([(0, 2)], [9.])
+    store.close()
+
+    store = DistanceStore(path, mode='r')
+    assert store.instance_ids == ['a', 'b', 'c']
+    assert store.is_done([(1, 0), (0, 2)]).tolist() == [True, False]
+    np.testing.assert_array_equal(store.done_pairs(), [[0, 1], [1, 2]])
+    matrix = store.matrix()
+    assert matrix[1][2] == matrix[2][1] == 2.5
+    assert np.isnan(matrix[0][2])
+
+    distances, times = store.to_dicts()
+    assert distances['a'] == {'b': 1.5}
+    assert times['c']['b'] == 0.2
+
+
+def test_store_keeps_common_pairs_when_ids_change(tmp_path):
+    path = str(tmp_path / 'swap')
+    store = DistanceStore(path, ['a', 'b', 'c'], distance_id='swap')
+    store.write([(0, 1), (0, 2), (1, 2)], [1., 2., 3.])
+    store.close()
+
+    store = DistanceStore(path, ['c', 'd', 'a'], distance_id='swap')
+    np.testing.assert_array_equal(store.done_pairs(), [[0, 2]])
+    assert store.matrix()[2][0] == 2.
+    store.close()
+    assert not store_exists(f'{path}.tmp')
+
+
+def test_export_distances_to_binary_store(mocker, tmp_path):
+    mocker.patch("os.getcwd", return_value=str(tmp_path))
+    election = MockElection('election123', 'experiment123',
+                            distances={'vote': [[0., 1.], [1., 0.]]})
+
+    export_distances(election, object_type='vote', is_binary=True)
+
+    store = DistanceStore(str(tmp_path / 'experiments' / 'experiment123' / 'distances'
+                              / 'election123_vote'), mode='r')
+    np.testing.assert_array_equal(store.matrix(), [[0., 1.], [1., 0.]])
+    assert store.distance_id == 'vote'
+
+
+def test_missing_store_cannot_be_read(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        DistanceStore(str(tmp_path / 'missing'), mode='r')
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+import mapof.elections as mapof
+from mapof.elections.distances import batched_distances
+from mapof.elections.distances import main_approval_distances as mad
+from mapof.elections.distances import main_ordinal_distances as mod
+from mapof.core.distances import map_str_to_func
+
+
+def _elections(num_elections=6, num_candidates=5, num_voters=15):
+    return [mapof.generate_ordinal_election(culture_id='impartial',
+                                            num_candidates=num_candidates,
+                                            num_voters=num_voters)
+            for _ in range(num_elections)]
+
+
+@pytest.mark.parametrize("inner_distance", ['emd', 'l1', 'l2'])
+def test_positionwise_distance_matrix_matches_pairwise(inner_distance):
+    elections = _elections()
+
+    matrix, matchings = batched_distances.positionwise_distance_matrix(
+        elections, inner_distance, with_matchings=True)
+
+    for i in range(len(elections)):
+        for j in range(i + 1, len(elections)):
+            expected, _ = mod.positionwise_distance(elections[i], elections[j],
+                                                    map_str_to_func(inner_distance))
+            assert matrix[i][j] == pytest.approx(expected)
+            assert matrix[j][i] == matrix[i][j]
+            assert sorted(matchings[(i, j)]) == list(range(5))
+
+
+def test_positionwise_distance_matrix_computes_only_given_pairs():
+    elections = _elections(num_elections=4)
+
+    matrix, _ = batched_distances.positionwise_distance_matrix(
+        elections, 'emd', pairs=[(0, 3)])
+
+    assert matrix[0][3] > 0
+    assert np.count_nonzero(matrix) == 2
+
+
+def test_positionwise_distance_matrix_rejects_unsupported_inner_distance():
+    with pytest.raises(NotImplementedError):
+        batched_distances.positionwise_distance_matrix(_elections(2), 'hellinger')
+
+
+def test_experiment_uses_batched_engine():
+    experiment = mapof.prepare_online_ordinal_experiment()
+    experiment.add_family(culture_id='impartial', num_candidates=5, num_voters=10, size=4)
+
+    experiment.compute_distances(distance_id='emd-positionwise')
+
+    ids = list(experiment.instances)
+    for i, id_1 in enumerate(ids):
+        for id_2 in ids[i + 1:]:
+            expected, _ = mapof.compute_distance(experiment.instances[id_1],
+                                                 experiment.instances[id_2],
+                                                 distance_id='emd-positionwise')
+            assert experiment.distances[id_1][id_2] == pytest.approx(expected)
+            assert experiment.distances[id_2][id_1] == pytest.approx(expected)
+            assert id_2 in experiment.matchings[id_1]
+
+
+@pytest.mark.parametrize("engine, distance", [
+    (batched_distances.swap_distance_matrix, mod.swap_distance),
+    (batched_distances.spearman_distance_matrix, mod.spearman_distance),
+])
+def test_native_distance_matrix_matches_pairwise(engine, distance):
+    elections = _elections(num_elections=4, num_candidates=4, num_voters=5)
+
+    matrix, _ = engine(elections)
+
+    for i in range(len(elections)):
+        for j in range(i + 1, len(elections)):
+            expected, _ = distance(elections[i], elections[j])
+            assert matrix[i][j] == expected
+            assert matrix[j][i] == expected
+
+
+def test_native_distance_matrix_rejects_unequal_shapes():
+    elections = _elections(num_elections=2, num_candidates=4, num_voters=5) \
+        + _elections(num_elections=1, num_candidates=4, num_voters=6)
+
+    with pytest.raises(NotImplementedError):
+        batched_distances.swap_distance_matrix(elections)
+
+
+@pytest.mark.parametrize("inner_distance", ['emd', 'l1', 'l2'])
+def test_bordawise_distance_matrix_matches_pairwise(inner_distance):
+    elections = _elections()
+
+    matrix, _ = batched_distances.bordawise_distance_matrix(elections, inner_distance)
+
+    for i in range(len(elections)):
+        for j in range(i + 1, len(elections)):
+            expected, _ = mod.bordawise_distance(elections[i], elections[j],
+                                                 map_str_to_func(inner_distance))
+            assert matrix[i][j] == pytest.approx(expected)
+            assert matrix[j][i] == matrix[i][j]
+
+
+@pytest.mark.parametrize("inner_distance", ['emd', 'l1', 'l2'])
+def test_approvalwise_distance_matrix_matches_pairwise(inner_distance):
+    elections = [mapof.generate_approval_election(culture_id='impartial',
+                                                  num_candidates=6,
+                                                  num_voters=20,
+                                                  p=0.4)
+                 for _ in range(5)]
+
+    matrix, _ = batched_distances.approvalwise_distance_matrix(elections, inner_distance)
+
+    for i in range(len(elections)):
+        for j in range(i + 1, len(elections)):
+            expected, _ = mad.approvalwise_distance(elections[i], elections[j],
+                                                    map_str_to_func(inner_distance))
+            assert matrix[i][j] == pytest.approx(expected)
+            assert matrix[j][i] == matrix[i][j]
@@ -0,0 +1,103 @@
+import mapof.elections as mapof
+from mapof.elections.distances.distance_cache import DistanceCache, election_fingerprint
+
+
+def test_fingerprint_depends_only_on_content():
+    election = mapof.generate_ordinal_election_from_votes([[0, 1, 2], [2, 1, 0]])
+    same = mapof.generate_ordinal_election_from_votes([[0, 1, 2], [2, 1, 0]])
+    other = mapof.generate_ordinal_election_from_votes([[0, 2, 1], [2, 1, 0]])
+
+    assert election_fingerprint(election) == election_fingerprint(same)
+    assert election_fingerprint(election) != election_fingerprint(other)
+
+
+def test_cache_inverts_matching_for_swapped_keys(tmp_path):
+    cache = DistanceCache(str(tmp_path / 'cache.sqlite'))
+
+    cache.put('a', 'b', 'emd-positionwise', (1.5, [1, 2, 0]))
+
+    assert cache.get('a', 'b', 'emd-positionwise') == (1.5, [1, 2, 0])
+    assert cache.get('b', 'a', 'emd-positionwise') == (1.5, [2, 0, 1])
+    assert cache.get('a', 'b', 'swap') is None
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'entries': 1}
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = DistanceCache(str(tmp_path / 'cache.sqlite'), max_entries=2)
+
+    cache.put('a', 'b', 'swap', (1, None))
+    cache.put('a', 'c', 'swap', (2, None))
+    cache.get('a', 'b', 'swap')
+    cache.put('a', 'd', 'swap', (3, None))
+
+    assert len(cache) == 2
+    assert cache.get('a', 'c', 'swap') is None
+    assert cache.get('a', 'b', 'swap') == (1, None)
+
+
+def test_cache_persists_between_runs(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    election_1 = mapof.generate_ordinal_election(culture_id='impartial',
+                                                 num_candidates=4, num_voters=5)
+    election_2 = mapof.generate_ordinal_election(culture_id='impartial',
+                                                 num_candidates=4, num_voters=5)
+
+    expected = mapof.compute_distance(election_1, election_2, distance_id='swap')
+    first = DistanceCache(path)
+    assert mapof.compute_distance(election_1, election_2, distance_id='swap',
+                                  cache=first) == expected
+    first.close()
+
+    second = DistanceCache(path)
+    assert mapof.compute_distance(election_1, election_2, distance_id='swap',
+                                  cache=second) == expected
+    assert second.stats()['hits'] == 1
+
+
+def test_experiment_looks_up_distances_in_cache(tmp_path):
+    experiment = mapof.prepare_online_ordinal_experiment()
+    experiment.add_family(culture_id='impartial', num_candidates=4, num_voters=5, size=3)
+    cache = experiment.set_distance_cache(str(tmp_path / 'cache.sqlite'))
+
+    experiment.compute_distances(distance_id='spearman')
+    distances = experiment.distances
+    experiment.compute_distances(distance_id='spearman')
+
+    assert experiment.distances == distances
+    assert cache.stats() == {'hits': 3, 'misses': 3, 'entries': 3}
+
+
+def test_cache_hits_do_not_write_until_flushed(tmp_path):
+    cache = DistanceCache(str(tmp_path / 'cache.sqlite'))
+    cache.put('a', 'b', 'swap', (1, None))
+    changes = cache.connection.total_changes
+
+    for _ in range(5):
+        assert cache.get('a', 'b', 'swap') == (1, None)
+    assert cache.connection.total_changes == changes
+
+    cache.flush()
+    assert cache.connection.total_changes == changes + 1
+
+
+def test_cache_key_includes_distance_arguments(tmp_path):
+    cache = DistanceCache(str(tmp_path / 'cache.sqlite'))
+
+    cache.put('a', 'b', 'swap_approx', (3, None), time_budget=0.5)
+
+    assert cache.get('a', 'b', 'swap_approx', time_budget=0.5) == (3, None)
+    assert cache.get('a', 'b', 'swap_approx', time_budget=2.0) is None
+    assert cache.get('a', 'b', 'swap_approx') is None
+
+
+def test_nearest_neighbours_use_the_experiment_cache(tmp_path):
+    experiment = mapof.prepare_online_ordinal_experiment()
+    experiment.add_family(culture_id='impartial', num_candidates=4, num_voters=5, size=4)
+    cache = experiment.set_distance_cache(str(tmp_path / 'cache.sqlite'))
+
+    neighbours, _ = experiment.compute_nearest_neighbours(k=1, distance_id='spearman')
+    misses = cache.stats()['misses']
+
+    assert misses > 0
+    assert experiment.compute_nearest_neighbours(k=1, distance_id='spearman')[0] == neighbours
+    assert cache.stats()['hits'] == misses
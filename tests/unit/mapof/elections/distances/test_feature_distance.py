@@ -1,5 +1,6 @@
 import math
 
+import numpy as np
 import pytest
 
 from mapof.elections.distances import feature_distance as fd
@@ -44,3 +45,26 @@ def test_missing_feature_raises_informative_error():
 
     with pytest.raises(Exception, match="Feature missing not found"):
         fd.features_vector_l1(election_1, election_2, ['exists', 'missing'])
+
+
+def test_feature_distance_matrix_from_standardized_features():
+    features = {
+        'f1': {'value': {'a': 1.0, 'b': 3.0, 'c': 5.0}},
+        'f2': {'value': {'a': 2.0, 'b': 2.0, 'c': 2.0}},
+    }
+
+    matrix = fd.feature_matrix(features, ['a', 'b', 'c'], ['f1', 'f2'], is_standardized=True)
+    deviation = np.std([1.0, 3.0, 5.0])
+    np.testing.assert_allclose(matrix, [[-2 / deviation, 0], [0, 0], [2 / deviation, 0]])
+
+    distances = fd.feature_distance_matrix(matrix, 2)
+    np.testing.assert_allclose(distances[0], [0, 2 / deviation, 4 / deviation])
+    np.testing.assert_allclose(fd.feature_distance_matrix(matrix, 2, pairs=[(0, 2)])[2][0],
+                               4 / deviation)
+
+
+def test_feature_matrix_raises_key_error_for_missing_feature():
+    features = {'f1': {'value': {'a': 1.0}}}
+
+    with pytest.raises(KeyError, match="Feature f2 not found"):
+        fd.feature_matrix(features, ['a'], ['f1', 'f2'])
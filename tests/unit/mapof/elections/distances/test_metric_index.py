@@ -0,0 +1,62 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from mapof.elections.distances.metric_index import MetricIndex
+
+
+def _distance(point_1, point_2):
+    return float(np.abs(point_1 - point_2).sum())
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    return {f'p{i}': rng.normal(size=3) for i in range(60)}
+
+
+def _brute_force(points, query):
+    return sorted(((instance_id, _distance(query, point))
+                   for instance_id, point in points.items()), key=lambda result: result[1])
+
+
+def test_queries_match_brute_force(points):
+    index = MetricIndex('l1', leaf_size=4, distance=_distance)
+    index.build(points)
+    query = np.array([0.1, -0.2, 0.3])
+    expected = _brute_force(points, query)
+
+    assert index.query_nearest(query, k=5) == expected[:5]
+    radius = expected[10][1]
+    assert index.query_radius(query, radius) == [result for result in expected
+                                                 if result[1] <= radius]
+
+
+def test_insert_and_remove(points):
+    index = MetricIndex('l1', leaf_size=4, distance=_distance)
+    names = list(points)
+    index.build({instance_id: points[instance_id] for instance_id in names[:10]})
+    for instance_id in names[10:]:
+        index.insert(instance_id, points[instance_id])
+    index.remove('p0')
+    del points['p0']
+
+    assert len(index) == len(points)
+    query = np.zeros(3)
+    assert index.query_nearest(query, k=7) == _brute_force(points, query)[:7]
+
+
+def test_pickled_index_needs_elections(points):
+    index = MetricIndex('l1', leaf_size=4, distance=_distance)
+    index.build(points)
+
+    loaded = pickle.loads(pickle.dumps(index))
+    with pytest.raises(KeyError):
+        loaded.attach({})
+    loaded.attach(points, _distance)
+
+    query = np.ones(3)
+    evaluations = loaded.num_evaluations
+    assert loaded.query_nearest(query, k=3) == _brute_force(points, query)[:3]
+    assert loaded.num_evaluations - evaluations < len(points)
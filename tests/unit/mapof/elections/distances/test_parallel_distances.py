@@ -0,0 +1,93 @@
+import numpy as np
+
+import mapof.elections as mapof
+from mapof.elections.distances import parallel_distances
+
+
+def _elections(num_elections=5):
+    return [mapof.generate_ordinal_election(culture_id='impartial',
+                                            num_candidates=4,
+                                            num_voters=6)
+            for _ in range(num_elections)]
+
+
+def test_parallel_distances_match_serial_computation():
+    elections = _elections()
+
+    matrix, times, _ = parallel_distances.compute_distances_in_parallel(
+        elections, 'swap', num_workers=2)
+
+    for i in range(len(elections)):
+        for j in range(i + 1, len(elections)):
+            expected, _ = mapof.compute_distance(elections[i], elections[j], distance_id='swap')
+            assert matrix[i][j] == expected
+            assert matrix[j][i] == expected
+    assert np.all(times >= 0)
+
+
+def test_workers_use_the_shared_votes_without_copying():
+    elections = _elections(num_elections=2)
+    outputs = [parallel_distances._SharedArray((2, 2), np.float64) for _ in range(2)]
+    votes = np.stack([election.votes for election in elections]).astype(np.int32)
+    shared = parallel_distances._SharedArray(votes.shape, votes.dtype)
+    shared.array[:] = votes
+    matrices = parallel_distances._SharedArray((2, 4, 4), np.float64)
+    metadata = [parallel_distances._election_metadata(election) for election in elections]
+    try:
+        parallel_distances._init_worker('swap', [out.spec() for out in outputs],
+                                        [shared.spec(), matrices.spec()], metadata, None)
+        attached = parallel_distances._worker_state['shared'][0]
+        for idx, election in enumerate(parallel_distances._worker_state['elections']):
+            assert np.shares_memory(election.votes, attached.array)
+            np.testing.assert_array_equal(election.votes, elections[idx].votes)
+    finally:
+        parallel_distances._release_worker_state()
+        for array in outputs + [shared, matrices]:
+            array.close()
+            array.unlink()
+
+
+def test_parallel_distances_compute_only_given_pairs_and_return_matchings():
+    elections = _elections(num_elections=3)
+
+    matrix, _, matchings = parallel_distances.compute_distances_in_parallel(
+        elections, 'emd-positionwise', pairs=[(0, 2)], num_workers=2)
+
+    assert set(matchings) == {(0, 2)}
+    assert matrix[0][1] == 0
+    assert np.isclose(matrix[0][2], mapof.compute_distance(elections[0], elections[2],
+                                                           distance_id='emd-positionwise')[0])
+
+
+def test_experiment_parallel_mode_is_identical_to_serial_mode():
+    experiment = mapof.prepare_online_ordinal_experiment()
+    experiment.add_family(culture_id='impartial', num_candidates=4, num_voters=6, size=4)
+
+    experiment.compute_distances(distance_id='spearman', num_workers=2)
+    parallel = experiment.distances
+    experiment.compute_distances(distance_id='spearman')
+
+    assert parallel == experiment.distances
+
+
+def test_experiment_with_workers_uses_the_pool_for_batched_distances(monkeypatch):
+    from mapof.elections.objects import ElectionExperiment
+
+    calls = []
+    original = ElectionExperiment.compute_distances_in_parallel
+
+    def counting(*args, **kwargs):
+        calls.append(kwargs['num_workers'])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(ElectionExperiment, 'compute_distances_in_parallel', counting)
+    experiment = mapof.prepare_online_ordinal_experiment()
+    experiment.add_family(culture_id='impartial', num_candidates=4, num_voters=6, size=4)
+
+    experiment.compute_distances(distance_id='swap', num_workers=2)
+    parallel = experiment.distances
+    assert calls == [2]
+
+    experiment.compute_distances(distance_id='swap')
+    assert calls == [2]
+    assert parallel == experiment.distances
@@ -106,3 +106,38 @@ def test_positionwise_size_independent_uses_solver_and_normalizes(mocker):
     )
 
     np.testing.assert_allclose(np.array(captured["table"]), np.array(expected_cost))
+
+
+def _random_frequency_matrix(size, rng):
+    return np.array([rng.dirichlet(np.ones(size)) for _ in range(size)])
+
+
+@pytest.mark.parametrize("sizes", [(3, 3), (2, 3), (4, 6), (7, 5)])
+def test_emd_infty_cost_table_matches_stretched_columns(sizes):
+    rng = np.random.default_rng(0)
+    matrix_1, matrix_2 = [_random_frequency_matrix(size, rng) for size in sizes]
+    election_lcm = positionwise.lcm(*sizes)
+    factor_1, factor_2 = election_lcm // sizes[0], election_lcm // sizes[1]
+    stretched_1 = positionwise.stretch_matrix(matrix_1, sizes[0], factor_1)
+    stretched_2 = positionwise.stretch_matrix(matrix_2, sizes[1], factor_2)
+
+    cost_table = positionwise.emd_infty_cost_table(matrix_1, matrix_2)
+
+    for i in range(sizes[0]):
+        for j in range(sizes[1]):
+            assert cost_table[i, j] == pytest.approx(
+                positionwise.emd_infty(stretched_1[:, i * factor_1],
+                                       stretched_2[:, j * factor_2]))
+
+
+@pytest.mark.parametrize("sizes", [(3, 3), (2, 3), (4, 6), (7, 5)])
+def test_positionwise_infty_distance_matches_stretching(sizes):
+    rng = np.random.default_rng(1)
+    election_one, election_two = [DummyElection(_random_frequency_matrix(size, rng))
+                                  for size in sizes]
+
+    expected, _ = positionwise.positionwise_size_independent(election_one, election_two)
+    distance, mapping = positionwise.positionwise_infty_distance(election_one, election_two)
+
+    assert distance == pytest.approx(expected)
+    assert sorted(mapping) == list(range(positionwise.lcm(*sizes)))
@@ -63,6 +63,19 @@ def test_votes_to_pairwise_matrix_matches_manual_counts():
     np.testing.assert_allclose(pairwise, expected)
 
 
+def test_pairwise_matrix_cached_until_votes_change():
+    election = _simple_election([[0, 1, 2], [0, 2, 1]])
+
+    pairwise = election.get_pairwise_matrix()
+    assert election.get_pairwise_matrix() is pairwise
+    np.testing.assert_allclose(pairwise[0], [0, 1, 1])
+
+    election.votes = [[2, 1, 0], [2, 0, 1]]
+    updated = election.get_pairwise_matrix()
+    assert updated is not pairwise
+    np.testing.assert_allclose(updated[2], [1, 1, 0])
+
+
 def test_convert_votes_to_potes_positions():
     votes = [[0, 1, 2], [2, 0, 1]]
     potes = convert_votes_to_potes(votes)